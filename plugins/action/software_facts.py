@@ -7,48 +7,59 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
-import ctypes
 import os.path
 import re
 import threading
 import time
 import traceback
-from copy import deepcopy
+from copy import copy, deepcopy
+from multiprocessing.pool import ThreadPool
 
 from ansible.errors import AnsibleRuntimeError
 from ansible.module_utils.common.text.converters import to_text
 from ansible.module_utils.parsing.convert_bool import boolean
-from ansible.module_utils.six import iteritems, text_type, binary_type
+from ansible.module_utils.six import get_unbound_function, iteritems, text_type, binary_type
 from ansible.parsing.utils.yaml import from_yaml
 from ansible.playbook.conditional import Conditional
 from ansible.plugins.action import ActionBase
+from ansible.template import Templar
 from ansible.utils.display import Display
 
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.compat.__init__ \
     import merge_hash, isidentifier, ArgumentSpecValidator, _TEMPLAR_HAS_TEMPLATE_CACHE
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.cmd_matcher \
+    import CmdMatcher
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.conditions \
+    import compile_condition
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.executor \
+    import is_cancelled, plugin_executor
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plan \
+    import PlanStep, compile_plan, freeze, include_plan_cache
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.process_tree \
+    import ProcessTree
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.remote_helper \
+    import RemoteHelper
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.template_cache \
+    import copy_with_compiled_templates, is_template_free, to_jinja_source
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.utils \
+    import InstancePool
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.__init__ \
+    import SoftwareFactsPlugin
 
 DEFAULT_LOOP_VAR = '__item__'
 
-display = Display()
-
-
-def raise_exception_in_thread(thread, exception):
-    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(thread.ident), ctypes.py_object(exception))
-
+# Connections that start a new process for every command, so several instances may execute modules through them
+# at the same time. The rest (e.g. winrm or psrp) share a single shell or runspace.
+CONCURRENT_TRANSPORTS = ('ssh', 'local')
 
-class PluginTimeoutException(BaseException):
-    pass
-
-
-class ThreadStorage:
-    result = None
-    exception = None
+display = Display()
 
 
 class GenericDetector:
     def __init__(self, software_config):
         self.software_config = software_config
         self._result = []
+        self._cmd_matcher = None
 
     @classmethod
     def clear_process_listening_ports_objects(cls, process):
@@ -66,48 +77,50 @@ class GenericDetector:
     def get_software(self):
         return self._result
 
-    def fill_process_info(self, hierarchical_processes_by_pid):
-        tested_pids = []
+    def fill_process_info(self, process_tree, cmd_matcher=None):
+        """
+        Detect the software among the processes of the tree not claimed by other software.
+        `cmd_matcher` may be shared between the detectors of a run so each command line is evaluated only once.
+        """
+        self._cmd_matcher = cmd_matcher if cmd_matcher is not None \
+            else CmdMatcher([self.software_config['cmd_regexp']])
+        tested_pids = set()
         used_pids = set()
         software_processes = []
-        for pid, process in iteritems(hierarchical_processes_by_pid):
-            if pid not in used_pids and process['cmdline']:
-                self._check_process_hierarchy(hierarchical_processes_by_pid, process, software_processes,
-                                              tested_pids, used_pids)
+        for pid in process_tree.unclaimed():
+            if pid not in used_pids and process_tree[pid]['cmdline']:
+                self._check_process_hierarchy(process_tree, pid, software_processes, tested_pids, used_pids)
         self._result = software_processes
         return used_pids
 
-    def _check_process_hierarchy(self, hierarchical_processes_by_pid, process, software_processes,
-                                 tested_pids, used_pids):
-        found = False
-        ppid = process['ppid']
-        if int(ppid) > 0 and ppid not in tested_pids and ppid not in used_pids \
-                and ppid in hierarchical_processes_by_pid:
-            tested_pids.append(ppid)
-            found = self._check_process_hierarchy(hierarchical_processes_by_pid, hierarchical_processes_by_pid[ppid],
-                                                  software_processes, tested_pids, used_pids)
-        if not found:
-            found = self._check_process_is_sw(hierarchical_processes_by_pid, process, software_processes, used_pids)
-        return found
-
-    def _children_pids(self, process, pids):
-        for p in process.get('children', []):
-            if p['pid'] != process['pid']:
-                pids.add(p['pid'])
-                self._children_pids(p, pids)
-
-    def _check_process_is_sw(self, hierarchical_processes_by_pid, process, software_processes, used_pids):
+    def _check_process_hierarchy(self, process_tree, pid, software_processes, tested_pids, used_pids):
+        # Ancestors are checked before the process itself, starting from the farthest one, so the
+        # topmost process of the software is detected. Ancestors already checked or used stop the search.
+        pids_to_check = [pid]
+        for ppid in process_tree.ancestors(pid):
+            if ppid in tested_pids or ppid in used_pids or process_tree.is_claimed(ppid):
+                break
+            tested_pids.add(ppid)
+            pids_to_check.append(ppid)
+        for pid_to_check in reversed(pids_to_check):
+            if self._check_process_is_sw(process_tree, pid_to_check, software_processes, used_pids):
+                return True
+        return False
+
+    def _check_process_is_sw(self, process_tree, pid, software_processes, used_pids):
+        process = process_tree[pid]
         if not process['cmdline']:
             return False
-        if re.search(self.software_config['cmd_regexp'], process['cmdline'], re.IGNORECASE):
+        if self._cmd_matcher.search(self.software_config['cmd_regexp'], process['cmdline']):
             if self.software_config['process_type'] == 'child':
-                process_to_append = hierarchical_processes_by_pid[str(process['ppid'])]
+                pid_to_append = str(process['ppid'])
             else:
-                process_to_append = process
+                pid_to_append = pid
+            # The detected software gets its own copy, since it is modified by the detector and the plugins
+            process_to_append = process_tree.copy(pid_to_append)
             # Detected process and children processes should not be used to detect other software
-            used_pids.add(process_to_append['pid'])
-            self._children_pids(process_to_append, used_pids)
-            # used_pids.update(x['pid'] for x in process_to_append.get('children', []))
+            used_pids.add(pid_to_append)
+            used_pids.update(process_tree.descendants(pid_to_append))
             software_processes.append({
                 'type': self.software_config['name'],
                 'process': process_to_append
@@ -167,21 +180,21 @@ class GenericDetector:
         return package_list
 
     @staticmethod
-    def _get_related_pids_for_process(sw_process, process_by_pid):
+    def _get_related_pids_for_process(sw_process, process_tree):
         pids = [sw_process['pid']] + [x['pid'] for x in sw_process.get('children', [])]
-        parent = sw_process['ppid']
-        while int(parent) > 1:
+        for parent in process_tree.ancestors(sw_process['pid']):
+            if int(parent) <= 1:
+                break
             pids.append(parent)
-            parent = process_by_pid[parent]['ppid']
         return pids
 
-    def fill_docker_info(self, dockers, process_by_pid):
+    def fill_docker_info(self, dockers, process_tree):
         for container in dockers.get('containers', []):
             docker_pid = container.get('State', {}).get('Pid')
             if docker_pid:
                 for sw in self._result:
                     process = sw['process']
-                    related_pids = self._get_related_pids_for_process(process, process_by_pid)
+                    related_pids = self._get_related_pids_for_process(process, process_tree)
                     if str(docker_pid) in related_pids:
                         exposed_ports = container['Config'].get('ExposedPorts', {})
                         # All docker data exposed to be usable from plugins.
@@ -197,7 +210,7 @@ class GenericDetector:
                         }
                         # Listening ports of all related pids are included
                         for pid in related_pids:
-                            sw['listening_ports'].extend(process_by_pid[pid].get('listening_ports', []))
+                            sw['listening_ports'].extend(process_tree[pid].get('listening_ports', []))
                         sw['listening_ports'] = sorted(list(set(sw['listening_ports'])))
                         # # If no port is available from host network, no port is mapped with host
                         # # but is the only port available so we assign to the port.
@@ -269,19 +282,75 @@ class ActionModule(ActionBase):
             dockers=dict(type='dict', required=False),
             pre_tasks=dict(type='list', elements='dict', required=False),
             post_tasks=dict(type='list', elements='dict', required=False),
+            instance_workers=dict(type='int', required=False, default=1),
+            remote_helper=dict(type='bool', required=False, default=False),
         )
         super(ActionModule, self).__init__(task, connection, play_context, loader, templar, shared_loader_obj)
+        # The same expressions are templated for every instance and host, so they are compiled only once. The
+        # templar is copied, so the environment it shares with the rest of Ansible is not changed.
+        if isinstance(self._templar, Templar):
+            try:
+                self._templar = copy_with_compiled_templates(self._templar)
+            except AttributeError:
+                pass
         self._conditional = Conditional(self._loader)
         self._host = None
         self._current_loop_vars = {}
+        # Plans of the task lists and included files, compiled once per run and shared with the instance copies
+        self._plans = {}
+        self._include_plans = {}
+        # `when` conditions compiled for the environment of the templar, by condition
+        self._conditions = {}
+        # Plugins and parsers used in this run, reused by every task that uses them
+        self._instance_pool = InstancePool()
+        # Validated args without templates, by args object and plugin class
+        self._validated_args = {}
+        # Results of lookups in the target host that don't change during the run, by plugin name
+        self._run_caches = {}
+        # Only set when the plugins of several instances are executed at the same time
+        self._module_lock = None
+        # Only set when the remote helper answers the modules it can replace
+        self._remote_helper = None
 
     def execute_module(self, module_name=None, module_args=None, tmp=None, task_vars=None, persist_files=False,
                        delete_remote_tmp=None, wrap_async=False):
         # Make method public
+        if is_cancelled():
+            raise AnsibleRuntimeError("Module '{0}' not executed since the plugin has been cancelled due to its timeout"
+                                      .format(module_name))
+        if self._module_lock is not None and self._serialize_modules(wrap_async):
+            with self._module_lock:
+                return self._execute_module_or_helper(module_name, module_args, tmp, task_vars, persist_files,
+                                                      delete_remote_tmp, wrap_async)
+        return self._execute_module_or_helper(module_name, module_args, tmp, task_vars, persist_files,
+                                              delete_remote_tmp, wrap_async)
+
+    def _serialize_modules(self, wrap_async):
+        """
+        Whether the modules of instances executed at the same time must be executed one at a time: without
+        pipelining they are transferred to the remote tmp dir shared by all the instances, and connections other
+        than ssh and local are not safe for concurrent commands.
+        """
+        return not self._is_pipelining_enabled('new', wrap_async) \
+            or getattr(self._connection, 'transport', None) not in CONCURRENT_TRANSPORTS
+
+    def _execute_module_or_helper(self, module_name, module_args, tmp, task_vars, persist_files, delete_remote_tmp,
+                                  wrap_async):
+        if self._remote_helper is not None:
+            result = self._remote_helper.execute_module(self, module_name, module_args, wrap_async)
+            if result is not None:
+                return result
         return super(ActionModule, self)._execute_module(module_name=module_name, module_args=module_args,
                                                          tmp=tmp, task_vars=task_vars, persist_files=persist_files,
                                                          delete_remote_tmp=delete_remote_tmp, wrap_async=wrap_async)
 
+    def get_run_cache(self, name):
+        """
+        Return the cache of the plugin with the name for this run, an empty dict the first time. The action module
+        runs for a single host, so cached results are shared by all its instances and dropped when the run ends.
+        """
+        return self._run_caches.setdefault(name, {})
+
     def run(self, tmp=None, task_vars=None):
         # individual modules might disagree but as the generic the action plugin, pass at this point.
         self._supports_check_mode = True
@@ -302,6 +371,9 @@ class ActionModule(ActionBase):
                 dockers = params.get('dockers')
                 pre_tasks = params.get('pre_tasks')
                 post_tasks = params.get('post_tasks')
+                instance_workers = params.get('instance_workers') or 1
+                if params.get('remote_helper'):
+                    self._remote_helper = RemoteHelper.create(self, task_vars)
                 include_software = params.get('include_software')
                 exclude_software = params.get('exclude_software') or []
                 if include_software is None or "all" in include_software:
@@ -316,7 +388,8 @@ class ActionModule(ActionBase):
                                                 dockers=dockers,
                                                 task_vars=task_vars,
                                                 pre_tasks=pre_tasks,
-                                                post_tasks=post_tasks)
+                                                post_tasks=post_tasks,
+                                                instance_workers=instance_workers)
                 result['ansible_facts'] = {'software': sw_info}
 
         return result
@@ -433,23 +506,14 @@ class ActionModule(ActionBase):
         packages.sort(key=lambda x: x['name'] if x['name'] is not None else '')
         packages.sort(key=lambda x: x['version'] if x['version'] is not None else '')
 
-    @staticmethod
-    def _get_children_pids(children_processes):
-        p = []
-        for process in children_processes:
-            p.append(process['pid'])
-            children_processes = process.get("children", [])
-            if children_processes:
-                p.extend(ActionModule._get_children_pids(children_processes))
-        return p
-
     def process_software(self, software_list, processes, tcp_listen, udp_listen, packages=None, dockers=None,
-                         task_vars=None, pre_tasks=None, post_tasks=None):
+                         task_vars=None, pre_tasks=None, post_tasks=None, instance_workers=1):
         processes_by_pid = self._prepare_processes(processes)
         self._adjust_ports_from_docker(processes, dockers, tcp_listen, udp_listen)
         self._add_listening_ports_to_processes(processes_by_pid, tcp_listen + udp_listen)
         result = []
-        processes_left = deepcopy(processes_by_pid)
+        process_tree = ProcessTree(processes_by_pid)
+        cmd_matcher = CmdMatcher([x['cmd_regexp'] for x in software_list if 'cmd_regexp' in x])
         task_vars = {} if task_vars is None else task_vars
         _task_vars = task_vars.copy()
         for software_config in software_list:
@@ -458,19 +522,24 @@ class ActionModule(ActionBase):
 
             # TODO: Allow using a custom detector depending on the software
             detector = GenericDetector(software_config)
-            used_pids = detector.fill_process_info(processes_left)
-            processes_left = dict((pid, x) for pid, x in iteritems(processes_left) if pid not in used_pids)
+            used_pids = detector.fill_process_info(process_tree, cmd_matcher)
+            process_tree.claim(used_pids)
             detector.fill_global_listening_ports_and_bindings()
             detector.remove_listening_ports_objects()
             if packages:
                 pkg_list = detector.fill_software_packages(packages)  # Keep data to use for getting sw version
                 detector.fill_versions_from_packages(pkg_list)
             if dockers:
-                detector.fill_docker_info(dockers, processes_by_pid)
+                detector.fill_docker_info(dockers, process_tree)
                 detector.fill_versions_from_docker()
             software_instances = detector.get_software()
+            concurrent = instance_workers > 1 and len(software_instances) > 1
+            if concurrent:
+                self._execute_plugins_concurrently(software_config, software_instances, task_vars, pre_tasks,
+                                                   post_tasks, instance_workers)
             for instance in software_instances:
-                self._execute_plugins(software_config, instance, task_vars, pre_tasks, post_tasks)
+                if not concurrent:
+                    self._execute_plugins(software_config, instance, task_vars, pre_tasks, post_tasks)
                 if 'discovery_time' not in instance:
                     # Method to send time as iso format compatible with python 2.6 and not using external libs.
                     if time.daylight == 0:
@@ -483,10 +552,9 @@ class ActionModule(ActionBase):
                 self._adjust_version(instance)
                 self._adjust_packages(instance)
                 if instance.get('NOT_A_REAL_SOFTWARE_REMOVE_FROM_LIST', False):
-                    recover_processes = [instance["process"]['pid']]
-                    recover_processes.extend(ActionModule._get_children_pids(instance["process"].get('children', [])))
-                    processes_left.update({x: y for x, y in iteritems(processes_by_pid) if x in recover_processes})
-                    processes_left = {k: processes_left[k] for k in sorted(processes_left, key=int)}
+                    # Processes of the instance are available again for the next software definitions
+                    process_tree.release(process_tree.descendants(instance['process']['pid']))
+                    process_tree.release([instance['process']['pid']])
                 else:
                     result.append(instance)
             detector.clear_data()
@@ -496,60 +564,107 @@ class ActionModule(ActionBase):
             task_vars.update(_task_vars)
         return result
 
-    @staticmethod
-    def run_plugin(plugin, args, attributes, software_instance, wait_event, storage):
-        try:
-            plugin_result = plugin.run(args, attributes, software_instance)
-            storage.result = plugin_result
-        except SystemExit:
-            pass
-        except Exception as e:
-            storage.exception = e
-        finally:
-            wait_event.set()
-
-    @staticmethod
-    def _parse_plugin_definition(plugin):
-        desc = None
-        name = None
-        args = {}
-        attributes = {}
-        for k, v in iteritems(plugin):
-            if k == 'name':
-                desc = v
-            elif k in PLUGIN_MODIFIER_KEYS:
-                attributes[k] = v
-            elif isinstance(v, (dict, list)):
-                name = k
-                args = v
-            else:
-                raise AnsibleRuntimeError("Unsupported attribute '{0}' for plugin definition '{1}'"
-                                          .format(k, str(plugin)))
-        if desc is None:
-            desc = name
-        return name, desc, args, attributes
+    def _get_plan(self, tasks):
+        """
+        Return the plan of a list of plugin definitions, compiled the first time the list is executed in this run.
+        """
+        if not tasks:
+            return ()
+        # The list is kept with its plan, so its id cannot be reused by another list during the run
+        plan = self._plans.get(id(tasks))
+        if plan is None or plan[0] is not tasks:
+            plan = self._plans[id(tasks)] = (tasks, compile_plan(tasks))
+        return plan[1]
+
+    def _get_include_plan(self, include_file_path, desc):
+        if include_file_path not in self._include_plans:
+            # Files already parsed by a previous run of the worker are used if they have not changed
+            identity = include_plan_cache.identity(include_file_path)
+            plan = include_plan_cache.get(include_file_path, identity)
+            if plan is None:
+                plugins_to_include = self.get_plugins_from_file(include_file_path, desc)
+                if not isinstance(plugins_to_include, list):
+                    return plugins_to_include
+                plan = compile_plan(freeze(plugins_to_include))
+                include_plan_cache.set(include_file_path, identity, plan)
+            self._include_plans[include_file_path] = plan
+        return self._include_plans[include_file_path]
 
     def _execute_plugins(self, software_config, software_instance, task_vars, pre_tasks=None, post_tasks=None):
         self._display_v("Executing custom plugins for software type '{0}'".format(software_config['name']))
-        if pre_tasks is None:
-            pre_tasks = []
-        if post_tasks is None:
-            post_tasks = []
         task_vars['__instance__'] = software_instance
-        for task in pre_tasks:
+        for task in self._get_plan(pre_tasks):
             self._execute_plugin(task, software_instance, task_vars)
-        for task in software_config.get('custom_tasks', []):
+        for task in self._get_plan(software_config.get('custom_tasks')):
             self._execute_plugin(task, software_instance, task_vars)
-        for task in post_tasks:
+        for task in self._get_plan(post_tasks):
             self._execute_plugin(task, software_instance, task_vars)
 
+    def _copy_for_instance(self, task_vars):
+        """
+        Return a copy of this action module to execute the plugins of an instance at the same time as other
+        instances. The copy has its own task (environment), templar (bound to `task_vars`) and loop vars.
+        """
+        try:
+            templar = copy_with_compiled_templates(self._templar, available_variables=task_vars)
+        except AttributeError:
+            templar = Templar(loader=self._loader, variables=task_vars)
+        action_module = self.__class__(self._task.copy(), self._connection, self._play_context, self._loader,
+                                       templar, self._shared_loader_obj)
+        action_module._host = self._host
+        action_module._module_lock = self._module_lock
+        action_module._plans = self._plans
+        action_module._include_plans = self._include_plans
+        action_module._run_caches = self._run_caches
+        action_module._remote_helper = self._remote_helper
+        return action_module
+
+    def _detach_plugin(self, plugin):
+        """
+        Return a copy of the plugin bound to its own copy of this action module, so the task (environment), the
+        templar, the task vars and the pool of plugin and parser instances it uses are not shared with the next
+        tasks. The connection, the module lock and the run caches are still shared.
+        """
+        if not isinstance(plugin, SoftwareFactsPlugin):
+            return plugin
+        task_vars = dict(plugin._task_vars or {})
+        detached = copy(plugin)
+        SoftwareFactsPlugin.__init__(detached, self._copy_for_instance(task_vars), task_vars)
+        return detached
+
+    def _execute_plugins_concurrently(self, software_config, software_instances, task_vars, pre_tasks, post_tasks,
+                                      workers):
+        """
+        Execute the plugins of the instances in a pool of `workers` threads. Every instance gets its own copy of
+        `task_vars`, so `__instance__`, loop vars and registered results of one instance are not seen by the others.
+        """
+        self._module_lock = threading.Lock()
+
+        def execute_instance_plugins(instance):
+            instance_vars = task_vars.copy()
+            action_module = self._copy_for_instance(instance_vars)
+            action_module._execute_plugins(software_config, instance, instance_vars, pre_tasks, post_tasks)
+
+        pool = ThreadPool(min(workers, len(software_instances)))
+        try:
+            pool.map(execute_instance_plugins, software_instances)
+        finally:
+            pool.close()
+            pool.join()
+            self._module_lock = None
+
     def _execute_plugin(self, plugin, software_instance, task_vars, in_block=None):
-        name, desc, args, attributes = self._parse_plugin_definition(plugin)
+        step = plugin if isinstance(plugin, PlanStep) else PlanStep(plugin)
+        if step.definition_error is not None:
+            raise copy(step.definition_error)
+        if step.wrong_attribute is not None:
+            raise AnsibleRuntimeError("Unsupported attribute '{0}' for plugin definition '{1}'"
+                                      .format(step.wrong_attribute, str(plugin)))
+        name, desc, args, attributes = step.name, step.desc, step.args, step.attributes
         if name in ('block', 'include_tasks'):
             plugin = None
-            if 'register' in attributes:
+            if step.ignored_register:
                 display.warning("Ignoring 'register' attribute for plugin '{0}'".format(name))
-                del attributes['register']
         else:
             plugin = self._get_software_facts_plugin(name, self, task_vars, desc)
 
@@ -582,7 +697,9 @@ class ActionModule(ActionBase):
                     item_result_holder[loop_var] = item
                     plugin_execution_data['results'].append(item_result_holder)  # noqa
                 try:
-                    self._execute_plugin_for_item_if_applies(args, attributes, desc, in_block, item,
+                    # Plugins of a block are executed from their plan
+                    self._execute_plugin_for_item_if_applies(args if step.steps is None else step.steps,
+                                                             attributes, desc, in_block, item,
                                                              name, plugin, item_result_holder,
                                                              software_instance, task_vars, index)
                 finally:
@@ -655,7 +772,7 @@ class ActionModule(ActionBase):
                                                   "'include_tasks' plugin '{0}'"
                                                   .format(desc))
                     include_file_path = os.path.abspath(include_file_path)  # noqa
-                    plugins_to_include = self.get_plugins_from_file(include_file_path, desc)
+                    plugins_to_include = self._get_include_plan(include_file_path, desc)
                 except Exception as e:
                     item_result_holder.update(dict(failed=True, msg=str(e), exception=traceback.format_exc()))
                     raise
@@ -664,7 +781,7 @@ class ActionModule(ActionBase):
             if plugins_to_include is not None:
                 item_result_holder['result'] = None
                 try:
-                    if not isinstance(plugins_to_include, list):
+                    if not isinstance(plugins_to_include, (list, tuple)):
                         raise AnsibleRuntimeError("'{1}' plugin '{0}' needs a list of plugins as argument"
                                                   .format(desc, name))
                     else:
@@ -723,54 +840,71 @@ class ActionModule(ActionBase):
     def _execute_plugin_for_item_async(self, args, attributes, desc, in_block, item, item_result_holder, name, plugin,
                                        software_instance, timeout, index=0):
         # Resolve everything using __instance__ e __item__ (loop_var)
-        item_args = plugin.validate_args(self._replace_instance_vars(args))
+        item_args = self._validate_args(plugin, args)
         item_attributes = self._replace_instance_vars(attributes)
-        wait_event = threading.Event()
-        storage = ThreadStorage()
-        plugin_run_thread = threading.Thread(target=self.run_plugin, args=(plugin,
-                                                                           item_args,
-                                                                           item_attributes,
-                                                                           software_instance,
-                                                                           wait_event,
-                                                                           storage))
-        plugin_run_thread.start()
-        if timeout:
-            self._display_v("Enabled timeout of {0} seconds for task '{1}'{3}{2}".format(
-                timeout, desc, " with item index {0}".format(index) if item is not None else "",
-                " in block '{0}'".format(in_block) if in_block else ""))
-            finished = wait_event.wait(timeout)
-            if not finished:
-                raise_exception_in_thread(plugin_run_thread, SystemExit)
-                self._display_v(
-                    "Killed due to timeout of '{0}' seconds task '{1}'{3}{2}".format(
-                        timeout, desc,
-                        " with item index {0}".format(index) if item is not None else "",
-                        " in block '{0}'".format(in_block) if in_block else ""))
-                raise AnsibleRuntimeError("Plugin '{0}' timeout for task '{1}'{3}{2}".format(
-                    name, desc,
-                    " with item index {0}".format(index) if item is not None else "",
-                    " in block '{0}'".format(in_block) if in_block else ""))
+        item_desc = "{0}{1}".format(" in block '{0}'".format(in_block) if in_block else "",
+                                    " with item index {0}".format(index) if item is not None else "")
+        timeout_msg = "Plugin '{0}' timeout for task '{1}'{2}"
+        if timeout and getattr(plugin, 'IO_BOUND', True):
+            # Plugins waiting for the target host are executed in a thread of the executor, so the wait can
+            # be abandoned. They cannot be interrupted, so they are cancelled: they fail when they try to
+            # execute another module and their result is discarded. As they may still be running while the
+            # next tasks are executed, they use their own copies of the task, templar and instance.
+            self._display_v("Enabled timeout of {0} seconds for task '{1}'{2}".format(timeout, desc, item_desc))
+            plugin_call = plugin_executor.submit(self._detach_plugin(plugin).run, item_args, item_attributes,
+                                                 deepcopy(software_instance))
+            if not plugin_call.wait(timeout):
+                plugin_call.cancel()
+                # The plugin instance, and the parsers it created, are not reused by the next tasks
+                self._instance_pool.discard(plugin)
+                self._display_v("Cancelled due to timeout of '{0}' seconds task '{1}'{2}".format(timeout, desc,
+                                                                                                 item_desc))
+                raise AnsibleRuntimeError(timeout_msg.format(name, desc, item_desc))
+            if plugin_call.exception:
+                self._display_v("Exception while executing plugin '{0}' error task '{1}'{2}".format(name, desc,
+                                                                                                    item_desc))
+                raise plugin_call.exception
+            result = plugin_call.result
         else:
-            plugin_run_thread.join()
-        if storage.exception:
-            self._display_v(
-                "Exception while executing plugin '{0}' error task '{1}'{3}{2}".format(
-                    name, desc,
-                    " with item index {0}".format(index) if item is not None else "",
-                    " in block '{0}'".format(in_block) if in_block else ""))
-            raise storage.exception
-        result = storage.result
+            # Plugins without timeout, or not accessing the target host, are executed in the caller thread.
+            # The latter fail once they finish if they exceeded the timeout.
+            start = time.time()
+            result = plugin.run(item_args, item_attributes, software_instance)
+            if timeout and time.time() - start > timeout:
+                raise AnsibleRuntimeError(timeout_msg.format(name, desc, item_desc))
         if result is not None:
             if not isinstance(result, dict):
                 result = {'result': result}
             item_result_holder.update(result)
 
+    def _validate_args(self, plugin, args):
+        """
+        Return the validated args for the plugin. Args without templates are the same for every instance and
+        loop item so, when the validation of the plugin only depends on them, they are validated once per run.
+        """
+        cacheable = isinstance(plugin, SoftwareFactsPlugin) \
+            and (plugin.STATIC_ARGS_VALIDATION or get_unbound_function(type(plugin).validate_args) is
+                 get_unbound_function(SoftwareFactsPlugin.validate_args))
+        if cacheable:
+            # The args are kept with the result, so their id cannot be reused by other args during the run
+            key = (id(args), type(plugin))
+            cached = self._validated_args.get(key)
+            if cached is not None and cached[0] is args:
+                return deepcopy(cached[1])
+        item_args = plugin.validate_args(self._replace_instance_vars(args))
+        if cacheable and is_template_free(args):
+            self._validated_args[key] = (args, deepcopy(item_args))
+        return item_args
+
     def _replace_instance_vars(self, data):
         if isinstance(data, text_type):
+            source = to_jinja_source(data)
+            if source is None:
+                return data
             if _TEMPLAR_HAS_TEMPLATE_CACHE:
-                return self._templar.template(data.replace('<<', '{{').replace('>>', '}}'), cache=False)
+                return self._templar.template(source, cache=False)
             else:
-                return self._templar.template(data.replace('<<', '{{').replace('>>', '}}'))
+                return self._templar.template(source)
         elif isinstance(data, binary_type):
             return self._replace_instance_vars(to_text(data))
         elif isinstance(data, list):
@@ -806,11 +940,21 @@ class ActionModule(ActionBase):
         if isinstance(conditions, text_type):
             conditions = [conditions]
         for condition in conditions:
-            self._conditional.when = [condition]
-            test_result = self._conditional.evaluate_conditional(templar=self._templar, all_vars=all_vars)
+            try:
+                compiled_condition = self._conditions[condition]
+            except KeyError:
+                compiled_condition = self._conditions[condition] = compile_condition(condition, self._templar)
+            except TypeError:
+                compiled_condition = None
+            if compiled_condition is not None:
+                try:
+                    test_result = compiled_condition.evaluate(self._templar, all_vars)
+                except Exception:
+                    # Ansible evaluates it again to raise its usual errors
+                    compiled_condition = None
+            if compiled_condition is None:
+                self._conditional.when = [condition]
+                test_result = self._conditional.evaluate_conditional(templar=self._templar, all_vars=all_vars)
             if not test_result:
                 return False
         return True
-
-
-PLUGIN_MODIFIER_KEYS = ['loop', 'register', 'when', 'ignore_errors', 'loop_control', 'environment', 'timeout', 'vars']
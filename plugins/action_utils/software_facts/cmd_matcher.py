@@ -0,0 +1,102 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def _literal_runs(subpattern):
+    """
+    Return the alternatives of literal text of which at least one must appear in any string matched
+    by the parsed pattern, choosing the most selective ones, or None if no such text is found.
+    """
+    candidates = []
+    run = []
+    for op, av in subpattern:
+        if op == sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            candidates.append([''.join(run)])
+            run = []
+        if op == sre_parse.SUBPATTERN:
+            candidates.append(_literal_runs(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            candidates.append(_literal_runs(av[2]))
+        elif op == sre_parse.BRANCH:
+            alternatives = []
+            for branch in av[1]:
+                branch_literals = _literal_runs(branch)
+                if branch_literals is None:
+                    alternatives = None
+                    break
+                alternatives.extend(branch_literals)
+            candidates.append(alternatives)
+    if run:
+        candidates.append([''.join(run)])
+    candidates = [c for c in candidates if c]
+    if not candidates:
+        return None
+    # The shortest text of each alternative set limits how many strings it discards
+    return max(candidates, key=lambda c: min(len(x) for x in c))
+
+
+class CmdMatcher(object):
+    """
+    Matches command lines against the `cmd_regexp` of all the software definitions at once.
+
+    Patterns are compiled once and every distinct command line is evaluated against all of them
+    in a single pass, remembering the patterns it matches. Before running a regular expression,
+    the command line is checked for the literal text the pattern requires, which discards most
+    of the patterns with a plain substring search.
+
+    The matcher only answers which patterns match a command line. Detection order and priority
+    are still given by the order of the software definitions.
+    """
+
+    def __init__(self, patterns):
+        self._patterns = []
+        self._known_patterns = set()
+        self._matches = {}
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern):
+        if pattern in self._known_patterns:
+            return
+        try:
+            literals = _literal_runs(sre_parse.parse(pattern, re.IGNORECASE))
+        except Exception:
+            literals = None
+        self._patterns.append((pattern, re.compile(pattern, re.IGNORECASE), literals))
+        self._known_patterns.add(pattern)
+        self._matches.clear()
+
+    def matches(self, cmdline):
+        """Return the set of patterns found in the command line."""
+        if cmdline not in self._matches:
+            # Case insensitive matching may match non ASCII chars with ASCII literals
+            lower_cmdline = None if _NON_ASCII.search(cmdline) else cmdline.lower()
+            matched = set()
+            for pattern, regexp, literals in self._patterns:
+                if lower_cmdline is not None and literals is not None \
+                        and not any(literal in lower_cmdline for literal in literals):
+                    continue
+                if regexp.search(cmdline):
+                    matched.add(pattern)
+            self._matches[cmdline] = frozenset(matched)
+        return self._matches[cmdline]
+
+    def search(self, pattern, cmdline):
+        """Return whether the pattern is found in the command line."""
+        self.add(pattern)
+        return pattern in self.matches(cmdline)
@@ -0,0 +1,62 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.module_utils.six import string_types
+from jinja2 import Environment
+
+try:
+    from ansible.template.vars import AnsibleJ2Vars
+except ImportError:
+    AnsibleJ2Vars = None
+
+# Conditions with templates are resolved by ansible before being evaluated, so they are not compiled
+_TEMPLATE_MARKERS = ('{{', '{%', '{#')
+
+_RESULT_VAR = '__software_facts_condition__'
+
+
+class CompiledCondition(object):
+    """
+    `when` condition compiled once into a jinja2 template that only assigns its value.
+
+    The template is rendered with the same variable storage used by ansible templar, so nested
+    templates in the variables are resolved as when the condition is evaluated by ansible. The
+    result is the truth value of the expression, as ansible computes it.
+    """
+
+    def __init__(self, condition, environment):
+        self.condition = condition
+        self._template = environment.from_string(u'{%% set %s = (%s) %%}' % (_RESULT_VAR, condition))
+
+    def evaluate(self, templar, all_vars):
+        templar.available_variables = all_vars
+        context = self._template.new_context(AnsibleJ2Vars(templar, self._template.globals), shared=True)
+        # Lookups and filters executed by the condition may use the context of the templar
+        cached_context = getattr(templar, 'cur_context', None)
+        templar.cur_context = context
+        try:
+            for _ in self._template.root_render_func(context):
+                pass
+        finally:
+            templar.cur_context = cached_context
+        return bool(context.vars[_RESULT_VAR])
+
+
+def compile_condition(condition, templar):
+    """
+    Return the condition compiled for the environment of the templar, or None if it cannot be compiled
+    and has to be evaluated by ansible: it is not a string, it contains templates, it has syntax errors
+    or the templar has no jinja2 environment.
+    """
+    environment = getattr(templar, 'environment', None)
+    if AnsibleJ2Vars is None or not isinstance(environment, Environment) \
+            or not isinstance(condition, string_types) or not condition \
+            or any(marker in condition for marker in _TEMPLATE_MARKERS):
+        return None
+    try:
+        return CompiledCondition(condition, environment)
+    except Exception:
+        return None
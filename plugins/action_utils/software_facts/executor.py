@@ -0,0 +1,112 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+
+from ansible.module_utils.six.moves import queue
+
+# Maximum number of threads of the executor. Plugins submitted when all of them are busy wait for one to be idle.
+MAX_THREADS = 32
+
+_local = threading.local()
+
+
+class PluginCall(object):
+    """Execution of a plugin in a thread of the executor, that the caller waits for."""
+
+    def __init__(self, func, args):
+        self._func = func
+        self._args = args
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self.cancelled = False
+        self.result = None
+        self.exception = None
+
+    def run(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self._started = True
+        try:
+            self.result = self._func(*self._args)
+        except BaseException as e:
+            # Also SystemExit and the like, so the caller gets them instead of an empty result
+            self.exception = e
+        finally:
+            self._finished.set()
+
+    def wait(self, timeout=None):
+        """Wait for the call to finish. Return False if it has not finished after `timeout` seconds."""
+        return self._finished.wait(timeout)
+
+    def cancel(self):
+        """
+        Mark the call as cancelled. The plugin is not interrupted, but it will fail as soon as it
+        tries to execute a new module (see `is_cancelled`) and its result is discarded. A call not
+        started yet is never executed.
+        """
+        with self._lock:
+            self.cancelled = True
+            if not self._started:
+                self._finished.set()
+
+
+class PluginExecutor(object):
+    """
+    Threads reused to execute the plugins that have a timeout.
+
+    A thread is only started when no other one is available and there are less than `max_threads`,
+    otherwise the call waits for a thread to finish its current one. Threads are daemon ones, so they
+    don't prevent the process from ending.
+    """
+
+    def __init__(self, max_threads=MAX_THREADS):
+        self._calls = queue.Queue()
+        self._lock = threading.Lock()
+        self._max_threads = max_threads
+        self._threads = 0
+        # Threads not executing a call and calls not taken by a thread yet
+        self._available = 0
+        self._queued = 0
+
+    def submit(self, func, *args):
+        """Execute `func(*args)` in a thread of the executor and return its `PluginCall`."""
+        call = PluginCall(func, args)
+        with self._lock:
+            self._queued += 1
+            if self._queued > self._available and self._threads < self._max_threads:
+                self._threads += 1
+                self._available += 1
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+        self._calls.put(call)
+        return call
+
+    def _work(self):
+        while True:
+            call = self._calls.get()
+            with self._lock:
+                self._queued -= 1
+                self._available -= 1
+            _local.call = call
+            try:
+                call.run()
+            finally:
+                _local.call = None
+                with self._lock:
+                    self._available += 1
+
+
+def is_cancelled():
+    """Return True if the plugin executing in the current thread has been cancelled due to its timeout."""
+    call = getattr(_local, 'call', None)
+    return call is not None and call.cancelled
+
+
+plugin_executor = PluginExecutor()
@@ -0,0 +1,227 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import ast
+import re
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.common._collections_compat import MutableSequence
+from ansible.module_utils.common.text.converters import to_native
+from jinja2 import Template, TemplateSyntaxError
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.compat.__init__ \
+    import MutableMapping
+
+# Caches are cleared when they reach this number of entries, so paths built from the instance
+# data cannot make them grow without limit
+MAX_ENTRIES = 4096
+
+# Paths made only of names, integers and quoted keys are valid jinja references, so they are not
+# compiled by jinja to be validated
+_PLAIN_PATH = re.compile(r"""
+    (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    (?:
+        \.(?:[A-Za-z_][A-Za-z0-9_]*|0|[1-9][0-9]*)
+        | \[(?:0|[1-9][0-9]*|'[^'\]\\\n]*'|"[^"\]\\\n]*")\]
+    )*
+    \Z""", re.VERBOSE)
+
+# Names that are not variables when a jinja reference starts with them
+_JINJA_KEYWORDS = frozenset(('and', 'block', 'call', 'elif', 'else', 'endblock', 'endcall', 'endfilter',
+                             'endfor', 'endif', 'endmacro', 'endraw', 'endset', 'endwith', 'extends', 'filter',
+                             'for', 'from', 'if', 'import', 'in', 'include', 'is', 'macro', 'not', 'or', 'raw',
+                             'recursive', 'set', 'with'))
+
+_compiled = {}
+_keys = {}
+
+
+def _to_field(text):
+    try:
+        # make numbers numbers
+        return ast.literal_eval(text)
+    except Exception:  # noqa
+        # or strip the quotes
+        return re.sub("['\"]", "", text)
+
+
+def _split(path):
+    """Split a path in dot or bracket notation into its fields, as the update_fact module does."""
+    fields = []
+    position = 0
+    length = len(path)
+    while position < length:
+        # found a '.', move to the next character
+        if path[position] == '.':
+            position += 1
+        # found a '[', take until ']' and then get the next
+        if position < length and path[position] == '[':
+            end = path.find(']', position + 1)
+            if end < 0:
+                end = length
+            fields.append(_to_field(path[position + 1:end]))
+            position = end + 1
+        else:
+            end = position
+            while end < length and path[end] not in '.[':
+                end += 1
+            fields.append(_to_field(path[position:end]))
+            position = end
+    return tuple(fields)
+
+
+def _compile(path):
+    match = _PLAIN_PATH.match(path)
+    if match is None or match.group('name') in _JINJA_KEYWORDS:
+        try:
+            Template("{{" + path + "}}")
+        except TemplateSyntaxError as exc:
+            return None, (
+                "While processing '{path}' found malformed path."
+                " Ensure syntax follows valid jinja format. The error was:"
+                " {error}"
+            ).format(path=path, error=to_native(exc))
+    return _split(path), None
+
+
+def compile_path(path):
+    """
+    Return the fields of a path in dot or bracket notation (`a.b[0]["c"]` is `('a', 'b', 0, 'c')`), compiled
+    once per distinct path. Raise `AnsibleActionFail` if the path is not a valid jinja reference.
+    """
+    try:
+        fields, error = _compiled[path]
+    except KeyError:
+        fields, error = _compile(path)
+        if len(_compiled) >= MAX_ENTRIES:
+            _compiled.clear()
+        _compiled[path] = (fields, error)
+    if error is not None:
+        raise AnsibleActionFail(error)
+    return fields
+
+
+def split_key(key):
+    """Return the fields of a key in dot notation, as used by `del_instance_fact`, split once per distinct key."""
+    try:
+        return _keys[key]
+    except KeyError:
+        pass
+    fields = tuple(key.split('.'))
+    if len(_keys) >= MAX_ENTRIES:
+        _keys.clear()
+    _keys[key] = fields
+    return fields
+
+
+def _invalidate(containers, prefix):
+    """Remove the containers found under the prefix, as the object at the prefix has been replaced."""
+    size = len(prefix)
+    for key in [key for key in containers if key[:size] == prefix]:
+        del containers[key]
+
+
+def _get_container(root, fields, containers):
+    """Return the object at `fields` from `root`, resolving the prefixes shared with previous paths once."""
+    obj = root
+    start = 0
+    for end in range(len(fields), 0, -1):
+        try:
+            obj = containers[fields[:end]]
+            start = end
+            break
+        except (KeyError, TypeError):
+            continue
+    for end in range(start + 1, len(fields) + 1):
+        first = fields[end - 1]
+        try:
+            obj = obj[first]
+        except (KeyError, TypeError):
+            msg = "Error: the key '{first}' was not found " "in {obj}.".format(
+                obj=obj,
+                first=first,
+            )
+            raise AnsibleActionFail(msg)
+        try:
+            containers[fields[:end]] = obj
+        except TypeError:
+            # Unhashable fields are resolved every time
+            pass
+    return obj
+
+
+def _set_value(obj, first, val):
+    """Set the value at `first` in `obj` and return whether it changed."""
+    if isinstance(obj, MutableMapping):
+        if obj.get(first) != val:
+            obj[first] = val
+            return True
+    elif isinstance(obj, MutableSequence):
+        if not isinstance(first, int):
+            msg = (
+                "Error: {obj} is a list, "
+                "but index provided was not an integer: '{first}'"
+            ).format(obj=obj, first=first)
+            raise AnsibleActionFail(msg)
+        if first > len(obj):
+            msg = "Error: {obj} not long enough for item #{first} to be set.".format(
+                obj=obj,
+                first=first,
+            )
+            raise AnsibleActionFail(msg)
+        if first == len(obj):
+            obj.append(val)
+            return True
+        if obj[first] != val:
+            obj[first] = val
+            return True
+    else:
+        msg = "update_fact can only modify mutable objects."
+        raise AnsibleActionFail(msg)
+    return False
+
+
+def set_values(root, updates):
+    """
+    Apply the updates, a list of (fields, value), in order. The objects at the prefixes shared by several
+    paths are looked up once. Return whether any value changed.
+    """
+    changed = False
+    containers = {}
+    for fields, val in updates:
+        obj = _get_container(root, fields[:-1], containers)
+        if _set_value(obj, fields[-1], val):
+            changed = True
+            _invalidate(containers, fields)
+    return changed
+
+
+def delete_values(root, paths):
+    """
+    Delete the values at the paths, a list of fields, that are found and return the indexes of the
+    paths deleted. A field is found in an object if it is `in` it, as for `del_instance_fact` keys.
+    """
+    deleted = []
+    containers = {}
+    for i, fields in enumerate(paths):
+        obj = root
+        start = 0
+        for end in range(len(fields) - 1, 0, -1):
+            if fields[:end] in containers:
+                obj = containers[fields[:end]]
+                start = end
+                break
+        for end in range(start + 1, len(fields)):
+            if fields[end - 1] in obj:
+                obj = containers[fields[:end]] = obj[fields[end - 1]]
+            else:
+                obj = None
+                break
+        if obj and fields[-1] in obj:
+            del obj[fields[-1]]
+            _invalidate(containers, fields)
+            deleted.append(i)
+    return deleted
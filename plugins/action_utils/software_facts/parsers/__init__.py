@@ -6,7 +6,37 @@ from ansible.utils.display import Display
 display = Display()
 
 
+def iter_records(chunks, separator=None):
+    """
+    Yield the records of a text provided in chunks of any size, split by the separator (not included), or
+    split into lines as `str.splitlines` does if no separator is given.
+    """
+    pending = ''
+    for chunk in chunks:
+        text = pending + chunk
+        if separator is not None:
+            records = text.split(separator)
+            pending = records.pop()
+            for record in records:
+                yield record
+            continue
+        records = text.splitlines(True)
+        pending = ''
+        # The last line is not complete without its line break, and a '\r' may be followed by '\n' in the next chunk
+        if records and (records[-1].endswith('\r') or records[-1].splitlines()[0] == records[-1]):
+            pending = records.pop()
+        for record in records:
+            yield record.splitlines()[0]
+    if pending:
+        yield pending if separator is not None else pending.splitlines()[0]
+
+
 class SoftwareFactsParser(with_metaclass(ABCMeta, object)):
+
+    # Parsers that implement `parse_chunks`, so a file can be parsed while its content is decoded,
+    # without building the whole text
+    STREAMING = False
+
     def __init__(self, action_module, task_vars):
         self._action_module = action_module
         self._task_vars = task_vars
@@ -35,6 +65,14 @@ class SoftwareFactsParser(with_metaclass(ABCMeta, object)):
     def parse(self, source, config=None, path_prefix=''):  # noqa
         return None
 
+    def parse_chunks(self, chunks, config=None, path_prefix=''):
+        """
+        Parse a text provided as an iterable of chunks. `validate_input` is not called for it, as the text is
+        not available. Streaming parsers may stop consuming the chunks as soon as they have their result. The chunks
+        are decoded from content already read, so streaming saves building the whole text, not reading it.
+        """
+        return self.parse(''.join(chunks), config, path_prefix)
+
     def _execute_module(self, module_name=None, module_args=None, task_vars=None,
                         persist_files=False, wrap_async=False):
         return self._action_module.execute_module(module_name=module_name, module_args=module_args,
@@ -5,15 +5,19 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.parsers.__init__ \
-    import SoftwareFactsParser
+    import SoftwareFactsParser, iter_records
 
 
 class Parser(SoftwareFactsParser):
 
+    STREAMING = True
+
     def validate_input(self, source, config):
         pass
 
     def parse(self, source, config=None, path_prefix=''):
+        if config and (config.get('keys') or config.get('stop_on_first')):
+            return self.parse_chunks([source.strip()], config, path_prefix)
         env = {}
         envvars = source.strip().split("\x00")
         for var in envvars:
@@ -22,3 +26,22 @@ class Parser(SoftwareFactsParser):
                 key, _, value = var.partition('=')
                 env[key] = value
         return env
+
+    def parse_chunks(self, chunks, config=None, path_prefix=''):
+        """
+        Parse the vars one by one. If `keys` are provided, only they are returned, with the last value of each one
+        as `parse` does. With `stop_on_first` the first value of each var is kept instead, so the chunks are no
+        longer consumed once all the `keys` are found.
+        """
+        keys = set((config or {}).get('keys') or [])
+        stop_on_first = (config or {}).get('stop_on_first', False)
+        env = {}
+        for var in iter_records(chunks, '\x00'):
+            if var.strip() != '':
+                key, _, value = var.partition('=')
+                if (keys and key not in keys) or (stop_on_first and key in env):
+                    continue
+                env[key] = value
+                if stop_on_first and keys and len(env) == len(keys):
+                    break
+        return env
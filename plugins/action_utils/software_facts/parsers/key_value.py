@@ -9,7 +9,7 @@ import re
 from ansible.utils.display import Display
 
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.parsers.__init__ \
-    import SoftwareFactsParser
+    import SoftwareFactsParser, iter_records
 
 REMOVE_COMMENTS_REGEX = r"(?m)\s*<delimiter>.*$"
 EXTRACT_KEY_VALUE_REGEX = r"(\b[\w\-\ ]+)\s*=\s*(.*?(?=\s\w+= |$))"
@@ -19,6 +19,8 @@ display = Display()
 
 class Parser(SoftwareFactsParser):
 
+    STREAMING = True
+
     def validate_input(self, source, config):
         pass
 
@@ -51,6 +53,8 @@ class Parser(SoftwareFactsParser):
         #     config['separators'] = [char for char in config['separators']]
         # if isinstance(config['comment_delimiters'], text_type):
         #     config['comment_delimiters'] = [char for char in config['comment_delimiters']]
+        if config.get('keys') or config.get('stop_on_first'):
+            return self.parse_chunks([source], config, path_prefix)
         result = {}
         for comment_delimiter in config['comment_delimiters']:
             source = self.remove_comments(source, comment_delimiter)
@@ -59,3 +63,29 @@ class Parser(SoftwareFactsParser):
             if key:
                 result[key.strip("'")] = value.strip("'")
         return result
+
+    def parse_chunks(self, chunks, config=None, path_prefix=''):
+        """
+        Parse the text line by line. If `keys` are provided, only they are returned, with the last value of each one
+        as `parse` does. With `stop_on_first` the first value of each key is kept instead, so the chunks are no
+        longer consumed once all the `keys` are found.
+        """
+        if config is None:
+            config = {}
+        config.setdefault('separators', ['='])
+        config.setdefault('comment_delimiters', ['#'])
+        keys = set(config.get('keys') or [])
+        stop_on_first = config.get('stop_on_first', False)
+        result = {}
+        for line in iter_records(chunks):
+            for comment_delimiter in config['comment_delimiters']:
+                line = self.remove_comments(line, comment_delimiter)
+            key, value = self.extract_key_value(line, config['separators'])
+            if key:
+                key = key.strip("'")
+                if (keys and key not in keys) or (stop_on_first and key in result):
+                    continue
+                result[key] = value.strip("'")
+                if stop_on_first and keys and len(result) == len(keys):
+                    break
+        return result
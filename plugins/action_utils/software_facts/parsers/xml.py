@@ -9,7 +9,7 @@ from ansible.utils.display import Display
 
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.parsers.__init__ \
     import SoftwareFactsParser
-from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.xmltodict import parse
+from ansible_collections.datadope.discovery.plugins.module_utils.xmltodict import parse
 
 display = Display()
 
@@ -0,0 +1,179 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import threading
+from copy import deepcopy
+
+from ansible.module_utils.six import iteritems
+
+PLUGIN_MODIFIER_KEYS = ['loop', 'register', 'when', 'ignore_errors', 'loop_control', 'environment', 'timeout', 'vars']
+
+# Plugins that only contain other plugins
+CONTAINER_PLUGINS = ('block', 'include_tasks')
+
+
+def parse_plugin_definition(plugin):
+    """
+    Return the name, description, args and attributes of a plugin definition, or raise ValueError
+    with the attribute that is not supported.
+    """
+    desc = None
+    name = None
+    args = {}
+    attributes = {}
+    for k, v in iteritems(plugin):
+        if k == 'name':
+            desc = v
+        elif k in PLUGIN_MODIFIER_KEYS:
+            attributes[k] = v
+        elif isinstance(v, (dict, list)):
+            name = k
+            args = v
+        else:
+            raise ValueError(k)
+    if desc is None:
+        desc = name
+    return name, desc, args, attributes
+
+
+class PlanStep(dict):
+    """
+    Plugin definition parsed once, so it can be executed for every instance without parsing it again.
+
+    The step is the definition itself (a read only dict), extended with its parsed parts: `name`, `desc`,
+    `args` and `attributes` and, for `block` plugins, the `steps` of the plugins in the block. A definition
+    that is not valid keeps the attribute not supported in `wrong_attribute`, or the error raised reading a
+    definition that is not a mapping in `definition_error`, so the error is raised when the step is executed,
+    as it happened before definitions were parsed in advance.
+    """
+
+    def __init__(self, definition):
+        self.wrong_attribute = None
+        self.definition_error = None
+        self.steps = None
+        self.ignored_register = False
+        try:
+            iteritems(definition)
+        except Exception as e:
+            super(PlanStep, self).__init__()
+            self.definition_error = e
+            self.name = self.desc = None
+            self.args = self.attributes = None
+            return
+        super(PlanStep, self).__init__(definition)
+        try:
+            self.name, self.desc, self.args, self.attributes = parse_plugin_definition(definition)
+        except ValueError as e:
+            self.wrong_attribute = e.args[0]
+            self.name = self.desc = None
+            self.args = self.attributes = None
+            return
+        if self.name in CONTAINER_PLUGINS and 'register' in self.attributes:
+            self.ignored_register = True
+            del self.attributes['register']
+        if self.name == 'block' and isinstance(self.args, list):
+            self.steps = compile_plan(self.args)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Plan steps cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def compile_plan(definitions):
+    """Return the steps to execute a list of plugin definitions, as a tuple of `PlanStep`."""
+    return tuple(d if isinstance(d, PlanStep) else PlanStep(d) for d in definitions or [])
+
+
+class FrozenDict(dict):
+    """Read only dict. Copies and pickles of it are plain dicts that may be modified."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared plugin definitions cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return dict((deepcopy(k, memo), deepcopy(v, memo)) for k, v in iteritems(self))
+
+
+class FrozenList(list):
+    """Read only list. Copies and pickles of it are plain lists that may be modified."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Shared plugin definitions cannot be modified")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = extend = insert = pop = remove = reverse = sort = \
+        clear = _read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [deepcopy(v, memo) for v in self]
+
+
+def freeze(data):
+    """Return a read only version of the dicts and lists of the data, so it can be shared without copying it."""
+    if isinstance(data, dict):
+        return FrozenDict((k, freeze(v)) for k, v in iteritems(data))
+    if isinstance(data, list):
+        return FrozenList(freeze(v) for v in data)
+    return data
+
+
+class IncludePlanCache(object):
+    """
+    Plans of the files included with `include_tasks`, shared by all the runs of the worker process.
+
+    Plans are keyed by the absolute path of the file and are only used while its mtime and size don't
+    change. Their definitions are frozen, so every run and instance can use them without copying them.
+    """
+
+    def __init__(self):
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def identity(path):
+        """Return the identity of the file as it is now, or None if it cannot be read."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def get(self, path, identity):
+        entry = self._plans.get(path)
+        if identity is None or entry is None or entry[0] != identity:
+            return None
+        return entry[1]
+
+    def set(self, path, identity, plan):
+        """Store the plan of the file. The identity must be taken before reading the file."""
+        if identity is not None:
+            with self._lock:
+                self._plans[path] = (identity, plan)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+
+include_plan_cache = IncludePlanCache()
@@ -15,8 +15,21 @@ from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.
 
 display = Display()
 
+# Validators of the args of each plugin class, built the first time the class validates its args
+_validators = {}
+
 
 class SoftwareFactsPlugin(with_metaclass(ABCMeta, object)):
+
+    # Plugins that execute modules or access the target host. Only them are executed in a separate thread
+    # when a timeout is defined for the task, the rest are always executed in the thread of the caller and
+    # the timeout is checked once they finish.
+    IO_BOUND = True
+
+    # Plugins whose `validate_args` only depends on the args it receives. Args without templates of these
+    # plugins, and of the ones that don't override `validate_args`, are validated once per execution.
+    STATIC_ARGS_VALIDATION = False
+
     def __init__(self, action_module, task_vars):
         self._action_module = action_module
         self._task_vars = task_vars
@@ -43,12 +56,21 @@ class SoftwareFactsPlugin(with_metaclass(ABCMeta, object)):
     def run(self, args=None, attributes=None, software_instance=None):  # noqa
         return None
 
+    @classmethod
+    def get_validator(cls):
+        """
+        Return the validator for the args spec of the plugin, built once per plugin class.
+        """
+        validator = _validators.get(cls)
+        if validator is None:
+            validator = _validators[cls] = ArgumentSpecValidator(cls.get_args_spec())
+        return validator
+
     def validate_args(self, args):
         """
         Raise exception in case the arguments don't pass validation.
         """
-        validator = ArgumentSpecValidator(self.get_args_spec())
-        validation_result = validator.validate(args)
+        validation_result = self.get_validator().validate(args)
         if validation_result.error_messages:
             raise AnsibleRuntimeError("Wrong parameters sent to software facts plugin '{0}':\n{1}".
                                       format(self.get_name(), '\n'.join(validation_result.error_messages)))
@@ -63,6 +63,9 @@ display = Display()
 
 class AddBindingInfo(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+    STATIC_ARGS_VALIDATION = True
+
     def __init__(self, action_module, task_vars):
         super(AddBindingInfo, self).__init__(action_module, task_vars)
 
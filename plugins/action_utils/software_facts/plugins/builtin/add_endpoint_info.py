@@ -48,6 +48,8 @@ display = Display()
 
 class AddEndpointInfo(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+
     def __init__(self, action_module, task_vars):
         super(AddEndpointInfo, self).__init__(action_module, task_vars)
 
@@ -62,6 +62,9 @@ display = Display()
 
 
 class AddFileInfo(SoftwareFactsPlugin):
+
+    IO_BOUND = False
+
     def __init__(self, action_module, task_vars):
         super(AddFileInfo, self).__init__(action_module, task_vars)
 
@@ -52,6 +52,9 @@ display = Display()
 
 
 class AddMessageInfo(SoftwareFactsPlugin):
+
+    IO_BOUND = False
+
     def __init__(self, action_module, task_vars):
         super(AddMessageInfo, self).__init__(action_module, task_vars)
 
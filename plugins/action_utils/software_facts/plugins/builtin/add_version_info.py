@@ -48,6 +48,8 @@ display = Display()
 
 class AddVersionInfo(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+
     def __init__(self, action_module, task_vars):
         super(AddVersionInfo, self).__init__(action_module, task_vars)
 
@@ -30,6 +30,8 @@ from ansible.errors import AnsibleActionFail, AnsibleRuntimeError  # noqa
 from ansible.module_utils.six import string_types  # noqa
 from ansible.utils.display import Display  # noqa
 
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.instance_path \
+    import delete_values, split_key  # noqa
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.__init__ \
     import SoftwareFactsPlugin  # noqa
 
@@ -38,6 +40,9 @@ display = Display()
 
 class DelInstanceFact(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+    STATIC_ARGS_VALIDATION = True
+
     def __init__(self, action_module, task_vars):
         super(DelInstanceFact, self).__init__(action_module, task_vars)
 
@@ -57,21 +62,10 @@ class DelInstanceFact(SoftwareFactsPlugin):
             result = dict(deleted_from_instance=[])
             if isinstance(args, string_types):
                 args = [args]
-            for k in args:
-                k = self._templar.template(k)
-                dict_ = software_instance
-                parts = k.split('.')
-                last = parts[-1]
-                for path in parts[:-1]:
-                    if path in dict_:
-                        dict_ = dict_[path]
-                    else:
-                        dict_ = None
-                        break
-
-                if dict_ and last in dict_:
-                    del (dict_[last])
-                    result['deleted_from_instance'].append(k)
+            keys = [self._templar.template(k) for k in args]
+            # All the keys are deleted in a single pass, looking up the objects they share once
+            for i in delete_values(software_instance, [split_key(k) for k in keys]):
+                result['deleted_from_instance'].append(keys[i])
             return result
         else:
             raise AnsibleActionFail('No keys provided, at least one is required for this action to succeed')
@@ -41,6 +41,8 @@ display = Display()
 
 class FindContainers(FindElements):
 
+    INDEXED_KEYS = ('Id', 'Name')
+
     @classmethod
     def get_name(cls):
         return super(FindContainers, cls).get_name()
@@ -54,6 +56,8 @@ class FindContainers(FindElements):
     def run(self, args=None, attributes=None, software_instance=None):
         dockers = self._task_vars.get('dockers', {})
 
-        args['source'] = dockers.get('containers', [])
+        containers = dockers.get('containers', [])
+
+        source, index = self._get_indexed_source((containers,), lambda: containers)
 
-        return super(FindContainers, self).run(args, attributes, software_instance)
+        return self._find(source, args['filter'], index)
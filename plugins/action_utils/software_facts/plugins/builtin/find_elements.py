@@ -37,6 +37,7 @@ EXAMPLES = r'''
 '''
 
 import re  # noqa
+from bisect import bisect_left  # noqa
 
 from ansible.module_utils.six import iteritems  # noqa
 from ansible.utils.display import Display  # noqa
@@ -49,6 +50,12 @@ display = Display()
 
 class FindElements(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+
+    # Keys of the source elements indexed once per execution, so filters with a literal value for any of them
+    # only check the elements whose value starts with it instead of the whole source
+    INDEXED_KEYS = ()
+
     @classmethod
     def get_name(cls):
         return super(FindElements, cls).get_name()
@@ -62,41 +69,113 @@ class FindElements(SoftwareFactsPlugin):
         return args
 
     def run(self, args=None, attributes=None, software_instance=None):
-        source = args['source']
-
-        filtered_elements = []
-        for element in source:
-            filters_match = True
-
-            # Values given by the user could be of multiple types, but since we need to support matching regex,
-            # we cast both of them to strings to do the comparison.
-            for k, v in iteritems(args['filter']):
-                k = self._templar.template(k)
-                v = self._templar.template(v)
-
-                if not validate_filter(element, k, v):
-                    filters_match = False
-                    break
-
-            if filters_match:
-                filtered_elements.append(element)
-
-        return filtered_elements
-
-
-def validate_filter(element, key, value):
-    validated = True
-
-    if key not in element:
-        validated = False
-    else:
+        return self._find(args['source'], args['filter'])
+
+    def _get_indexed_source(self, parts, build_source):
+        """
+        Return the source built from `parts` (the task vars it comes from) and its index, both built once per
+        execution while the parts are the same objects with the same length.
+        """
+        cache = self._action_module.get_run_cache(self.get_name())
+        key = [(id(part), len(part)) for part in parts]
+        cached = cache.get('source')
+        if cached is None or cached['key'] != key:
+            source = build_source()
+            # The parts are kept so their ids are not reused by other objects
+            cached = cache['source'] = dict(key=key, parts=parts, source=source,
+                                            index=build_index(source, self.INDEXED_KEYS))
+        return cached['source'], cached['index']
+
+    def _find(self, source, element_filter, index=None):
+        if not source:
+            return []
+
+        # Values given by the user could be of multiple types, but since we need to support matching regex,
+        # we cast both of them to strings to do the comparison.
+        compiled_filter = compile_filter(dict((self._templar.template(k), self._templar.template(v))
+                                              for k, v in iteritems(element_filter)))
+
+        candidates = None
+        if index:
+            candidates = find_candidates(index, compiled_filter)
+        if candidates is None:
+            elements = source
+        else:
+            elements = [source[position] for position in candidates]
+        return [element for element in elements if match_filter(element, compiled_filter)]
+
+
+def build_index(source, keys):
+    """
+    Return, for each key, the sorted values of the elements for the key (as text) and the positions in `source`
+    of the elements with each value.
+    """
+    index = {}
+    for key in keys:
+        positions = {}
+        for position, element in enumerate(source):
+            if isinstance(element, dict) and key in element:
+                positions.setdefault(str(element[key]), []).append(position)
+        index[key] = (sorted(positions), positions)
+    return index
+
+
+def _literal_prefix(pattern):
+    """Return the text every value matched by the pattern starts with, if the pattern is a literal text."""
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    if pattern.endswith('$'):
+        pattern = pattern[:-1]
+    if pattern and re.escape(pattern) == pattern:
+        return pattern
+    return None
+
+
+def find_candidates(index, compiled_filter):
+    """
+    Return the sorted positions of the only elements that may match the filter, using the index for the filters
+    with literal values, or None if no filter can use the index.
+    """
+    candidates = None
+    for key, pattern, nested in compiled_filter:
+        if nested is not None or key not in index:
+            continue
+        prefix = _literal_prefix(pattern.pattern)
+        if prefix is None:
+            continue
+        values, positions = index[key]
+        found = set()
+        i = bisect_left(values, prefix)
+        while i < len(values) and values[i].startswith(prefix):
+            found.update(positions[values[i]])
+            i += 1
+        candidates = found if candidates is None else candidates & found
+        if not candidates:
+            break
+    return None if candidates is None else sorted(candidates)
+
+
+def compile_filter(element_filter):
+    """
+    Return the filter as a list of (key, compiled regex, compiled nested filter), the regex being None for
+    nested filters.
+    """
+    compiled_filter = []
+    for key, value in iteritems(element_filter):
         if isinstance(value, dict):
-            for k, v in iteritems(value):
-                if not validate_filter(element[key], k, v):
-                    validated = False
-                    break
+            compiled_filter.append((key, None, compile_filter(value)))
         else:
-            if not re.match(str(value), str(element[key])):
-                validated = False
-
-    return validated
+            compiled_filter.append((key, re.compile(str(value)), None))
+    return compiled_filter
+
+
+def match_filter(element, compiled_filter):
+    for key, pattern, nested in compiled_filter:
+        if key not in element:
+            return False
+        if nested is not None:
+            if not match_filter(element[key], nested):
+                return False
+        elif not pattern.match(str(element[key])):
+            return False
+    return True
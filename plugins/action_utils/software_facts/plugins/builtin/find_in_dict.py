@@ -49,6 +49,8 @@ display = Display()
 
 class FindInDict(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+
     @classmethod
     def get_name(cls):
         return super(FindInDict, cls).get_name()
@@ -30,6 +30,8 @@ EXAMPLES = r'''
   register: result
 '''
 
+from itertools import chain  # noqa
+
 from ansible.utils.display import Display  # noqa
 
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin.find_elements \
@@ -40,6 +42,8 @@ display = Display()
 
 class FindPackages(FindElements):
 
+    INDEXED_KEYS = ('name',)
+
     @classmethod
     def get_name(cls):
         return super(FindPackages, cls).get_name()
@@ -56,6 +60,7 @@ class FindPackages(FindElements):
         # Since packages follows a schema like: {'foo': [{'name': 'foo', ...}, ...], 'bar': [{'name': 'bar', ...}, ...]}
         # we need to flatten it to a list of dicts. No information is lost since keys at first level are contained
         # in the dicts inside their values as the key 'name'.
-        args['source'] = sum(packages.values(), [])
+        source, index = self._get_indexed_source((packages,),
+                                                 lambda: list(chain.from_iterable(packages.values())))
 
-        return super(FindPackages, self).run(args, attributes, software_instance)
+        return self._find(source, args['filter'], index)
@@ -42,6 +42,8 @@ display = Display()
 
 class FindPorts(FindElements):
 
+    INDEXED_KEYS = ('pid', 'port', 'protocol')
+
     @classmethod
     def get_name(cls):
         return super(FindPorts, cls).get_name()
@@ -56,6 +58,6 @@ class FindPorts(FindElements):
         tcp_listen = self._task_vars.get('tcp_listen', [])
         udp_listen = self._task_vars.get('udp_listen', [])
 
-        args['source'] = tcp_listen + udp_listen
+        source, index = self._get_indexed_source((tcp_listen, udp_listen), lambda: tcp_listen + udp_listen)
 
-        return super(FindPorts, self).run(args, attributes, software_instance)
+        return self._find(source, args['filter'], index)
@@ -40,6 +40,8 @@ display = Display()
 
 class FindProcesses(FindElements):
 
+    INDEXED_KEYS = ('pid', 'ppid', 'user')
+
     @classmethod
     def get_name(cls):
         return super(FindProcesses, cls).get_name()
@@ -53,6 +55,6 @@ class FindProcesses(FindElements):
     def run(self, args=None, attributes=None, software_instance=None):
         processes = self._task_vars.get('processes', [])
 
-        args['source'] = processes
+        source, index = self._get_indexed_source((processes,), lambda: processes)
 
-        return super(FindProcesses, self).run(args, attributes, software_instance)
+        return self._find(source, args['filter'], index)
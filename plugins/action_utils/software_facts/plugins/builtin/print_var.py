@@ -39,6 +39,8 @@ display = Display()
 
 class PrintVar(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+
     @classmethod
     def get_name(cls):
         return super(PrintVar, cls).get_name()
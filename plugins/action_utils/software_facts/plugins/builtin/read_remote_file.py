@@ -48,6 +48,60 @@ options:
     type: bool
     required: false
     default: false
+  max_bytes:
+    description:
+      - Maximum number of bytes of the file read in the target host. The first bytes are read, except with
+        I(tail), where the last ones are read.
+      - Not supported in Windows hosts, as I(head), I(tail) and I(line_range).
+    type: int
+    required: false
+  head:
+    description:
+      - Number of lines read from the beginning of the file, in the target host.
+      - Only one of I(head), I(tail) or I(line_range) may be provided.
+    type: int
+    required: false
+  tail:
+    description:
+      - Number of lines read from the end of the file, in the target host.
+    type: int
+    required: false
+  line_range:
+    description:
+      - First and last lines of the file read in the target host, starting from 1.
+    type: list
+    elements: int
+    required: false
+  return_content:
+    description:
+      - If C(false) the content is not returned, only the parsed one.
+      - Content of C(key_value) and C(environ) parsers not returned is parsed while it is decoded, without
+        building the whole text. Both parsers accept a list of I(keys) in I(parser_params) to only return those
+        keys, with the last value of each one. With I(stop_on_first) in I(parser_params) the first value is kept
+        instead and decoding stops as soon as all of them are found.
+      - The content is decoded from the base64 payload already transferred to the controller, so this does not
+        reduce the data transferred nor the memory needed to hold it. Only I(max_bytes), I(head), I(tail) and
+        I(line_range) do.
+    type: bool
+    required: false
+    default: true
+  parse_on_target:
+    description:
+      - If C(true) the file is parsed in the target host and only the parsed content is transferred, so the content
+        is never returned. Useful for big files of which only some data is needed.
+      - Only C(json) and C(xml) parsers are supported. Not supported in Windows hosts nor with I(delegate_reading).
+    type: bool
+    required: false
+    default: false
+  select:
+    description:
+      - Paths of the parsed content to return instead of the whole parsed content, selected in the target host
+        with I(parse_on_target). Each path is the keys to follow separated by dots. Numeric keys are indexes of lists,
+        and other keys reached in a list are looked up in each of its elements, returning the list of values found.
+      - C(parsed) has the value of each path found, keyed by path.
+    type: list
+    elements: str
+    required: false
 '''
 
 EXAMPLES = r'''
@@ -62,12 +116,32 @@ EXAMPLES = r'''
         - "#"
         - "["
   register: result
+
+- name: Read the port from a big config file
+  read_remote_file:
+    file_path: "/etc/app/app.conf"
+    max_bytes: 1048576
+    parser: key_value
+    parser_params:
+      keys:
+        - port
+    return_content: false
+  register: result
+
+- name: Read the socket bindings of a JBoss config in the target host
+  read_remote_file:
+    file_path: "/opt/jboss/standalone/configuration/standalone.xml"
+    parser: xml
+    parse_on_target: true
+    select:
+      - server.socket-binding-group.socket-binding
+  register: result
 '''
 
 RETURN = r'''
 content:
     description: Plain text file content
-    returned: success
+    returned: success, I(return_content) and not I(parse_on_target)
     type: str
     sample: "LANG=es_ES.UTF-8\nPATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin\n"
 source:
@@ -80,22 +154,39 @@ parsed:
     returned: success and parser provided
     type: dict
     sample: {"LANG": "es_ES.UTF-8", "PATH": "/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin"}
+truncated:
+    description: If only a part of the file was read due to I(max_bytes), I(head), I(tail) or I(line_range)
+    returned: success and any of those options provided
+    type: bool
+    sample: false
 '''
 
 import base64  # noqa: E402
+import codecs  # noqa: E402
 import ntpath  # noqa: E402
 import os  # noqa: E402
 import posixpath  # noqa: E402
 import traceback  # noqa: E402
 
 from ansible.module_utils.common.text.converters import to_text  # noqa: E402
+from ansible.module_utils.six import text_type  # noqa: E402
 from ansible.utils.display import Display  # noqa: E402
 
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.__init__ \
     import SoftwareFactsPlugin  # noqa: E402
+from ansible_collections.datadope.discovery.plugins.module_utils.content_parser \
+    import TARGET_PARSERS, select_paths  # noqa: E402
 
 display = Display()
 
+SLURP_FILES_MODULE = 'datadope.discovery.slurp_files'
+
+# Options of the module that select the part of the file to read in the target host
+SELECTION_OPTIONS = ('max_bytes', 'head', 'tail', 'line_range')
+
+# Size of the base64 encoded blocks decoded at a time when the content is streamed to the parser
+STREAM_BLOCK_SIZE = 64 * 1024
+
 
 class ReadRemoteFile(SoftwareFactsPlugin):
 
@@ -109,23 +200,81 @@ class ReadRemoteFile(SoftwareFactsPlugin):
             in_docker=dict(type='bool', required=False, default=True),
             delegate_reading=dict(type='bool', required=False, default=False)
         ))
+        args.update(cls.get_selection_args_spec())
+        args.update(cls.get_target_parsing_args_spec())
         return args
 
+    @staticmethod
+    def get_selection_args_spec():
+        return dict(
+            max_bytes=dict(type='int', required=False),
+            head=dict(type='int', required=False),
+            tail=dict(type='int', required=False),
+            line_range=dict(type='list', elements='int', required=False),
+            return_content=dict(type='bool', required=False, default=True)
+        )
+
+    @staticmethod
+    def get_target_parsing_args_spec():
+        return dict(
+            parse_on_target=dict(type='bool', required=False, default=False),
+            select=dict(type='list', elements='str', required=False)
+        )
+
     def run(self, args=None, attributes=None, software_instance=None):
-        path = args['file_path']
         parser_name = args['parser']
-        parser_params = args['parser_params']
-        in_docker = args['in_docker']
         delegate_reading = args['delegate_reading']
-        if parser_name:
-            from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.utils \
-                import get_software_facts_parser
-            parser = get_software_facts_parser(parser_name, self._action_module, self._task_vars)
+        parser = self._get_parser(parser_name)
+        path, path_prefix = self._get_path(args['file_path'], args['in_docker'], software_instance)
+        selection = self._get_selection(args)
+        select = args.get('select')
+
+        if args.get('parse_on_target') and parser_name:
+            error = self._check_target_parsing(parser_name, delegate_reading)
+            if error is not None:
+                return error
+            slurped, error = self._slurp([path], selection,
+                                         self._get_target_parsing(parser_name, args['parser_params'], select))
+            if error is not None:
+                return error
+            return self._process_target_parsing_result(dict(slurped[path]), path)
+
+        if delegate_reading:
+            slurped = None
+        elif any(value is not None for value in selection.values()):
+            # Only the selected part of the file is read in the target host
+            slurped, error = self._slurp([path], selection)
+            if error is not None:
+                return error
+            slurped = slurped[path]
         else:
-            parser = None
+            slurped = self._execute_module(module_name='ansible.legacy.slurp',
+                                           module_args=dict(src=path),
+                                           task_vars=self._task_vars)
+
+        return self._process_file(slurped, path, path_prefix, parser, parser_name, args['parser_params'],
+                                  args.get('return_content', True), select)
+
+    @staticmethod
+    def _get_selection(args):
+        return dict((name, args.get(name)) for name in SELECTION_OPTIONS)
+
+    def _get_parser(self, parser_name):
+        if not parser_name:
+            return None
+        from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.utils \
+            import get_software_facts_parser
+        return get_software_facts_parser(parser_name, self._action_module, self._task_vars)
+
+    def _is_windows(self):
+        return self._task_vars.get('ansible_facts', {}).get('os_family', '').lower().startswith('windows')
 
-        path_module = ntpath if self._task_vars.get('ansible_facts', {}) \
-            .get('os_family', '').lower().startswith('windows') else posixpath
+    def _get_path(self, path, in_docker, software_instance):
+        """
+        Return the path to read for the software instance, relative paths being relative to the process
+        working directory, and the prefix added to it if it has to be read inside the docker of the instance.
+        """
+        path_module = ntpath if self._is_windows() else posixpath
         if not path_module.isabs(path) and software_instance.get('process', {}).get("cwd"):
             path = os.path.normpath(os.path.join(software_instance['process']['cwd'], path))
 
@@ -136,52 +285,155 @@ class ReadRemoteFile(SoftwareFactsPlugin):
             # Executing in docker
             path_prefix = "/proc/{0}/root".format(software_instance['process']['pid'])
             path = "{0}{1}".format(path_prefix, path)
+        return path, path_prefix
 
-        result = {}
-        source = path
+    def _check_target_parsing(self, parser_name, delegate_reading):
+        """Return the result of the plugin if the file cannot be parsed in the target host, or None if it can."""
+        if parser_name not in TARGET_PARSERS:
+            return dict(failed=True, msg="Parser '{0}' cannot be applied in the target host; supported parsers "
+                                         "are '{1}'".format(parser_name, "', '".join(TARGET_PARSERS)))
+        if delegate_reading:
+            return dict(failed=True, msg="Option 'parse_on_target' cannot be used with 'delegate_reading'")
+        return None
 
-        if not delegate_reading:
-            result = self._execute_module(module_name='ansible.legacy.slurp',
-                                          module_args=dict(src=path),
-                                          task_vars=self._task_vars)
-            if result.get('failed', False):
-                if 'not found' in result.get('msg', ''):
-                    msg = "the remote file '{0}' does not exist, not transferring".format(path)
-                elif result.get('msg', '').startswith('source is a directory'):
-                    msg = "remote file is a directory"
-                else:
-                    msg = result.get('msg', '')
-                result['msg'] = msg
-            else:
-                if result['encoding'] == 'plain':  # Impossible from real module but included to facilitate mocking
-                    source = to_text(result['content'])
-                else:
-                    source = to_text(base64.b64decode(result['content']))
-                result['content'] = source
-                del result['encoding']
+    @staticmethod
+    def _get_target_parsing(parser_name, parser_params, select):
+        """Return the module args to parse the files in the target host."""
+        parsing = dict(parser=parser_name)
+        if parser_params is not None:
+            parsing['parser_params'] = parser_params
+        if select is not None:
+            parsing['select'] = select
+        return parsing
+
+    def _slurp(self, paths, selection=None, parsing=None):
+        """
+        Return the slurp result of every path, keyed by path, reading all of them with a single module execution,
+        or the result of the plugin if the files could not be read. With parsing, the module args that make
+        the module parse the files, results have the parsed content instead of the content.
+        """
+        if not paths:
+            return {}, None
+        selection = dict((k, v) for k, v in (selection or {}).items() if v is not None)
+        if self._is_windows():
+            # The module is only available for POSIX hosts
+            if parsing:
+                return None, dict(failed=True, msg="Option 'parse_on_target' is not supported in Windows hosts")
+            if selection:
+                return None, dict(failed=True, msg="Options '{0}' are not supported in Windows hosts"
+                                  .format("', '".join(SELECTION_OPTIONS)))
+            slurped = {}
+            for path in paths:
+                if path not in slurped:
+                    slurped[path] = self._execute_module(module_name='ansible.legacy.slurp',
+                                                         module_args=dict(src=path),
+                                                         task_vars=self._task_vars)
+            return slurped, None
+        module_args = dict(paths=paths)
+        module_args.update(selection)
+        module_args.update(parsing or {})
+        module_result = self._execute_module(module_name=SLURP_FILES_MODULE,
+                                             module_args=module_args,
+                                             task_vars=self._task_vars)
+        display.debug("RESULT FROM '{1}': {0}".format(module_result, SLURP_FILES_MODULE))
+        if module_result.get('failed', False):
+            result = dict(failed=True,
+                          msg=module_result.get('msg', "Undefined error executed module '{0}'"
+                                                .format(SLURP_FILES_MODULE)))
+            if 'exception' in module_result:
+                result['exception'] = module_result['exception']
+            return None, result
+        return module_result['files'], None
+
+    def _process_file(self, slurped, path, path_prefix, parser, parser_name, parser_params, return_content=True,
+                      select=None):
+        """
+        Return the result of reading a file: the slurp result (None if reading is delegated to the parser) with its
+        content decoded and parsed, only with the values at the select paths if provided. Content of streaming
+        parsers not returned is parsed while it is decoded.
+        """
+        if slurped is None:
+            result, source = {}, path
+        elif parser and parser.STREAMING and not return_content and not slurped.get('failed', False):
+            result = dict(slurped)
+            source = self._iter_content(result.pop('content'), result.pop('encoding'))
+        else:
+            result, source = self._process_slurp_result(dict(slurped), path)
+            if not return_content:
+                result.pop('content', None)
 
         if parser:
-            try:
-                parser.validate_input(source, parser_params)
-                parsed_file = parser.parse(source, parser_params, path_prefix)
-                if delegate_reading:
-                    # If we are delegating the reading, we need to extract the parsed file from the delegated
-                    # task output. Also, we need to add the source to the result as slurp does.
-                    result['parsed'] = parsed_file['parsed']
-                    result['source'] = path
-                else:
-                    result['parsed'] = parsed_file
-            except Exception as e:
-                if display.verbosity > 2:
-                    display.verbose(
-                        "Error '{0}' parsing to '{1}' text {2}".format(str(e), parser_name, source),
-                        host=self._task_vars.get('inventory_hostname'))
-                else:
-                    display.v(
-                        "Error '{0}' parsing text to '{1}'".format(str(e), parser_name),
-                        host=self._task_vars.get('inventory_hostname'))
-                result['failed'] = True
-                result['msg'] = str(e)
-                result['exception'] = traceback.format_exc()
+            self._parse(parser, parser_name, parser_params, source, path, path_prefix, slurped is None, result)
+            if select is not None and 'parsed' in result:
+                result['parsed'] = select_paths(result['parsed'], select)
 
         return result
+
+    @staticmethod
+    def _iter_content(content, encoding):
+        """Yield the text of the content in chunks, decoding it block by block."""
+        if encoding == 'plain':  # Impossible from real module but included to facilitate mocking
+            yield to_text(content)
+            return
+        content = to_text(content)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for start in range(0, len(content), STREAM_BLOCK_SIZE):
+            yield decoder.decode(base64.b64decode(content[start:start + STREAM_BLOCK_SIZE]))
+        yield decoder.decode(b'', final=True)
+
+    @classmethod
+    def _process_target_parsing_result(cls, result, path):
+        """Return the result of a file parsed in the target host."""
+        if result.get('failed', False):
+            return cls._process_slurp_result(result, path)[0]
+        return result
+
+    @staticmethod
+    def _process_slurp_result(result, path):
+        """Return the result of slurping the path with its content decoded, and the content."""
+        source = path
+        if result.get('failed', False):
+            if 'not found' in result.get('msg', ''):
+                msg = "the remote file '{0}' does not exist, not transferring".format(path)
+            elif result.get('msg', '').startswith('source is a directory'):
+                msg = "remote file is a directory"
+            else:
+                msg = result.get('msg', '')
+            result['msg'] = msg
+        else:
+            if result['encoding'] == 'plain':  # Impossible from real module but included to facilitate mocking
+                source = to_text(result['content'])
+            else:
+                source = to_text(base64.b64decode(result['content']))
+            result['content'] = source
+            del result['encoding']
+        return result, source
+
+    def _parse(self, parser, parser_name, parser_params, source, path, path_prefix, delegate_reading, result):
+        """Add to the result the content parsed or, if it cannot be parsed, the error."""
+        try:
+            if isinstance(source, text_type):
+                parser.validate_input(source, parser_params)
+                parsed_file = parser.parse(source, parser_params, path_prefix)
+            else:
+                parsed_file = parser.parse_chunks(source, parser_params, path_prefix)
+                source = '<streamed content>'
+            if delegate_reading:
+                # If we are delegating the reading, we need to extract the parsed file from the delegated
+                # task output. Also, we need to add the source to the result as slurp does.
+                result['parsed'] = parsed_file['parsed']
+                result['source'] = path
+            else:
+                result['parsed'] = parsed_file
+        except Exception as e:
+            if display.verbosity > 2:
+                display.verbose(
+                    "Error '{0}' parsing to '{1}' text {2}".format(str(e), parser_name, source),
+                    host=self._task_vars.get('inventory_hostname'))
+            else:
+                display.v(
+                    "Error '{0}' parsing text to '{1}'".format(str(e), parser_name),
+                    host=self._task_vars.get('inventory_hostname'))
+            result['failed'] = True
+            result['msg'] = str(e)
+            result['exception'] = traceback.format_exc()
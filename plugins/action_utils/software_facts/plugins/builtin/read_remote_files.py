@@ -0,0 +1,239 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+software_facts_plugin: read_remote_files
+short_description: Reads several files from the target host at once.
+description:
+     - Reads several files from the target host with a single module execution.
+     - Every file is processed as the M(read_remote_file) plugin does, so a parser may be defined to be applied
+       to the content of each file.
+     - A file that cannot be read or parsed does not make the plugin fail, its error is returned with its result.
+options:
+  files:
+    description:
+      - Files to read. Each element may be the path of the file or a dict with the options of the file.
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      file_path:
+        description:
+          - Path to the file to read.
+        type: str
+        required: true
+      parser:
+        description:
+          - Type of parser to apply to the content. If not provided, I(parser) of the plugin is used.
+        type: str
+        required: false
+      parser_params:
+        description:
+          - Parameters to provide to the parser. If not provided and the file has no I(parser), I(parser_params)
+            of the plugin are used.
+        type: dict
+        required: false
+      in_docker:
+        description:
+          - If C(false) file is read from host file system even if software instance is running in a docker
+            container. If not provided, I(in_docker) of the plugin is used.
+        type: bool
+        required: false
+      delegate_reading:
+        description:
+          - "If C(true) this plugin will not read the file.
+            File reading is delegated to the parser which must be a custom parser able to read files"
+        type: bool
+        required: false
+        default: false
+  parser:
+    description:
+      - Type of parser to apply to the content of the files that don't define their own parser.
+    type: str
+    required: false
+  parser_params:
+    description:
+      - Parameters to provide to I(parser), for the files that don't define their own parser nor parameters.
+    type: dict
+    required: false
+  in_docker:
+    description:
+      - If C(false) files are read from host file system even if software instance is running in a docker container.
+    type: bool
+    required: false
+    default: true
+  max_bytes:
+    description:
+      - Maximum number of bytes of each file read in the target host. The first bytes are read, except with
+        I(tail), where the last ones are read.
+      - Not supported in Windows hosts, as I(head), I(tail) and I(line_range).
+    type: int
+    required: false
+  head:
+    description:
+      - Number of lines read from the beginning of each file, in the target host.
+      - Only one of I(head), I(tail) or I(line_range) may be provided.
+    type: int
+    required: false
+  tail:
+    description:
+      - Number of lines read from the end of each file, in the target host.
+    type: int
+    required: false
+  line_range:
+    description:
+      - First and last lines of each file read in the target host, starting from 1.
+    type: list
+    elements: int
+    required: false
+  return_content:
+    description:
+      - If C(false) the content is not returned, only the parsed one.
+      - Content of C(key_value) and C(environ) parsers not returned is parsed while it is decoded, without
+        building the whole text. Both parsers accept a list of I(keys) in I(parser_params) to only return those
+        keys, with the last value of each one. With I(stop_on_first) in I(parser_params) the first value is kept
+        instead and decoding stops as soon as all of them are found.
+      - The content is decoded from the base64 payload already transferred to the controller, so this does not
+        reduce the data transferred nor the memory needed to hold it. Only I(max_bytes), I(head), I(tail) and
+        I(line_range) do.
+    type: bool
+    required: false
+    default: true
+  parse_on_target:
+    description:
+      - If C(true) the files with a parser are parsed in the target host, as the M(read_remote_file) plugin does.
+        Files with the same parser and parameters are read and parsed with a single module execution.
+    type: bool
+    required: false
+    default: false
+  select:
+    description:
+      - Paths of the parsed content of each file to return instead of the whole parsed content, as in the
+        M(read_remote_file) plugin.
+    type: list
+    elements: str
+    required: false
+'''
+
+EXAMPLES = r'''
+- name: Read config files
+  read_remote_files:
+    files:
+      - "/etc/my.cnf"
+      - file_path: "/etc/mysql/debian.cnf"
+        parser_params:
+          comment_delimiters:
+            - "#"
+    parser: key_value
+  register: result
+'''
+
+RETURN = r'''
+files:
+    description:
+      - Result of each file, in the same order as in I(files). Each result has the same keys as the result of
+        the M(read_remote_file) plugin, and the I(file_path) as it was provided.
+    returned: success
+    type: list
+    elements: dict
+    sample: [{"file_path": "/etc/my.cnf", "source": "/etc/my.cnf", "content": "[mysqld]\nport = 3306\n",
+              "parsed": {"port": "3306"}}]
+'''
+
+import json  # noqa: E402
+
+from ansible.module_utils.six import string_types  # noqa: E402
+from ansible.utils.display import Display  # noqa: E402
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin.read_remote_file \
+    import ReadRemoteFile  # noqa: E402
+
+display = Display()
+
+
+class ReadRemoteFiles(ReadRemoteFile):
+
+    STATIC_ARGS_VALIDATION = True
+
+    @classmethod
+    def get_args_spec(cls):
+        args = dict(
+            files=dict(type='list', elements='dict', required=True, options=dict(
+                file_path=dict(type='str', required=True),
+                parser=dict(type='str', required=False),
+                parser_params=dict(type='dict', required=False),
+                in_docker=dict(type='bool', required=False),
+                delegate_reading=dict(type='bool', required=False, default=False)
+            )),
+            parser=dict(type='str', required=False),
+            parser_params=dict(type='dict', required=False),
+            in_docker=dict(type='bool', required=False, default=True)
+        )
+        args.update(cls.get_selection_args_spec())
+        args.update(cls.get_target_parsing_args_spec())
+        return args
+
+    def validate_args(self, args):
+        if isinstance(args, dict) and isinstance(args.get('files'), list):
+            # Files may be provided only with their path
+            args = dict(args)
+            args['files'] = [dict(file_path=f) if isinstance(f, string_types) else f for f in args['files']]
+        return super(ReadRemoteFiles, self).validate_args(args)
+
+    def run(self, args=None, attributes=None, software_instance=None):
+        jobs = []
+        for file_args in args['files']:
+            job = dict(file_args)
+            if job['parser'] is None:
+                # The parser params of the plugin are only used with its parser
+                job['parser'] = args['parser']
+                if job['parser_params'] is None:
+                    job['parser_params'] = args['parser_params']
+            if job['in_docker'] is None:
+                job['in_docker'] = args['in_docker']
+            job['path'], job['path_prefix'] = self._get_path(job['file_path'], job['in_docker'], software_instance)
+            jobs.append(job)
+
+        # Files are read with one module execution for each parser applied in the target host, and another one for
+        # the files not parsed there
+        groups = {}
+        for job in jobs:
+            if job['delegate_reading']:
+                continue
+            key = None
+            if args['parse_on_target'] and job['parser']:
+                error = self._check_target_parsing(job['parser'], job['delegate_reading'])
+                if error is not None:
+                    return error
+                key = json.dumps([job['parser'], job['parser_params']], sort_keys=True)
+            job['group'] = key
+            groups.setdefault(key, []).append(job)
+
+        selection = self._get_selection(args)
+        slurped = {}
+        for key, group in groups.items():
+            parsing = None
+            if key is not None:
+                parsing = self._get_target_parsing(group[0]['parser'], group[0]['parser_params'], args['select'])
+            slurped[key], error = self._slurp([job['path'] for job in group], selection, parsing)
+            if error is not None:
+                return error
+
+        files = []
+        for job in jobs:
+            if job['delegate_reading'] or job['group'] is None:
+                result = self._process_file(None if job['delegate_reading'] else slurped[None][job['path']],
+                                            job['path'], job['path_prefix'], self._get_parser(job['parser']),
+                                            job['parser'], job['parser_params'], args['return_content'],
+                                            args['select'])
+            else:
+                result = self._process_target_parsing_result(dict(slurped[job['group']][job['path']]), job['path'])
+            result['file_path'] = job['file_path']
+            files.append(result)
+
+        return dict(files=files, failed=False)
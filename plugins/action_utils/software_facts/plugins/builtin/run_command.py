@@ -61,6 +61,8 @@ display = Display()
 
 class RunCommand(SoftwareFactsPlugin):
 
+    STATIC_ARGS_VALIDATION = True
+
     @classmethod
     def get_args_spec(cls):
         # One element dict with key the module name and value its arguments.
@@ -72,8 +74,9 @@ class RunCommand(SoftwareFactsPlugin):
         return args
 
     def validate_args(self, args):
+        argument_spec = self.get_validator().argument_spec
         validated_args = super(RunCommand, self).validate_args({x: y for x, y in iteritems(args)
-                                                                if x in self.get_args_spec().keys()})
+                                                                if x in argument_spec})
         # We have to update the args dict with the validated ones in order to keep additional args not specified
         # in the arguments specification
         args.update(validated_args)
@@ -53,6 +53,8 @@ display = Display()
 
 class RunModule(SoftwareFactsPlugin):
 
+    STATIC_ARGS_VALIDATION = True
+
     @classmethod
     def get_args_spec(cls):
         # One element dict with key the module name and value its arguments.
@@ -41,6 +41,9 @@ display = Display()
 
 class SetInstanceFact(SoftwareFactsPlugin):
 
+    IO_BOUND = False
+    STATIC_ARGS_VALIDATION = True
+
     def __init__(self, action_module, task_vars):
         super(SetInstanceFact, self).__init__(action_module, task_vars)
 
@@ -0,0 +1,181 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+software_facts_plugin: stat_many
+short_description: Retrieve the status of several files at once
+description:
+     - Retrieves facts for several files with a single module execution, as the M(stat) plugin does for one file.
+     - A file that does not exist or cannot be checked does not make the plugin fail, its result is failed instead.
+options:
+  paths:
+    description:
+      - The full paths of the files/objects to get the facts of.
+    type: list
+    elements: path
+    required: true
+  follow:
+    description:
+      - Whether to follow symlinks.
+    type: bool
+    default: no
+  get_mime:
+    description:
+      - Use file magic and return data about the nature of the files. this uses
+        the 'file' utility found on most Linux/Unix systems.
+      - This will add both C(mimetype) and C(charset) fields to the return, if possible.
+    type: bool
+    default: yes
+    aliases: [ mime, mime_type, mime-type ]
+    platform: "linux"
+  get_attributes:
+    description:
+      - Get file attributes using lsattr tool if present.
+    type: bool
+    default: yes
+    aliases: [ attr, attributes ]
+    platform: "linux"
+  in_docker:
+    description:
+      - Consider the paths are inside the docker containing the software.
+      - If software is not detected to run in a docker this parameter is not used.
+      - This parameter is ignored if platform is windows.
+    type: bool
+    default: yes
+'''
+
+EXAMPLES = r'''
+- name: Check log files
+  stat_many:
+    paths:
+      - "/var/log/nginx/access.log"
+      - "/var/log/nginx/error.log"
+  register: log_files_stat
+
+- name: Set existing log files
+  set_instance_fact:
+    _log_files: "<< log_files_stat.stats | dict2items | rejectattr('value.failed') | map(attribute='key') | list >>"
+'''
+
+RETURN = r'''
+stats:
+    description:
+        - Result of each path, keyed by the path as it was provided.
+        - Each result is the result of the M(stat) plugin for the path, C(failed) being C(true) if the path does
+          not exist or cannot be checked.
+    returned: success
+    type: dict
+    sample: {
+      "/var/log/nginx/access.log": {"failed": false, "stat": {"exists": true, "path": "/var/log/nginx/access.log"}},
+      "/var/log/nginx/error.log": {"failed": true, "msg": "Path '/var/log/nginx/error.log' not found"}
+    }
+'''
+
+from ansible.utils.display import Display  # noqa: E402
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.__init__ \
+    import SoftwareFactsPlugin  # noqa: E402
+
+display = Display()
+
+STAT_FILES_MODULE = 'datadope.discovery.stat_files'
+
+
+class StatMany(SoftwareFactsPlugin):
+
+    STATIC_ARGS_VALIDATION = True
+
+    @classmethod
+    def get_args_spec(cls):
+        args = dict(
+            paths=dict(type='list', elements='path', required=True),
+            follow=dict(type='bool', default=False),
+            get_mime=dict(type='bool', default=True, aliases=['mime', 'mime_type', 'mime-type']),
+            get_attributes=dict(type='bool', default=True, aliases=['attr', 'attributes']),
+            in_docker=dict(type='bool', required=False, default=True)
+        )
+        return args
+
+    def run(self, args=None, attributes=None, software_instance=None):
+        is_windows = self._task_vars.get('ansible_facts', {}).get('os_family', '').lower().startswith('windows')
+
+        path_prefix = ''
+        if args['in_docker'] and not is_windows \
+                and software_instance.get("docker", {}).get("name") \
+                and software_instance.get('process', {}).get("pid"):
+            path_prefix = "/proc/{0}/root".format(software_instance['process']['pid'])
+
+        if is_windows:
+            module_results = self._win_stat(args)
+        else:
+            module_results, error = self._stat_files(args, path_prefix)
+            if error is not None:
+                return error
+
+        stats = {}
+        for path in args['paths']:
+            stats[path] = self._process_stat_result(module_results[path], path, path_prefix)
+        return dict(stats=stats, failed=False)
+
+    def _execute(self, module_name, module_args):
+        """Return the result of the module, or None and the result of the plugin if it failed."""
+        module_result = self._execute_module(
+            module_name=module_name,
+            module_args=module_args,
+            task_vars=self._task_vars,
+            wrap_async=self._task.async_val)
+        display.debug("RESULT FROM '{1}': {0}".format(module_result, module_name))
+        if module_result.get('failed', False):
+            display.v("Module '{1}' returned failed with message '{0}"
+                      .format(module_result.get('msg', ''), module_name))
+            result = dict(failed=True,
+                          msg=module_result.get('msg', "Undefined error executed module '{0}'".format(module_name)))
+            if 'exception' in module_result:
+                result['exception'] = module_result['exception']
+            return None, result
+        return module_result, None
+
+    def _stat_files(self, args, path_prefix):
+        """Return the module result of every path, keyed by path, checking all of them with a single execution."""
+        module_args = dict(paths=["{0}{1}".format(path_prefix, path) for path in args['paths']],
+                           follow=args['follow'], get_mime=args['get_mime'], get_attributes=args['get_attributes'])
+        module_result, error = self._execute(STAT_FILES_MODULE, module_args)
+        if error is not None:
+            return None, error
+        files = module_result['files']
+        return dict((path, files["{0}{1}".format(path_prefix, path)]) for path in args['paths']), None
+
+    def _win_stat(self, args):
+        """Return the module result of every path, keyed by path, executing the module once per path."""
+        results = {}
+        for path in args['paths']:
+            if path not in results:
+                module_result, error = self._execute('ansible.windows.win_stat',
+                                                     dict(path=path, follow=args['follow'], get_checksum=False))
+                # Errors of a path are returned in its result, as stat_files module does
+                results[path] = module_result if error is None else error
+        return results
+
+    @staticmethod
+    def _process_stat_result(module_result, path, path_prefix):
+        """Return the result of the stat plugin for the path from the module result."""
+        result = {}
+        if module_result.get('failed', False):
+            result['failed'] = True
+            result['msg'] = module_result.get('msg', "Cannot get status of path '{0}'".format(path))
+            if 'exception' in module_result:
+                result['exception'] = module_result['exception']
+        elif not module_result['stat']['exists']:
+            msg = "Path '{0}' not found".format(path)
+            display.v(msg)
+            result['failed'] = True
+            result['msg'] = msg
+        else:
+            stat_data = dict(module_result['stat'])
+            stat_data['path'] = stat_data['path'][len(path_prefix):]
+            result['failed'] = False
+            result['stat'] = stat_data
+        return result
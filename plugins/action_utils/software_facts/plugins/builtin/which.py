@@ -115,12 +115,22 @@ class Which(SoftwareFactsPlugin):
         module_args = dict(patterns=name, paths=paths_to_use, recurse=False, use_regex=False,
                            file_type='file', hidden=args['hidden'])
 
-        module_result = self._execute_module(
-            module_name=module_name,
-            module_args=module_args,
-            task_vars=self._task_vars,
-            wrap_async=self._task.async_val)
-        display.debug("RESULT FROM '{1}': {0}".format(module_result, module_name))
+        # Instances of the same software look for the same executables, in the same dirs or in the root of their
+        # container, so the module is executed once per run for each lookup
+        cache = self._action_module.get_run_cache(self.get_name())
+        cache_key = (module_name, tuple(paths_to_use), name, args['hidden'])
+        module_result = cache.get(cache_key)
+        if module_result is None:
+            module_result = self._execute_module(
+                module_name=module_name,
+                module_args=module_args,
+                task_vars=self._task_vars,
+                wrap_async=self._task.async_val)
+            display.debug("RESULT FROM '{1}': {0}".format(module_result, module_name))
+            if not module_result.get('failed', False):
+                cache[cache_key] = module_result
+        else:
+            display.debug("CACHED RESULT FROM '{1}': {0}".format(module_result, module_name))
         result = {}
         if module_result.get('failed', False):
             display.v("Module '{1}' returned failed with message '{0}".format(result.get('msg', ''), module_name))
@@ -150,7 +160,8 @@ class Which(SoftwareFactsPlugin):
                     result['msg'] = msg
                 else:
                     result['failed'] = False
-                    result['file'] = files[0]
+                    # The file found is kept in the cache, so it is copied before changing its path
+                    result['file'] = dict(files[0])
                     result['file']['path'] = result['file']['path'][len(path_prefix):]
 
         return result
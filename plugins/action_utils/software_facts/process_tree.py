@@ -0,0 +1,93 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from copy import deepcopy
+
+
+class ProcessTree(object):
+    """
+    Index of the processes of a host, built once per software_facts run.
+
+    Processes are the hierarchical ones prepared by the action plugin (`pid` -> process with its
+    `children`), which must be ordered by pid. Parent links, ancestor chains and descendant sets are
+    computed on first use and kept, and the pids claimed by detected software are tracked in a set,
+    so claiming or releasing a pid is O(1) and the tree itself is never rebuilt.
+
+    Processes in the tree are not modified once it is built. Detected software get their own copy
+    of the claimed processes with `copy`, so the tree doesn't need to be copied as a whole.
+    """
+
+    def __init__(self, processes_by_pid):
+        self._processes = processes_by_pid
+        self._pids = list(processes_by_pid)
+        self._ancestors = {}
+        self._descendants = {}
+        self._claimed = set()
+
+    def __contains__(self, pid):
+        return pid in self._processes
+
+    def __getitem__(self, pid):
+        return self._processes[pid]
+
+    def parent(self, pid):
+        """Return the pid of the parent of the process or None if it is not in the tree."""
+        ppid = str(self._processes[pid]['ppid'])
+        if ppid != pid and int(ppid) > 0 and ppid in self._processes:
+            return ppid
+        return None
+
+    def ancestors(self, pid):
+        """Return the pids of the ancestors of the process, nearest first."""
+        if pid not in self._ancestors:
+            chain = []
+            seen = set([pid])
+            parent = self.parent(pid)
+            while parent is not None and parent not in seen:
+                if parent in self._ancestors:
+                    chain.append(parent)
+                    chain.extend(p for p in self._ancestors[parent] if p not in seen)
+                    break
+                chain.append(parent)
+                seen.add(parent)
+                parent = self.parent(parent)
+            self._ancestors[pid] = tuple(chain)
+        return self._ancestors[pid]
+
+    def descendants(self, pid):
+        """Return the set of pids of all the descendants of the process."""
+        if pid not in self._descendants:
+            descendants = set()
+            pending = [self._processes[pid]]
+            while pending:
+                process = pending.pop()
+                for child in process.get('children', []):
+                    child_pid = str(child['pid'])
+                    if child_pid != str(process['pid']) and child_pid not in descendants:
+                        descendants.add(child_pid)
+                        pending.append(child)
+            descendants.discard(pid)
+            self._descendants[pid] = frozenset(descendants)
+        return self._descendants[pid]
+
+    def copy(self, pid):
+        """Return a copy of the process and its descendants that may be modified without changing the tree."""
+        return deepcopy(self._processes[pid])
+
+    def claim(self, pids):
+        """Mark the pids as used by a detected software, so they are not available for other ones."""
+        self._claimed.update(pids)
+
+    def release(self, pids):
+        """Make the pids available again."""
+        self._claimed.difference_update(pids)
+
+    def is_claimed(self, pid):
+        return pid in self._claimed
+
+    def unclaimed(self):
+        """Return the pids not claimed by any software, ordered by pid."""
+        return [pid for pid in self._pids if pid not in self._claimed]
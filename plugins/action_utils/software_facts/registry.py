@@ -0,0 +1,189 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+
+from ansible.module_utils.common.text.converters import to_bytes
+from ansible.utils.display import Display
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.compat.__init__ \
+    import import_module
+
+display = Display()
+
+# Increase when the format of the manifest changes, so previously generated ones are not used
+MANIFEST_VERSION = 1
+
+# Directory where the manifests are kept between executions. Set to an empty string to disable them.
+cache_dir_var = 'SOFTWARE_DISCOVERY_CACHE_DIR'
+default_cache_dir = os.path.join('~', '.ansible', 'cache', 'datadope.discovery')
+
+
+def _inheritors(klass):
+    subclasses = set()
+    work = [klass]
+    while work:
+        parent = work.pop()
+        for child in parent.__subclasses__():
+            if child not in subclasses:
+                subclasses.add(child)
+                work.append(child)
+    return subclasses
+
+
+def _walk(path):
+    """Yield the directories under the path and the python files of each one, skipping hidden and private ones."""
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d[0] == '.']
+        yield root, [f for f in files if not f[0] == '.' and not f.startswith('_') and f.lower().endswith('.py')]
+
+
+class Registry(object):
+    """
+    Classes of software facts plugins or parsers by name, imported the first time they are used.
+
+    The manifest of a registry maps every name to the module and class that implement it. It is
+    generated importing all the modules of the builtin directory and of the paths of the environment
+    var `path_var`, and then stored in the cache dir, so other processes only import the modules they
+    use. The manifest keeps the mtime of every directory it was generated from, and it is generated
+    again when any of them changes (a module added, removed or renamed) or when a name is not found.
+    """
+
+    def __init__(self, kind, base_class, path_var):
+        self.kind = kind
+        self._base_class = base_class
+        self._path_var = path_var
+        self._builtin_path = os.path.join(os.path.dirname(__file__), kind)
+        self._manifest = None
+        self._generated = False
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def _external_paths(self):
+        return sorted(set(p for p in os.environ.get(self._path_var, '').split(':') if p))
+
+    def _manifest_path(self):
+        cache_dir = os.environ.get(cache_dir_var, default_cache_dir)
+        if not cache_dir:
+            return None
+        key = repr((MANIFEST_VERSION, self.kind, self._builtin_path, self._external_paths(), sys.version_info[:2]))
+        return os.path.join(os.path.expanduser(cache_dir),
+                            '{0}-{1}.json'.format(self.kind, hashlib.sha1(to_bytes(key)).hexdigest()))
+
+    @staticmethod
+    def _is_valid(manifest):
+        if manifest.get('version') != MANIFEST_VERSION:
+            return False
+        for path, mtime in manifest['dirs'].items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _read_manifest(self):
+        manifest_path = self._manifest_path()
+        if manifest_path is None:
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            return manifest if self._is_valid(manifest) else None
+        except Exception:
+            # Missing or corrupt manifests are generated again
+            return None
+
+    def _write_manifest(self, manifest):
+        manifest_path = self._manifest_path()
+        if manifest_path is None:
+            return
+        try:
+            manifest_dir = os.path.dirname(manifest_path)
+            if not os.path.isdir(manifest_dir):
+                os.makedirs(manifest_dir, 0o700)
+            fd, tmp_path = tempfile.mkstemp(dir=manifest_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(manifest, f)
+                os.rename(tmp_path, manifest_path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            # Not being able to store the manifest only means it is generated again by the next process
+            display.debug("Cannot store software facts {0} manifest: {1}".format(self.kind, e))
+
+    def _generate_manifest(self):
+        dirs = {}
+        package = __package__ + '.' + self.kind
+        for root, files in _walk(self._builtin_path):
+            dirs[root] = os.stat(root).st_mtime
+            rel_dir = os.path.relpath(root, self._builtin_path)
+            root_package = package if rel_dir == '.' else '.'.join([package] + rel_dir.split(os.sep))
+            for filename in files:
+                import_module('{0}.{1}'.format(root_package, os.path.splitext(filename)[0]))
+        modules_paths = {}
+        for path in self._external_paths():
+            if path not in sys.path:
+                sys.path.append(path)
+            for root, files in _walk(path):
+                dirs[root] = os.stat(root).st_mtime
+                rel_dir = os.path.relpath(root, path)
+                module = [] if rel_dir == '.' else rel_dir.split(os.sep)
+                for filename in files:
+                    module_name = '.'.join(module + [os.path.splitext(filename)[0]])
+                    import_module(module_name)
+                    modules_paths[module_name] = path
+        entries = {}
+        for klass in _inheritors(self._base_class):
+            # Only classes of the scanned modules can be imported by name in other processes
+            if klass.__module__.startswith(package + '.') or klass.__module__ in modules_paths:
+                entries[klass.get_name()] = [klass.__module__, klass.__name__, modules_paths.get(klass.__module__)]
+        display.debug("Software Facts {0}: {1}".format(self.kind.title(), ', '.join(
+            ["{0}={1}".format(name, entry[1]) for name, entry in sorted(entries.items())])))
+        self._manifest = dict(version=MANIFEST_VERSION, dirs=dirs, entries=entries)
+        self._generated = True
+        self._write_manifest(self._manifest)
+
+    def _import_class(self, name):
+        entry = self._manifest['entries'].get(name)
+        if entry is None:
+            return None
+        module_name, class_name, path = entry
+        if path is not None and path not in sys.path:
+            sys.path.append(path)
+        try:
+            klass = getattr(import_module(module_name), class_name, None)
+        except ImportError:
+            return None
+        if klass is None or not issubclass(klass, self._base_class) or klass.get_name() != name:
+            return None
+        return klass
+
+    def get(self, name):
+        """Return the class with the name, or None if there is no plugin or parser with that name."""
+        klass = self._classes.get(name)
+        if klass is not None:
+            return klass
+        with self._lock:
+            if self._manifest is None:
+                self._manifest = self._read_manifest()
+            if self._manifest is None:
+                self._generate_manifest()
+            klass = self._import_class(name)
+            if klass is None and not self._generated:
+                # The manifest may be outdated if a module changed without changing its directory
+                self._generate_manifest()
+                klass = self._import_class(name)
+            if klass is not None:
+                self._classes[name] = klass
+        return klass
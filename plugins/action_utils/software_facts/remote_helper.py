@@ -0,0 +1,192 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import threading
+
+from ansible.module_utils.common.file import format_attributes
+from ansible.module_utils.common.text.converters import to_text
+from ansible.module_utils.six import string_types
+from ansible.module_utils.six.moves import shlex_quote
+from ansible.utils.display import Display
+
+display = Display()
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), 'remote_helper_script.py')
+
+# Executed by the interpreter of the target host: the first line of stdin has the requests and the rest the script
+BOOTSTRAP = "import sys; requests = sys.stdin.readline(); namespace = {'__name__': 'software_facts_helper'}; " \
+            "exec(compile(sys.stdin.read(), 'software_facts_helper', 'exec'), namespace); " \
+            "namespace['main'](requests)"
+
+STAT_MODULES = ('stat', 'ansible.builtin.stat', 'ansible.legacy.stat')
+FIND_MODULES = ('find', 'ansible.builtin.find', 'ansible.legacy.find')
+SLURP_MODULES = ('slurp', 'ansible.builtin.slurp', 'ansible.legacy.slurp')
+COMMAND_MODULES = ('command', 'ansible.builtin.command', 'ansible.legacy.command')
+STAT_FILES_MODULES = ('datadope.discovery.stat_files',)
+
+
+def _stat_request(module_args):
+    # Checksums are never requested by the plugins
+    if module_args.get('get_checksum', True) \
+            or set(module_args) - {'path', 'follow', 'get_checksum', 'get_mime', 'get_attributes'}:
+        return None
+    return [dict(kind='stat', path=module_args['path'], follow=module_args.get('follow', False),
+                 get_mime=module_args.get('get_mime', True), get_attributes=module_args.get('get_attributes', True))]
+
+
+def _stat_files_request(module_args):
+    if set(module_args) - {'paths', 'follow', 'get_mime', 'get_attributes'}:
+        return None
+    return [dict(kind='stat', path=path, follow=module_args.get('follow', False),
+                 get_mime=module_args.get('get_mime', True), get_attributes=module_args.get('get_attributes', True))
+            for path in module_args['paths']]
+
+
+def _find_request(module_args):
+    if module_args.get('recurse') or module_args.get('use_regex') or module_args.get('file_type') != 'file' \
+            or set(module_args) - {'paths', 'patterns', 'recurse', 'use_regex', 'file_type', 'hidden'}:
+        return None
+    paths, patterns = module_args['paths'], module_args['patterns']
+    return [dict(kind='find', hidden=module_args.get('hidden', False),
+                 paths=paths.split(',') if isinstance(paths, string_types) else paths,
+                 patterns=patterns.split(',') if isinstance(patterns, string_types) else patterns)]
+
+
+def _slurp_request(module_args):
+    if set(module_args) - {'src'}:
+        return None
+    return [dict(kind='read', path=module_args['src'])]
+
+
+def _command_request(module_args):
+    if set(module_args) - {'_raw_params', 'argv', 'chdir'} or \
+            (module_args.get('_raw_params') is None) == (module_args.get('argv') is None):
+        return None
+    request = dict(kind='exec', chdir=module_args.get('chdir'))
+    if module_args.get('argv') is not None:
+        request['argv'] = [to_text(arg) for arg in module_args['argv']]
+    else:
+        request['cmd'] = module_args['_raw_params']
+    return [request]
+
+
+def _add_attributes(result):
+    stat = result.get('stat', {})
+    if 'attr_flags' in stat:
+        stat['attributes'] = format_attributes(stat['attr_flags'])
+    return result
+
+
+def _single_result(results):
+    return _add_attributes(results[0])
+
+
+def _stat_files_result(module_args, results):
+    files = {}
+    for path, result in zip(module_args['paths'], results):
+        if result.get('failed', False):
+            files[path] = dict(failed=True, msg=result.get('msg', ''))
+        else:
+            files[path] = dict(stat=_add_attributes(result)['stat'])
+    return dict(changed=False, files=files)
+
+
+class RemoteHelper(object):
+    """
+    Session with the helper script executed in the target host instead of the modules that read its status,
+    created once per host and execution of software_facts.
+
+    Every module execution sends the module packaged with its dependencies and starts it in the target host.
+    The helper script only uses the python standard library, so it is sent as it is, with the list of requests
+    of a module execution (a request per path for `stat_files`). Results have the same data the module returns,
+    so plugins don't know which one answered. Module executions the helper cannot answer, because of the module
+    or its args, are executed as usual, as all of them are if the helper cannot be executed in the target host.
+    """
+
+    def __init__(self, interpreter):
+        self._interpreter = interpreter
+        self._script = None
+        self._broken = False
+        self._lock = threading.Lock()
+        self._translators = {}
+        for names, to_requests, to_result in (
+                (STAT_MODULES, _stat_request, lambda module_args, results: _single_result(results)),
+                (STAT_FILES_MODULES, _stat_files_request, _stat_files_result),
+                (FIND_MODULES, _find_request, lambda module_args, results: results[0]),
+                (SLURP_MODULES, _slurp_request, lambda module_args, results: results[0]),
+                (COMMAND_MODULES, _command_request, lambda module_args, results: results[0])):
+            for name in names:
+                self._translators[name] = (to_requests, to_result)
+
+    @classmethod
+    def create(cls, action_module, task_vars):
+        """Return the helper for the host of the task vars, or None if it cannot be used with the host."""
+        facts = task_vars.get('ansible_facts', {})
+        if facts.get('os_family', '').lower().startswith('windows') \
+                or not action_module._is_pipelining_enabled('new'):
+            # Requests are sent through stdin, as modules are with pipelining
+            return None
+        interpreter = task_vars.get('ansible_python_interpreter')
+        if not isinstance(interpreter, string_types) or interpreter.startswith('auto') or '{' in interpreter:
+            interpreter = facts.get('discovered_interpreter_python')
+        if not interpreter:
+            display.debug("Software facts remote helper not used: python interpreter of the host is unknown")
+            return None
+        return cls(interpreter)
+
+    def _get_script(self):
+        if self._script is None:
+            with open(SCRIPT_PATH, 'r') as f:
+                self._script = f.read()
+        return self._script
+
+    def request(self, action_module, requests):
+        """
+        Return the results of the requests, executing the helper once through the action module (with the
+        environment of its task), or None if it cannot be executed.
+        """
+        if self._broken:
+            return None
+        cmd = "{0} -c {1}".format(self._interpreter, shlex_quote(BOOTSTRAP))
+        environment = action_module._compute_environment_string()
+        if environment:
+            cmd = "{0} {1}".format(environment, cmd)
+        in_data = "{0}\n{1}".format(json.dumps(requests), self._get_script())
+        result = action_module._low_level_execute_command(cmd, sudoable=True, in_data=in_data)
+        if result.get('rc') != 0:
+            # The script answers every request, so it failing means the interpreter cannot run it
+            with self._lock:
+                self._broken = True
+            display.warning("Software facts remote helper cannot be executed, modules are executed instead: {0}"
+                            .format(result.get('stderr') or result.get('msg')))
+            return None
+        try:
+            results = json.loads(result['stdout'])
+            if not isinstance(results, list) or len(results) != len(requests):
+                raise ValueError("unexpected output")
+        except Exception as e:
+            # Output mixed with other data (e.g. a shell banner) only makes the module of this request execute
+            display.v("Software facts remote helper output cannot be read, module is executed instead: {0}"
+                      .format(e))
+            return None
+        return results
+
+    def execute_module(self, action_module, module_name, module_args, wrap_async=False):
+        """Return the result of the module answered by the helper, or None if the module must be executed."""
+        translator = self._translators.get(module_name)
+        if translator is None or wrap_async or self._broken:
+            return None
+        to_requests, to_result = translator
+        module_args = module_args or {}
+        requests = to_requests(module_args)
+        if requests is None:
+            return None
+        results = self.request(action_module, requests)
+        if results is None:
+            return None
+        return to_result(module_args, results)
@@ -0,0 +1,239 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Helper executed in POSIX target hosts by the software facts plugins instead of some modules.
+# It only uses the python standard library, so it is sent as it is, without being packaged as modules are.
+# It receives a JSON list of requests and writes the JSON list of their results to stdout, each one with the
+# same data the module it replaces would return.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import base64
+import codecs
+import datetime
+import errno
+import fnmatch
+import grp
+import json
+import os
+import pwd
+import shlex
+import stat
+import subprocess
+import sys
+
+
+try:
+    codecs.lookup_error('surrogateescape')
+    _DECODE_ERRORS = 'surrogateescape'
+except LookupError:
+    _DECODE_ERRORS = 'strict'
+
+
+def _to_text(data):
+    # Undecodable bytes are kept as surrogates, as modules return them
+    if isinstance(data, bytes):
+        return data.decode('utf-8', _DECODE_ERRORS)
+    return data
+
+
+def _expand(path):
+    """Return the path expanded as the `path` type of the module arguments does."""
+    return os.path.expanduser(os.path.expandvars(path))
+
+
+def _find_bin(name):
+    for path in os.environ.get('PATH', '').split(os.pathsep) + ['/sbin', '/usr/sbin', '/usr/local/sbin']:
+        candidate = os.path.join(path, name)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+def _run(argv, cwd=None):
+    process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               cwd=cwd, close_fds=True)
+    stdout, stderr = process.communicate(b'')
+    return process.returncode, _to_text(stdout), _to_text(stderr)
+
+
+def _stat_info(path, st):
+    """Return the data of ansible.builtin.find for a file."""
+    mode = st.st_mode
+    info = dict(
+        path=path,
+        mode="%04o" % stat.S_IMODE(mode),
+        isdir=stat.S_ISDIR(mode),
+        ischr=stat.S_ISCHR(mode),
+        isblk=stat.S_ISBLK(mode),
+        isreg=stat.S_ISREG(mode),
+        isfifo=stat.S_ISFIFO(mode),
+        islnk=stat.S_ISLNK(mode),
+        issock=stat.S_ISSOCK(mode),
+        uid=st.st_uid,
+        gid=st.st_gid,
+        size=st.st_size,
+        inode=st.st_ino,
+        dev=st.st_dev,
+        nlink=st.st_nlink,
+        atime=st.st_atime,
+        mtime=st.st_mtime,
+        ctime=st.st_ctime,
+        wusr=bool(mode & stat.S_IWUSR),
+        rusr=bool(mode & stat.S_IRUSR),
+        xusr=bool(mode & stat.S_IXUSR),
+        wgrp=bool(mode & stat.S_IWGRP),
+        rgrp=bool(mode & stat.S_IRGRP),
+        xgrp=bool(mode & stat.S_IXGRP),
+        woth=bool(mode & stat.S_IWOTH),
+        roth=bool(mode & stat.S_IROTH),
+        xoth=bool(mode & stat.S_IXOTH),
+        isuid=bool(mode & stat.S_ISUID),
+        isgid=bool(mode & stat.S_ISGID),
+    )
+    try:
+        info['pw_name'] = pwd.getpwuid(st.st_uid).pw_name
+    except (TypeError, KeyError):
+        pass
+    try:
+        info['gr_name'] = grp.getgrgid(st.st_gid).gr_name
+    except (KeyError, ValueError, OverflowError):
+        pass
+    return info
+
+
+def do_stat(path, follow=False, get_mime=True, get_attributes=True):
+    """Return the result of ansible.builtin.stat without checksum. Attributes are returned as lsattr flags."""
+    path = _expand(path)
+    try:
+        st = os.stat(path) if follow else os.lstat(path)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return dict(changed=False, stat=dict(exists=False))
+        return dict(failed=True, msg=e.strerror)
+    output = _stat_info(path, st)
+    output['exists'] = True
+    for name, mode in (('readable', os.R_OK), ('writeable', os.W_OK), ('executable', os.X_OK)):
+        output[name] = os.access(path, mode)
+    if output['islnk']:
+        output['lnk_source'] = os.path.realpath(path)
+        output['lnk_target'] = os.readlink(path)
+    if get_mime:
+        output['mimetype'] = output['charset'] = 'unknown'
+        file_bin = _find_bin('file')
+        if file_bin:
+            rc, out, err = _run([file_bin, '--brief', '--mime-type', '--mime-encoding', '--', path])
+            try:
+                if rc == 0:
+                    mimetype, charset = out.strip().split(';')
+                    output['mimetype'] = mimetype.strip()
+                    output['charset'] = charset.split('=')[1].strip()
+            except (ValueError, IndexError):
+                pass
+    if get_attributes:
+        output['version'] = None
+        output['attr_flags'] = ''
+        lsattr_bin = _find_bin('lsattr')
+        if lsattr_bin:
+            rc, out, err = _run([lsattr_bin, '-vd', path])
+            if rc == 0:
+                fields = out.split()
+                output['version'] = fields[0].strip()
+                output['attr_flags'] = fields[1].replace('-', '').strip()
+    return dict(changed=False, stat=output)
+
+
+def do_find(paths, patterns, hidden=False):
+    """Return the result of ansible.builtin.find for regular files, not recursive and with shell patterns."""
+    files = []
+    examined = 0
+    skipped = {}
+    for path in [_expand(path) for path in paths]:
+        if not os.path.isdir(path):
+            skipped[path] = "{0} was skipped as it does not seem to be a valid directory or it cannot be accessed" \
+                .format(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            examined += 1
+            if name.startswith('.') and not hidden:
+                continue
+            if not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                continue
+            full_path = os.path.join(path, name)
+            try:
+                st = os.lstat(full_path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                files.append(_stat_info(full_path, st))
+    return dict(changed=False, files=files, matched=len(files), examined=examined, skipped_paths=skipped,
+                msg="All paths examined" if not skipped else "Not all paths examined, check warnings for details")
+
+
+def do_read(path):
+    """Return the result of ansible.builtin.slurp."""
+    path = _expand(path)
+    try:
+        with open(path, 'rb') as source_fh:
+            content = source_fh.read()
+    except (IOError, OSError) as e:
+        if e.errno == errno.ENOENT:
+            msg = "file not found: {0}".format(path)
+        elif e.errno == errno.EACCES:
+            msg = "file is not readable: {0}".format(path)
+        elif e.errno == errno.EISDIR:
+            msg = "source is a directory and must be a file: {0}".format(path)
+        else:
+            msg = "unable to slurp file: {0}".format(e)
+        return dict(failed=True, msg=msg)
+    return dict(changed=False, content=_to_text(base64.b64encode(content)), encoding='base64', source=path)
+
+
+def do_exec(argv=None, cmd=None, chdir=None):
+    """Return the result of ansible.builtin.command, expanding user and variables of the args as it does."""
+    if argv is None:
+        argv = shlex.split(cmd)
+    argv = [_expand(arg) for arg in argv]
+    if chdir is not None:
+        chdir = _expand(chdir)
+    start = datetime.datetime.now()
+    try:
+        rc, stdout, stderr = _run(argv, cwd=chdir)
+    except OSError as e:
+        return dict(failed=True, changed=False, rc=e.errno, stdout='', stderr='', msg=str(e), cmd=argv)
+    end = datetime.datetime.now()
+    stdout = stdout.rstrip('\r\n')
+    stderr = stderr.rstrip('\r\n')
+    result = dict(changed=True, cmd=argv, rc=rc, stdout=stdout, stderr=stderr,
+                  stdout_lines=stdout.splitlines(), stderr_lines=stderr.splitlines(),
+                  start=str(start), end=str(end), delta=str(end - start), msg='')
+    if rc != 0:
+        result['failed'] = True
+        result['msg'] = 'non-zero return code'
+    return result
+
+
+# A dict literal, as exec is a keyword in python 2
+HANDLERS = {'stat': do_stat, 'find': do_find, 'read': do_read, 'exec': do_exec}
+
+
+def main(requests=None):
+    if requests is None:
+        requests = sys.stdin.read()
+    results = []
+    for request in json.loads(requests):
+        request = dict(request)
+        handler = HANDLERS.get(request.pop('kind', None))
+        if handler is None:
+            results.append(dict(failed=True, msg="Unknown request"))
+            continue
+        try:
+            results.append(handler(**request))
+        except Exception as e:
+            results.append(dict(failed=True, msg="Helper request failed: {0}".format(e)))
+    sys.stdout.write(json.dumps(results))
+
+
+if __name__ == '__main__':
+    main()
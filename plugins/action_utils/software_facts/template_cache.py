@@ -0,0 +1,134 @@
+# Copyright: (c) 2022, DataDope (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+
+from ansible.module_utils.six import get_unbound_function, integer_types, iteritems, string_types, text_type
+from jinja2 import Environment
+
+# Strings containing none of these markers are returned as they are, without calling the templar
+TEMPLATE_MARKERS = ('<<', '{{', '{%', '{#')
+
+# Caches are cleared when they reach this number of entries, so strings built from the instance
+# data cannot make them grow without limit
+MAX_ENTRIES = 4096
+
+_sources = {}
+_compiled = {}
+_names = {}
+_lock = threading.Lock()
+_caching_classes = {}
+
+
+def to_jinja_source(data):
+    """
+    Return the jinja2 source of a string using the `<< >>` syntax for instance vars, or None if the
+    string contains no template at all and doesn't need to be templated.
+    """
+    try:
+        return _sources[data]
+    except KeyError:
+        pass
+    if any(marker in data for marker in TEMPLATE_MARKERS):
+        source = data.replace('<<', '{{').replace('>>', '}}')
+    else:
+        source = None
+    if len(_sources) >= MAX_ENTRIES:
+        _sources.clear()
+    _sources[data] = source
+    return source
+
+
+def is_template_free(data):
+    """
+    Return whether the data (strings, numbers, booleans and lists and dicts of them) has no templates,
+    so templating it would return the same data.
+    """
+    if isinstance(data, text_type):
+        return to_jinja_source(data) is None
+    if isinstance(data, list):
+        return all(is_template_free(v) for v in data)
+    if isinstance(data, dict):
+        return all(is_template_free(k) and is_template_free(v) for k, v in iteritems(data))
+    return data is None or isinstance(data, (bool, integer_types, float))
+
+
+def _names_key(mapping):
+    """Return the names in the filters or tests mapping of an environment, computed again only if it grows."""
+    key = id(mapping)
+    cached = _names.get(key)
+    if cached is None or cached[0] is not mapping or cached[1] != len(mapping):
+        cached = (mapping, len(mapping), frozenset(mapping))
+        with _lock:
+            if len(_names) >= MAX_ENTRIES:
+                _names.clear()
+            _names[key] = cached
+    return cached[2]
+
+
+def _compile_settings(environment):
+    """
+    Return the settings of the environment that change the code compiled for a template source,
+    including the names of its filters and tests, since the compiler checks them.
+    """
+    return (type(environment),
+            environment.block_start_string, environment.block_end_string,
+            environment.variable_start_string, environment.variable_end_string,
+            environment.comment_start_string, environment.comment_end_string,
+            environment.line_statement_prefix, environment.line_comment_prefix,
+            environment.trim_blocks, environment.lstrip_blocks,
+            environment.newline_sequence, environment.keep_trailing_newline,
+            environment.optimized, environment.autoescape, environment.finalize,
+            getattr(environment, 'is_async', getattr(environment, 'enable_async', False)),
+            tuple(sorted(environment.extensions)),
+            _names_key(environment.filters), _names_key(environment.tests))
+
+
+class _CompiledTemplatesMixin(object):
+    """
+    Keeps the code compiled for template sources, so templating the same string again only
+    has to render it. The code is shared by all the environments with the same settings in
+    the worker, i.e. it is reused for every instance and host.
+    """
+
+    def compile(self, source, name=None, filename=None, raw=False, defer_init=False):
+        if name is not None or filename is not None or raw or defer_init or not isinstance(source, string_types):
+            return super(_CompiledTemplatesMixin, self).compile(source, name=name, filename=filename, raw=raw,
+                                                                defer_init=defer_init)
+        key = (source, _compile_settings(self))
+        code = _compiled.get(key)
+        if code is None:
+            # Template errors are not cached, so they are raised every time as templar expects
+            code = super(_CompiledTemplatesMixin, self).compile(source)
+            with _lock:
+                if len(_compiled) >= MAX_ENTRIES:
+                    _compiled.clear()
+                _compiled[key] = code
+        return code
+
+
+def _caching_class(env_class):
+    with _lock:
+        if env_class not in _caching_classes:
+            _caching_classes[env_class] = type(env_class.__name__, (_CompiledTemplatesMixin, env_class), {})
+        return _caching_classes[env_class]
+
+
+def copy_with_compiled_templates(templar, **kwargs):
+    """
+    Return a copy of the templar, as `Templar.copy_with_new_env(**kwargs)` does, whose new jinja2 environment
+    (and the overlays created from it) reuse the code compiled for each template source. The environment of
+    the templar is not changed. Environments whose class overrides `compile` are copied as they are.
+    """
+    environment = templar.environment
+    env_class = type(environment)
+    if isinstance(environment, Environment) and not issubclass(env_class, _CompiledTemplatesMixin) \
+            and get_unbound_function(env_class.compile) is get_unbound_function(Environment.compile):
+        env_class = _caching_class(env_class)
+    new_templar = templar.copy_with_new_env(environment_class=env_class, **kwargs)
+    # Set by copy_with_new_env only when the class is exactly the native one
+    new_templar.jinja2_native = getattr(templar, 'jinja2_native', False)
+    return new_templar
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible.module_utils.common.text.converters import to_text
+from ansible_collections.datadope.discovery.plugins.module_utils.xmltodict import parse as xml_parse
+
+# Parsers that can be applied in the target host, with the same results as the software facts parsers
+TARGET_PARSERS = ('json', 'xml')
+
+
+def parse_content(source, parser, parser_params=None):
+    """
+    Return the content parsed as the software facts parser with that name does. The source may be the
+    content (bytes) or the file object to read it from, which xml parser reads while it is parsed.
+    Raise ValueError if the content cannot be parsed.
+    """
+    if parser_params is None:
+        parser_params = {}
+    if parser == 'xml':
+        try:
+            return xml_parse(source, attr_prefix=parser_params.get('attr_prefix', 'attr-'))
+        except Exception as e:
+            raise ValueError("Cannot parse text into XML: {0}".format(str(e)))
+    if parser == 'json':
+        if hasattr(source, 'read'):
+            source = source.read()
+        try:
+            return json.loads(to_text(source, errors='surrogate_or_replace'), **parser_params)
+        except Exception as e:
+            raise ValueError("Cannot parse text into json: {0}".format(str(e)))
+    raise ValueError("Parser '{0}' cannot be applied in the target host; supported parsers are '{1}'"
+                     .format(parser, "', '".join(TARGET_PARSERS)))
+
+
+def _select_path(data, keys):
+    """Return whether the keys are found in the data, and the value they lead to."""
+    if not keys:
+        return True, data
+    key, rest = keys[0], keys[1:]
+    if isinstance(data, dict):
+        if key not in data:
+            return False, None
+        return _select_path(data[key], rest)
+    if isinstance(data, list):
+        if key.isdigit():
+            index = int(key)
+            return _select_path(data[index], rest) if index < len(data) else (False, None)
+        # Keys are looked up in every element of the list, keeping the values of the elements that have them
+        values = []
+        for item in data:
+            found, value = _select_path(item, keys)
+            if found:
+                values.append(value)
+        return bool(values), values
+    return False, None
+
+
+def select_paths(data, paths):
+    """
+    Return the values of the parsed data at the paths, keyed by path. Paths are the keys to follow separated
+    by dots (`server.profile`). Numeric keys are indexes of lists, and other keys reached in a list are looked
+    up in each of its elements, returning the list of values found. Paths not found are not returned.
+    """
+    selected = {}
+    for path in paths:
+        found, value = _select_path(data, path.split('.'))
+        if found:
+            selected[path] = value
+    return selected
@@ -16,8 +16,10 @@ import logging
 import os
 import re
 import tempfile
+from multiprocessing.pool import ThreadPool
 
 from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.apache_webserver.errors import *
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.cache import grammar_key
 from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.apache_webserver.lexer import make_lexer
 from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.apache_webserver.parser import make_parser
 
@@ -72,6 +74,9 @@ def make_loader(configfile='', **kwargs):
         'namedblocks': True,
         'envvars':  {},
         'pathprefix': '',
+        'tabledir': None,
+        'parsecache': None,
+        'includeworkers': 1,
     }
     options.update(kwargs)
 
@@ -79,7 +84,7 @@ def make_loader(configfile='', **kwargs):
     ApacheConfigParser = make_parser(**options)
 
     return ApacheConfigLoader(
-        ApacheConfigParser(ApacheConfigLexer()), **options)
+        ApacheConfigParser(ApacheConfigLexer(), tabledir=options['tabledir']), **options)
 
 
 class ApacheConfigLoader(object):
@@ -97,6 +102,14 @@ class ApacheConfigLoader(object):
         self._stack = []
         self._includes = set()
         self._ast_cache = {}
+        # The parse cache relies on the local filesystem and on files not being altered by plugs
+        self._parse_cache = self._options.get('parsecache')
+        if 'reader' in self._options or 'plug' in self._options:
+            self._parse_cache = None
+        self._grammar_key = None
+        if self._parse_cache is not None:
+            self._grammar_key = grammar_key(self._parser, self._options)
+        self._prefetched = {}
 
     # Code generation rules
 
@@ -352,6 +365,8 @@ class ApacheConfigLoader(object):
         filepaths = []
         filepaths = self._search_path(filepath)
 
+        self._prefetch(filepaths)
+
         contents = {}
         for filepath in filepaths:
             items = self.load(filepath, initialize=False)
@@ -359,6 +374,39 @@ class ApacheConfigLoader(object):
 
         return contents
 
+    def _prefetch(self, filepaths):
+        """Reads the given files in parallel if `includeworkers` allows it.
+
+        Only the file reading (or the parse cache lookup) is done in parallel. The files
+        are parsed and walked later by `load` in the main thread, where the lexer match
+        timeout can be applied, and in the same order as without workers, since
+        variables interpolation and nested includes depend on that order.
+        """
+        workers = self._options.get('includeworkers') or 1
+        if 'plug' in self._options:
+            # pre_open / pre_read hooks must see the files in order
+            return
+        filepaths = [x for x in filepaths
+                     if x not in self._ast_cache and x not in self._prefetched]
+        if workers < 2 or len(filepaths) < 2:
+            return
+
+        pool = ThreadPool(min(workers, len(filepaths)))
+        try:
+            results = pool.map(self._fetch_file, filepaths)
+        finally:
+            pool.close()
+            pool.join()
+        self._prefetched.update(zip(filepaths, results))
+
+    def _fetch_file(self, filepath):
+        """Returns (text, ast, cache_key, error) for a file. Runs in the prefetch worker threads."""
+        try:
+            return self._read_file(filepath) + (None,)
+        except Exception as ex:
+            # Errors are raised when the file is loaded, as it would happen without workers
+            return None, None, None, ex
+
     def _merge_contents(self, contents, items):
         """Merges items into existing contents dictionary.
         Returns new contents.
@@ -431,7 +479,26 @@ class ApacheConfigLoader(object):
 
         return handler(ast[1:])
 
-    def loads(self, text, initialize=True, source=None):
+    def _read_file(self, filepath):
+        """Returns (text, ast, cache_key) of a file. The ast is only set when it is taken from the parse cache,
+        and then the file is not read."""
+        cache_key = None
+        if self._parse_cache is not None:
+            cache_key = self._parse_cache.key(filepath, self._grammar_key)
+            ast = self._parse_cache.get(cache_key)
+            if ast is not None:
+                return None, ast, cache_key
+        with self._reader.open(filepath) as f:
+            return f.read(), None, cache_key
+
+    def _parse_text(self, text, cache_key):
+        """Returns the ast of the text of a file, storing it in the parse cache."""
+        ast = self._parser.parse(text) if text else None
+        if ast is not None and self._parse_cache is not None:
+            self._parse_cache.set(cache_key, ast)
+        return ast
+
+    def loads(self, text, initialize=True, source=None, ast=None):
         """Loads config text into a dictionary object.
 
         Args:
@@ -440,7 +507,7 @@ class ApacheConfigLoader(object):
         Returns:
             (dict) containing configuration information loaded from text.
         """
-        if not text:
+        if not text and ast is None:
             self._ast_cache[source] = {}
             return {}
 
@@ -459,7 +526,8 @@ class ApacheConfigLoader(object):
         except KeyError:
             pass
 
-        ast = self._parser.parse(text)
+        if ast is None:
+            ast = self._parser.parse(text)
 
         self._ast_cache[source] = self._walkast(ast)
         return self._ast_cache[source]
@@ -478,6 +546,7 @@ class ApacheConfigLoader(object):
             self._stack = []
             self._includes = set()
             self._ast_cache = {}
+            self._prefetched = {}
 
         try:
             pre_open = self._options['plug']['pre_open']
@@ -506,6 +575,20 @@ class ApacheConfigLoader(object):
             return self._ast_cache[filepath]
 
         try:
+            if filepath in self._prefetched:
+                text, ast, cache_key, error = self._prefetched.pop(filepath)
+                if error is not None:
+                    raise error
+                if ast is None:
+                    ast = self._parse_text(text, cache_key)
+                return self.loads(text, source=filepath, ast=ast)
+
+            if self._parse_cache is not None:
+                text, ast, cache_key = self._read_file(filepath)
+                if ast is None:
+                    ast = self._parse_text(text, cache_key)
+                return self.loads(text, source=filepath, ast=ast)
+
             with self._reader.open(filepath) as f:
                 return self.loads(f.read(), source=filepath)
 
@@ -516,6 +599,7 @@ class ApacheConfigLoader(object):
         finally:
             if initialize:
                 self._ast_cache = {}
+                self._prefetched = {}
 
     def _dumpdict(self, obj, indent=0, continue_tag=False):
         if not isinstance(obj, dict):
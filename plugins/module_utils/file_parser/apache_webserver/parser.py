@@ -86,10 +86,11 @@ class ApacheIncludesParser(object):
 
 class BaseApacheConfigParser(object):
 
-    def __init__(self, lexer, start='config', tempdir=None, debug=False):
+    def __init__(self, lexer, start='config', tempdir=None, debug=False, tabledir=None):
         self._lexer = lexer
         self.tokens = lexer.tokens  # parser needs this implicitly
         self._tempdir = tempdir
+        self._tabledir = tabledir
         self._debug = debug
         self._start = start
         self._preserve_whitespace = self.options.get('preservewhitespace',
@@ -103,6 +104,7 @@ class BaseApacheConfigParser(object):
             start=self._start,
             outputdir=self._tempdir,
             write_tables=bool(self._tempdir),
+            tabledir=self._tabledir,
             debug=self._debug,
 #            debuglog=yacc.PlyLogger(sys.stdout),
 #            errorlog=yacc.PlyLogger(sys.stdout),
@@ -111,8 +113,9 @@ class BaseApacheConfigParser(object):
         )
 
     def parse(self, text):
-        self.reset()
-        return self.engine.parse(text)
+        # The engine built on init holds no state between parses, so it is reused for every file.
+        # Each file is tokenized by a clone of the compiled lexer, so no lexer state leaks between files.
+        return self.engine.parse(text, lexer=self._lexer.engine.clone())
 
     # PARSING RULES
     # =============
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+
+from ansible.module_utils.common.text.converters import to_bytes
+from ansible.module_utils.six import string_types
+
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.apache_webserver.lexer \
+    import DoubleQuotedString, SingleQuotedString
+
+# Increase when the loaders change the AST they produce, so previously cached entries are not used
+CACHE_VERSION = 2
+
+# Loader options that are only used when walking the AST or looking for files, so they don't
+# change the AST of a file and are not part of the cache key
+WALK_OPTIONS = ('file', 'configpath', 'envvars', 'pathprefix', 'strictvars', 'tabledir', 'includeworkers',
+                'parsecache')
+
+
+def grammar_key(parser, options):
+    """
+    Return a value identifying how a parser builds the AST of a file: its grammar rules, the rules
+    of its lexer and the loader options that may change the result.
+    """
+    rules = []
+    for obj in (parser, parser._lexer):
+        for name in sorted(dir(obj)):
+            if name.startswith(('p_', 't_')) or name in ('tokens', 'states'):
+                value = getattr(obj, name)
+                rules.append((name, value.__doc__ if callable(value) else value))
+    used_options = sorted((k, repr(v)) for k, v in options.items() if k not in WALK_OPTIONS)
+    return repr((CACHE_VERSION, type(parser).__module__, rules, used_options))
+
+
+def is_private(path):
+    """
+    Return whether the path is owned by the current user and cannot be modified by other users, so
+    cached data read from it can be trusted. Symbolic links are never trusted.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return st.st_uid == os.geteuid() and not stat.S_ISLNK(st.st_mode) \
+        and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def encode_ast(ast):
+    """
+    Return the AST as JSON compatible data. Lists and plain strings are kept as they are, tuples
+    and quoted strings are tagged in a single key dict so `decode_ast` restores their type.
+    """
+    if ast is None or isinstance(ast, (bool, int, float)):
+        return ast
+    if isinstance(ast, list):
+        return [encode_ast(value) for value in ast]
+    if isinstance(ast, tuple):
+        return {'t': [encode_ast(value) for value in ast]}
+    if isinstance(ast, SingleQuotedString):
+        return {'s': ast}
+    if isinstance(ast, DoubleQuotedString):
+        return {'d': ast}
+    if type(ast) in string_types:
+        return ast
+    raise TypeError("Unsupported AST value of type {0}".format(type(ast)))
+
+
+def decode_ast(data):
+    """Return the AST encoded by `encode_ast`."""
+    if isinstance(data, list):
+        return [decode_ast(value) for value in data]
+    if isinstance(data, dict):
+        tag, value = list(data.items())[0]
+        if tag == 't':
+            return tuple(decode_ast(v) for v in value)
+        return SingleQuotedString(value) if tag == 's' else DoubleQuotedString(value)
+    return data
+
+
+class ParseCache(object):
+    """
+    On disk cache of the AST of parsed files.
+
+    Entries are keyed by the identity of the file (path, mtime, size, inode and device) and the
+    grammar used to parse it, so any change of the file or of the parser just misses the cache.
+    Entries are stored as one JSON file each, and their mtime is refreshed when they are used,
+    so `prune` can remove the least recently used ones once the cache exceeds `max_size` bytes.
+    Entries not owned by the current user or writable by others are ignored. A `read_only` cache
+    (used in check mode) never writes or removes entries.
+    """
+
+    def __init__(self, directory, max_size=None, read_only=False):
+        self._directory = directory
+        self._max_size = max_size
+        self._read_only = read_only
+
+    def key(self, filepath, grammar):
+        """Return the cache key of the file as it is now, or None if it cannot be cached."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return repr((os.path.realpath(filepath), repr(stat.st_mtime), stat.st_size, stat.st_ino, stat.st_dev,
+                     grammar))
+
+    def _entry_path(self, key):
+        return os.path.join(self._directory, hashlib.sha1(to_bytes(key)).hexdigest() + '.json')
+
+    def get(self, key):
+        """Return the cached AST for the key or None if it is not cached."""
+        if key is None:
+            return None
+        entry_path = self._entry_path(key)
+        if not is_private(entry_path):
+            return None
+        try:
+            with open(entry_path, 'r') as f:
+                stored_key, data = json.load(f)
+            if stored_key != key:
+                return None
+            ast = decode_ast(data)
+            if not self._read_only:
+                os.utime(entry_path, None)
+            return ast
+        except Exception:
+            # Missing, unreadable or corrupt entries are just a cache miss
+            return None
+
+    def set(self, key, ast):
+        """
+        Store the AST for the key. The key must be taken before reading the file, so a file
+        modified while being parsed is never stored under its new identity.
+        """
+        if key is None or self._read_only:
+            return
+        try:
+            data = encode_ast(ast)
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump([key, data], f)
+                os.rename(tmp_path, self._entry_path(key))
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            # Not being able to cache a file must never make the parsing fail
+            pass
+
+    def prune(self):
+        """Remove the least recently used entries until the cache size is below `max_size`."""
+        if not self._max_size or self._read_only:
+            return
+        entries = []
+        total_size = 0
+        for name in os.listdir(self._directory):
+            path = os.path.join(self._directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+        for _mtime, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            try:
+                os.unlink(path)
+                total_size -= size
+            except OSError:
+                pass
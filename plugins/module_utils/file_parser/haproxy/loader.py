@@ -17,6 +17,7 @@ import os
 import re
 import tempfile
 
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.cache import grammar_key
 from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.haproxy.lexer import make_lexer
 from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.haproxy.parser import make_parser
 
@@ -74,6 +75,8 @@ def make_loader(configfile='', **kwargs):
         'namedblocks': False,
         'envvars':  {},
         'pathprefix': '',
+        'tabledir': None,
+        'parsecache': None,
     }
     options.update(kwargs)
 
@@ -81,7 +84,7 @@ def make_loader(configfile='', **kwargs):
     HAProxyConfigParser = make_parser(**options)
 
     return HAProxyConfigLoader(
-        HAProxyConfigParser(HAProxyConfigLexer()), **options)
+        HAProxyConfigParser(HAProxyConfigLexer(), tabledir=options['tabledir']), **options)
 
 
 class HAProxyConfigLoader(object):
@@ -99,6 +102,13 @@ class HAProxyConfigLoader(object):
         self._stack = []
         self._includes = set()
         self._ast_cache = {}
+        # The parse cache relies on the local filesystem and on files not being altered by plugs
+        self._parse_cache = self._options.get('parsecache')
+        if 'reader' in self._options or 'plug' in self._options:
+            self._parse_cache = None
+        self._grammar_key = None
+        if self._parse_cache is not None:
+            self._grammar_key = grammar_key(self._parser, self._options)
 
     # Code generation rules
 
@@ -384,7 +394,26 @@ class HAProxyConfigLoader(object):
 
         return handler(ast[1:])
 
-    def loads(self, text, initialize=True, source=None):
+    def _read_file(self, filepath):
+        """Returns (text, ast, cache_key) of a file. The ast is only set when it is taken from the parse cache,
+        and then the file is not read."""
+        cache_key = None
+        if self._parse_cache is not None:
+            cache_key = self._parse_cache.key(filepath, self._grammar_key)
+            ast = self._parse_cache.get(cache_key)
+            if ast is not None:
+                return None, ast, cache_key
+        with self._reader.open(filepath) as f:
+            return f.read(), None, cache_key
+
+    def _parse_text(self, text, cache_key):
+        """Returns the ast of the text of a file, storing it in the parse cache."""
+        ast = self._parser.parse(text) if text else None
+        if ast is not None and self._parse_cache is not None:
+            self._parse_cache.set(cache_key, ast)
+        return ast
+
+    def loads(self, text, initialize=True, source=None, ast=None):
         """Loads config text into a dictionary object.
 
         Args:
@@ -393,7 +422,7 @@ class HAProxyConfigLoader(object):
         Returns:
             (dict) containing configuration information loaded from text.
         """
-        if not text:
+        if not text and ast is None:
             self._ast_cache[source] = {}
             return {}
 
@@ -412,7 +441,8 @@ class HAProxyConfigLoader(object):
         except KeyError:
             pass
 
-        ast = self._parser.parse(text)
+        if ast is None:
+            ast = self._parser.parse(text)
 
         self._ast_cache[source] = self._walkast(ast)
         return self._ast_cache[source]
@@ -459,6 +489,12 @@ class HAProxyConfigLoader(object):
             return self._ast_cache[filepath]
 
         try:
+            if self._parse_cache is not None:
+                text, ast, cache_key = self._read_file(filepath)
+                if ast is None:
+                    ast = self._parse_text(text, cache_key)
+                return self.loads(text, source=filepath, ast=ast)
+
             with self._reader.open(filepath) as f:
                 return self.loads(f.read(), source=filepath)
 
@@ -32,10 +32,11 @@ class HashCommentsParser(object):
 
 class BaseHAProxyConfigParser(object):
 
-    def __init__(self, lexer, start='config', tempdir=None, debug=False):
+    def __init__(self, lexer, start='config', tempdir=None, debug=False, tabledir=None):
         self._lexer = lexer
         self.tokens = lexer.tokens  # parser needs this implicitly
         self._tempdir = tempdir
+        self._tabledir = tabledir
         self._debug = debug
         self._start = start
         self._preserve_whitespace = self.options.get('preservewhitespace',
@@ -49,6 +50,7 @@ class BaseHAProxyConfigParser(object):
             start=self._start,
             outputdir=self._tempdir,
             write_tables=bool(self._tempdir),
+            tabledir=self._tabledir,
             debug=self._debug,
 #            debuglog=yacc.PlyLogger(sys.stdout),
 #            errorlog=yacc.PlyLogger(sys.stdout),
@@ -57,8 +59,9 @@ class BaseHAProxyConfigParser(object):
         )
 
     def parse(self, text):
-        self.reset()
-        return self.engine.parse(text)
+        # The engine built on init holds no state between parses, so it is reused for every file.
+        # Each file is tokenized by a clone of the compiled lexer, so no lexer state leaks between files.
+        return self.engine.parse(text, lexer=self._lexer.engine.clone())
 
     # PARSING RULES
     # =============
@@ -53,15 +53,27 @@ except AttributeError:
 
 import signal
 import functools
+import threading
 
 class TimeoutError(Exception): pass
 
+def _in_main_thread():
+    try:
+        return threading.current_thread() is threading.main_thread()
+    except AttributeError:
+        # Python 2
+        return isinstance(threading.current_thread(), threading._MainThread)
+
 def timeout(seconds, error_message = 'Function call timed out'):
     def decorated(func):
         def _handle_timeout(signum, frame):
             raise TimeoutError(error_message)
 
         def wrapper(*args, **kwargs):
+            # Signal handlers can only be set from the main thread, elsewhere no timeout is applied.
+            # The loaders only read files in their worker threads and parse them in the main thread.
+            if not _in_main_thread():
+                return func(*args, **kwargs)
             signal.signal(signal.SIGALRM, _handle_timeout)
             signal.alarm(seconds)
             try:
@@ -77,6 +89,10 @@ def timeout(seconds, error_message = 'Function call timed out'):
 # This regular expression is used to match valid token names
 _is_identifier = re.compile(r'^[a-zA-Z0-9_]+$')
 
+# Lexers already built by this process, keyed by the signature of their rules. Building the master
+# regular expressions is the expensive part of lex(), so lexers for the same rules are cloned from here.
+_lexer_cache = {}
+
 # Exception thrown when invalid token encountered and no default error
 # handler is defined.
 class LexError(Exception):
@@ -190,7 +206,15 @@ class Lexer:
             c.lexstateerrorf = {}
             for key, ef in self.lexstateerrorf.items():
                 c.lexstateerrorf[key] = getattr(object, ef.__name__)
+            c.lexstateeoff = {}
+            for key, ef in self.lexstateeoff.items():
+                c.lexstateeoff[key] = getattr(object, ef.__name__)
             c.lexmodule = object
+            # The current state tables must point to the rebound functions too
+            c.lexre = c.lexstatere[c.lexstate]
+            c.lexerrorf = c.lexstateerrorf.get(c.lexstate, None)
+            c.lexeoff = c.lexstateeoff.get(c.lexstate, None)
+        c.lexstatestack = list(self.lexstatestack)
         return c
 
     # ------------------------------------------------------------
@@ -892,6 +916,22 @@ class LexerReflect(object):
                     self.error = True
             linen += 1
 
+# -----------------------------------------------------------------------------
+# _lexer_signature()
+#
+# Return a hashable value identifying the rules collected by a LexerReflect object
+# -----------------------------------------------------------------------------
+def _lexer_signature(linfo):
+    rules = []
+    for state in sorted(linfo.stateinfo):
+        rules.append((state, linfo.stateinfo[state],
+                      tuple((fname, _get_regex(f)) for fname, f in linfo.funcsym.get(state, [])),
+                      tuple(linfo.strsym.get(state, [])),
+                      linfo.ignore.get(state),
+                      getattr(linfo.errorf.get(state), '__name__', None),
+                      getattr(linfo.eoff.get(state), '__name__', None)))
+    return (tuple(linfo.tokens), tuple(linfo.literals), linfo.reflags, tuple(rules))
+
 # -----------------------------------------------------------------------------
 # lex(module)
 #
@@ -942,6 +982,18 @@ def lex(module=None, object=None, debug=False, optimize=False, lextab='lextab',
     # Collect parser information from the dictionary
     linfo = LexerReflect(ldict, log=errorlog, reflags=reflags)
     linfo.get_all()
+
+    # Lexers defined by an object are cloned from an already built lexer with the same rules
+    signature = None
+    if module and not optimize:
+        signature = _lexer_signature(linfo)
+        if signature in _lexer_cache:
+            lexobj = _lexer_cache[signature].clone(module)
+            token = lexobj.token
+            input = lexobj.input
+            lexer = lexobj
+            return lexobj
+
     if not optimize:
         if linfo.validate_all():
             raise SyntaxError("Can't build lexer")
@@ -1056,6 +1108,9 @@ def lex(module=None, object=None, debug=False, optimize=False, lextab='lextab',
     input = lexobj.input
     lexer = lexobj
 
+    if signature is not None:
+        _lexer_cache[signature] = lexobj.clone()
+
     # If in optimize mode, we write the lextab
     if lextab and optimize:
         if outputdir is None:
@@ -62,11 +62,14 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import hashlib
+import json
 import re
 import types
 import sys
 import os.path
 import inspect
+import tempfile
 import warnings
 
 __version__    = '3.11'
@@ -94,6 +97,10 @@ resultlimit = 40               # Size limit of results when running in debug mod
 
 pickle_protocol = 0            # Protocol to use when writing pickle files
 
+# Tables already generated by this process, keyed by (method, grammar signature). Grammars are
+# rebuilt for every parser instance, so this keeps LALR generation to once per grammar and run.
+_lr_table_cache = {}
+
 # String type-checking compatibility
 if sys.version_info[0] < 3:
     string_types = basestring
@@ -2028,11 +2035,47 @@ class LRTable(object):
         in_f.close()
         return signature
 
+    def read_json(self, filename):
+        # Tables kept in a cache directory are stored as JSON, so reading them never runs any code
+        if not os.path.exists(filename):
+            raise ImportError
+
+        with open(filename, 'r') as in_f:
+            data = json.load(in_f)
+
+        if data['tabversion'] != __tabversion__:
+            raise VersionError('yacc table file version is out of date')
+        self.lr_method = data['method']
+        self.lr_action = dict((int(state), actions) for state, actions in data['action'].items())
+        self.lr_goto = dict((int(state), gotos) for state, gotos in data['goto'].items())
+
+        self.lr_productions = []
+        for p in data['productions']:
+            self.lr_productions.append(MiniProduction(*p))
+
+        return data['signature']
+
     # Bind all production function names to callable objects in pdict
     def bind_callables(self, pdict):
         for p in self.lr_productions:
             p.bind(pdict)
 
+    # Return a new table sharing the (read-only) action and goto tables but with its own
+    # productions, so several parser objects can bind their callables independently
+    def copy(self):
+        lr = LRTable()
+        lr.lr_action = self.lr_action
+        lr.lr_goto = self.lr_goto
+        lr.lr_method = self.lr_method
+        lr.lr_productions = []
+        for p in self.lr_productions:
+            if p.func:
+                lr.lr_productions.append(MiniProduction(p.str, p.name, p.len, p.func,
+                                                        os.path.basename(p.file), p.line))
+            else:
+                lr.lr_productions.append(MiniProduction(str(p), p.name, p.len, None, None, None))
+        return lr
+
 
 # -----------------------------------------------------------------------------
 #                           === LR Generator ===
@@ -2871,6 +2914,32 @@ del _lr_goto_items
                     outp.append((str(p), p.name, p.len, None, None, None))
             pickle.dump(outp, outf, pickle_protocol)
 
+    # -----------------------------------------------------------------------------
+    # json_table()
+    #
+    # This function writes the LR parsing tables as JSON to a supplied file name
+    # -----------------------------------------------------------------------------
+
+    def json_table(self, filename, signature=''):
+        productions = []
+        for p in self.lr_productions:
+            if p.func:
+                productions.append((p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line))
+            else:
+                productions.append((str(p), p.name, p.len, None, None, None))
+        data = dict(tabversion=__tabversion__, method=self.lr_method, signature=signature,
+                    action=self.lr_action, goto=self.lr_goto, productions=productions)
+        # Written to a temporary file and renamed so concurrent readers never see partial tables
+        fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(filename) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as outf:
+                json.dump(data, outf)
+            os.rename(tmpname, filename)
+        except Exception:
+            if os.path.exists(tmpname):
+                os.unlink(tmpname)
+            raise
+
 # -----------------------------------------------------------------------------
 #                            === INTROSPECTION ===
 #
@@ -3219,7 +3288,7 @@ class ParserReflect(object):
 
 def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, start=None,
          check_recursion=True, optimize=False, write_tables=True, debugfile=debug_file,
-         outputdir=None, debuglog=None, errorlog=None, picklefile=None):
+         outputdir=None, debuglog=None, errorlog=None, picklefile=None, tabledir=None):
 
     if tabmodule is None:
         tabmodule = tab_module
@@ -3227,8 +3296,8 @@ def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, star
     # Reference to the parsing method of the last built parser
     global parse
 
-    # If pickling is enabled, table files are not created
-    if picklefile:
+    # If pickling or a table directory is enabled, table modules are not created
+    if picklefile or tabledir:
         write_tables = 0
 
     if errorlog is None:
@@ -3288,15 +3357,34 @@ def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, star
     # Check signature against table files (if any)
     signature = pinfo.signature()
 
+    # Reuse the tables if this grammar was already built by this process
+    cache_key = (method, signature)
+    if cache_key in _lr_table_cache:
+        lr = _lr_table_cache[cache_key].copy()
+        lr.bind_callables(pinfo.pdict)
+        parser = LRParser(lr, pinfo.error_func)
+        parse = parser.parse
+        return parser
+
+    # When a table directory is given, tables are stored there as JSON under a name derived from
+    # the grammar signature, so a grammar change never picks up stale tables
+    tablefile = None
+    if tabledir:
+        tablefile = os.path.join(tabledir, 'parsetab-%s-%s.json' % (
+            method.lower(), hashlib.sha1(signature.encode('utf-8')).hexdigest()))
+
     # Read the tables
     try:
         lr = LRTable()
-        if picklefile:
+        if tablefile:
+            read_signature = lr.read_json(tablefile)
+        elif picklefile:
             read_signature = lr.read_pickle(picklefile)
         else:
             read_signature = lr.read_table(tabmodule)
         if optimize or (read_signature == signature):
             try:
+                _lr_table_cache[cache_key] = lr.copy()
                 lr.bind_callables(pinfo.pdict)
                 parser = LRParser(lr, pinfo.error_func)
                 parse = parser.parse
@@ -3307,6 +3395,11 @@ def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, star
         errorlog.warning(str(e))
     except ImportError:
         pass
+    except Exception as e:
+        # A truncated or otherwise unreadable table file is regenerated below
+        if not picklefile and not tablefile:
+            raise
+        errorlog.warning('There was a problem loading the table file: %r', e)
 
     if debuglog is None:
         if debug:
@@ -3491,14 +3584,22 @@ def yacc(method='LALR', debug=yaccdebug, module=None, tabmodule=tab_module, star
         except IOError as e:
             errorlog.warning("Couldn't create %r. %s" % (tabmodule, e))
 
+    # Write the tables to the table directory
+    if tablefile:
+        try:
+            lr.json_table(tablefile, signature)
+        except (IOError, OSError) as e:
+            errorlog.warning("Couldn't create %r. %s" % (tablefile, e))
+
     # Write a pickled version of the tables
-    if picklefile:
+    elif picklefile:
         try:
             lr.pickle_table(picklefile, signature)
         except IOError as e:
             errorlog.warning("Couldn't create %r. %s" % (picklefile, e))
 
     # Build the parser
+    _lr_table_cache[cache_key] = lr.copy()
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)
 
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import collections
+import itertools
+
+# Options that limit the part of a file that is read
+SELECTION_OPTIONS = ('max_bytes', 'head', 'tail', 'line_range')
+
+
+def validate_selection(max_bytes=None, head=None, tail=None, line_range=None):
+    """Return the error of the options that select the part of the file to read, or None if they are valid."""
+    if len([x for x in (head, tail, line_range) if x is not None]) > 1:
+        return "Only one of 'head', 'tail' or 'line_range' may be provided"
+    for name, value in (('max_bytes', max_bytes), ('head', head), ('tail', tail)):
+        if value is not None and value < 0:
+            return "'{0}' cannot be negative".format(name)
+    if line_range is not None and (len(line_range) != 2 or line_range[0] < 1 or line_range[1] < line_range[0]):
+        return "'line_range' must be a list with the first and last lines to read, starting from 1"
+    return None
+
+
+def _take_bytes(lines, max_bytes):
+    """Return the first lines whose size doesn't exceed max_bytes, cutting the last one, and if any was left out."""
+    selected = []
+    size = 0
+    for line in lines:
+        if size + len(line) > max_bytes:
+            selected.append(line[:max_bytes - size])
+            return selected, True
+        selected.append(line)
+        size += len(line)
+    return selected, False
+
+
+def read_selection(source_fh, max_bytes=None, head=None, tail=None, line_range=None):
+    """
+    Return the part of the file selected by the options and whether some content of the file was left out.
+
+    The file is read line by line, keeping at most the selected lines in memory, so big files can be
+    read without loading them. `head` and `tail` select the first or last lines, and `line_range` the
+    lines between the first and last provided, starting from 1. `max_bytes` limits the size of the
+    content: the first bytes are kept, except with `tail`, where the last ones are kept.
+    """
+    if head is None and tail is None and line_range is None:
+        if max_bytes is None:
+            return source_fh.read(), False
+        content = source_fh.read(max_bytes)
+        return content, bool(source_fh.read(1))
+
+    truncated = False
+    if tail == 0:
+        return b'', next(iter(source_fh), None) is not None
+    if tail is not None:
+        lines = collections.deque(maxlen=tail)
+        size = 0
+        for line in source_fh:
+            if len(lines) == tail:
+                # The oldest line is discarded by the deque
+                truncated = True
+                size -= len(lines[0])
+            lines.append(line)
+            size += len(line)
+            while max_bytes is not None and size > max_bytes and len(lines) > 1:
+                # Older lines are not needed as they would not fit in max_bytes
+                size -= len(lines.popleft())
+                truncated = True
+        if max_bytes is not None and size > max_bytes:
+            lines[0] = lines[0][size - max_bytes:]
+            truncated = True
+        return b''.join(lines), truncated
+
+    if head is not None:
+        first, last = 1, head
+    else:
+        first, last = line_range
+    skipped = sum(1 for _ in itertools.islice(source_fh, first - 1))
+    truncated = skipped > 0
+    lines = itertools.islice(source_fh, max(last - first + 1, 0))
+    if max_bytes is not None:
+        lines, cut = _take_bytes(lines, max_bytes)
+        truncated = truncated or cut
+    content = b''.join(lines)
+    return content, truncated or next(iter(source_fh), None) is not None
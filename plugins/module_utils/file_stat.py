@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Status of files with the same data returned by ansible.builtin.stat, so modules checking several files
+# return for each one what the stat module would return for it.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import errno
+import grp
+import os
+import pwd
+import stat
+
+from ansible.module_utils.common.text.converters import to_bytes, to_native
+
+# Platform dependent stat fields and their name in the output, as in ansible.builtin.stat
+PLATFORM_FIELDS = (
+    ('st_blocks', 'blocks'),
+    ('st_blksize', 'block_size'),
+    ('st_rdev', 'device_type'),
+    ('st_flags', 'flags'),
+    ('st_gen', 'generation'),
+    ('st_birthtime', 'birthtime'),
+    ('st_ftype', 'file_type'),
+    ('st_attrs', 'attrs'),
+    ('st_obtype', 'object_type'),
+    ('st_rsize', 'real_size'),
+    ('st_creator', 'creator'),
+    ('st_type', 'file_type'),
+)
+
+
+def expand_path(path):
+    """Return the path expanded as the `path` type of the module arguments does."""
+    return os.path.expanduser(os.path.expandvars(path))
+
+
+def format_output(path, st):
+    """Return the status data of ansible.builtin.stat from the result of `os.stat`."""
+    mode = st.st_mode
+    output = dict(
+        exists=True,
+        path=path,
+        mode="%04o" % stat.S_IMODE(mode),
+        isdir=stat.S_ISDIR(mode),
+        ischr=stat.S_ISCHR(mode),
+        isblk=stat.S_ISBLK(mode),
+        isreg=stat.S_ISREG(mode),
+        isfifo=stat.S_ISFIFO(mode),
+        islnk=stat.S_ISLNK(mode),
+        issock=stat.S_ISSOCK(mode),
+        uid=st.st_uid,
+        gid=st.st_gid,
+        size=st.st_size,
+        inode=st.st_ino,
+        dev=st.st_dev,
+        nlink=st.st_nlink,
+        atime=st.st_atime,
+        mtime=st.st_mtime,
+        ctime=st.st_ctime,
+        wusr=bool(mode & stat.S_IWUSR),
+        rusr=bool(mode & stat.S_IRUSR),
+        xusr=bool(mode & stat.S_IXUSR),
+        wgrp=bool(mode & stat.S_IWGRP),
+        rgrp=bool(mode & stat.S_IRGRP),
+        xgrp=bool(mode & stat.S_IXGRP),
+        woth=bool(mode & stat.S_IWOTH),
+        roth=bool(mode & stat.S_IROTH),
+        xoth=bool(mode & stat.S_IXOTH),
+        isuid=bool(mode & stat.S_ISUID),
+        isgid=bool(mode & stat.S_ISGID),
+    )
+    for field, name in PLATFORM_FIELDS:
+        if hasattr(st, field):
+            output[name] = getattr(st, field)
+    return output
+
+
+def stat_path(module, path, follow=False, get_attributes=True):
+    """
+    Return the result of ansible.builtin.stat for an expanded path, without checksum nor mime data: the status
+    in `stat`, with `exists` false if the path does not exist, or `failed` and `msg` if it cannot be checked.
+    """
+    b_path = to_bytes(path, errors='surrogate_or_strict')
+    try:
+        st = os.stat(b_path) if follow else os.lstat(b_path)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return dict(stat=dict(exists=False))
+        return dict(failed=True, msg=to_native(e.strerror))
+
+    output = format_output(path, st)
+    for name, mode in (('readable', os.R_OK), ('writeable', os.W_OK), ('executable', os.X_OK)):
+        output[name] = os.access(b_path, mode)
+    if output['islnk']:
+        output['lnk_source'] = to_native(os.path.realpath(b_path), errors='surrogate_or_strict')
+        output['lnk_target'] = to_native(os.readlink(b_path), errors='surrogate_or_strict')
+    try:
+        output['pw_name'] = pwd.getpwuid(st.st_uid).pw_name
+    except (TypeError, KeyError):
+        pass
+    try:
+        output['gr_name'] = grp.getgrgid(st.st_gid).gr_name
+    except (KeyError, ValueError, OverflowError):
+        pass
+    if get_attributes:
+        output['version'] = None
+        output['attributes'] = []
+        output['attr_flags'] = ''
+        attributes = module.get_file_attributes(b_path)
+        for name in ('version', 'attributes', 'attr_flags'):
+            if name in attributes:
+                output[name] = attributes[name]
+    return dict(stat=output)
+
+
+def add_mime(module, outputs):
+    """Add the mime type and charset to the status of existing files, running the file utility once for all."""
+    for output in outputs:
+        output['mimetype'] = output['charset'] = 'unknown'
+    mimecmd = module.get_bin_path('file')
+    if not mimecmd or not outputs:
+        return
+    try:
+        rc, out, err = module.run_command([mimecmd, '--brief', '--mime-type', '--mime-encoding', '--']
+                                          + [to_bytes(o['path'], errors='surrogate_or_strict') for o in outputs])
+    except Exception:
+        return
+    lines = out.splitlines()
+    if rc != 0 or len(lines) != len(outputs):
+        return
+    for output, line in zip(outputs, lines):
+        try:
+            mimetype, charset = line.split(';')
+            output['mimetype'] = mimetype.strip()
+            output['charset'] = charset.split('=')[1].strip()
+        except (ValueError, IndexError):
+            pass
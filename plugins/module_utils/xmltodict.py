@@ -1,4 +1,3 @@
-#!/usr/bin/env python
 # Copyright: (c) 2022, DataDope (@datadope-io)
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 # "Makes working with XML feel like you are working with JSON"
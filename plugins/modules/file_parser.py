@@ -16,16 +16,55 @@ short_description: Processes the given file with the specified parser.
 
 version_added: "1.0.0"
 
-description: Processes the given file using one of the supported parsers, supporting the injection of env vars.
+description:
+  - Processes the given file using one of the supported parsers, supporting the injection of env vars.
+  - Several files may be parsed in a single execution using I(files).
 
 options:
   file_path:
-    description: Path of the file to parse.
-    required: true
+    description:
+      - Path of the file to parse.
+      - One of I(file_path) or I(files) is required.
+    required: false
     type: str
+  files:
+    description:
+      - List of files to parse in this execution, each one with its own parser, env vars and path prefix.
+      - I(parser), I(env_vars) and I(path_prefix) are used for the files that do not define them.
+      - Results are returned in C(results), in the same order as the files. A file that cannot be parsed
+        does not make the module fail, its error is returned in its result instead.
+      - The same I(file_path) may be provided several times, e.g. with a different I(path_prefix) for each
+        instance running in a container. Only files provided more than once with the same options are rejected.
+    required: false
+    type: list
+    elements: dict
+    suboptions:
+      file_path:
+        description: Path of the file to parse.
+        required: true
+        type: str
+      parser:
+        description: Parser that will handle the parsing of the file.
+        required: false
+        type: str
+        choices:
+          - apache_webserver
+          - haproxy
+          - keepalived
+          - nginx
+      env_vars:
+        description: Environment variables that will be injected into the parser.
+        required: false
+        type: dict
+      path_prefix:
+        description: Prefix that will be appended to every path that the parser will access during its operation.
+        required: false
+        type: str
   parser:
-    description: Parser that will handle the parsing of the file.
-    required: true
+    description:
+      - Parser that will handle the parsing of the file.
+      - Required if I(file_path) is used or any of the I(files) does not define its own parser.
+    required: false
     type: str
     choices:
       - apache_webserver
@@ -47,6 +86,40 @@ options:
     required: false
     type: bool
     default: false
+  include_workers:
+    description:
+      - Number of threads used to read in parallel the files matched by a glob or directory include.
+      - Files are still parsed one after another and merged in sorted order, so the result and the parsing
+        timeouts are the same as without workers.
+      - Only used by the C(apache_webserver) and C(nginx) parsers. C(1) disables it.
+    required: false
+    type: int
+    default: 1
+  cache_dir:
+    description:
+      - Directory of the target host where the parsing tables generated for each parser grammar are kept
+        between executions, so they are only built the first time or when the grammar changes.
+      - The parse cache (see I(parse_cache)) is also stored in this directory.
+      - The directory and its contents must be owned by the user executing the module and not be writable by
+        other users, otherwise they are not used. Created if it does not exist, except in check mode.
+      - If not set, nothing is kept between executions.
+    required: false
+    type: path
+  parse_cache:
+    description:
+      - Keep in I(cache_dir) the parsed contents of every read file, so files not modified since a
+        previous execution are not read and parsed again.
+      - Files are identified by their path, modification time, size and inode, together with the parser used.
+      - In check mode, cached contents are used but not stored.
+    required: false
+    type: bool
+    default: false
+  parse_cache_size:
+    description:
+      - Maximum size in MB of the parse cache. Least recently used entries are removed when it is exceeded.
+    required: false
+    type: int
+    default: 50
 
 author:
   - Datadope (@datadope)
@@ -58,15 +131,40 @@ EXAMPLES = r'''
   file_parser:
     file_path: "/etc/httpd/conf/httpd.conf"
     parser: "apache_webserver"
+
+- name: Parse the config files of several instances in one execution
+  file_parser:
+    parser: "apache_webserver"
+    env_vars: "{{ env_vars }}"
+    files:
+      - file_path: "/etc/httpd/conf/httpd.conf"
+      - file_path: "/opt/httpd-2/conf/httpd.conf"
+        path_prefix: "/proc/1234/root"
 '''
 
 RETURN = r'''
 parsed:
   description: Parsed file.
-  returned: always
+  returned: when I(file_path) is used
   type: dict
+results:
+  description:
+    - Result of each file in I(files), in the same order, with its C(file_path), C(path_prefix) and C(parser).
+    - Files parsed have the key C(parsed) with their parsed content.
+    - Files that could not be parsed have the keys C(failed) (always C(true)) and C(msg).
+  returned: when I(files) is used
+  type: list
+  elements: dict
+  sample: [
+    {"file_path": "/etc/httpd/conf/httpd.conf", "path_prefix": "", "parser": "apache_webserver",
+     "parsed": {"Listen": "80"}},
+    {"file_path": "/etc/httpd/conf/httpd.conf", "path_prefix": "/proc/1234/root", "parser": "apache_webserver",
+     "failed": true, "msg": "Could not parse file '/etc/httpd/conf/httpd.conf' with parser 'apache_webserver': ..."}
+  ]
 '''
 
+import os  # noqa
+
 from ansible.module_utils.basic import AnsibleModule  # noqa
 
 
@@ -96,35 +194,118 @@ def get_parser_loader_func(parser):
     return loader_func
 
 
+def get_cache_subdir(cache_dir, name, create=True):
+    # Each kind of cached data is stored in its own subdirectory of the cache dir. Any problem
+    # creating it, or a directory that other users could modify, just disables that cache.
+    if not cache_dir:
+        return None
+    subdir = os.path.join(cache_dir, name)
+    if create:
+        try:
+            os.makedirs(subdir, 0o700)
+        except OSError:
+            pass
+    from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.cache import is_private
+    if not os.path.isdir(subdir) or not is_private(cache_dir) or not is_private(subdir):
+        return None
+    return subdir
+
+
+def get_tables_dir(module):
+    # Tables are generated in memory in check mode, so nothing is written in the target host
+    if module.check_mode:
+        return None
+    return get_cache_subdir(module.params['cache_dir'], 'tables')
+
+
+def get_parse_cache(module):
+    if not module.params['parse_cache']:
+        return None
+    parsed_dir = get_cache_subdir(module.params['cache_dir'], 'parsed', create=not module.check_mode)
+    if parsed_dir is None:
+        return None
+    from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.cache import ParseCache
+    return ParseCache(parsed_dir, max_size=module.params['parse_cache_size'] * 1024 * 1024,
+                      read_only=module.check_mode)
+
+
+def load_file(module, job, tables_dir, parse_cache):
+    loader_func = get_parser_loader_func(job['parser'])
+    parser_loader = loader_func(job['file_path'], envvars=job['env_vars'], pathprefix=job['path_prefix'],
+                                strictvars=module.params['strict_vars'], tabledir=tables_dir,
+                                includeworkers=module.params['include_workers'], parsecache=parse_cache)
+    return parser_loader.load(job['file_path'])
+
+
+def get_jobs(params):
+    # Files without their own parser, env vars or path prefix use the ones of the module
+    jobs = []
+    for file_params in params['files'] or [dict(file_path=params['file_path'])]:
+        job = dict(file_params)
+        for name in ('parser', 'env_vars', 'path_prefix'):
+            if job.get(name) is None:
+                job[name] = params[name]
+        jobs.append(job)
+    return jobs
+
+
 def parse_file(module):
-    file_path = module.params['file_path']
-    parser = module.params['parser']
-    env_vars = module.params['env_vars']
-    path_prefix = module.params['path_prefix']
-    strict_vars = module.params['strict_vars']
+    jobs = get_jobs(module.params)
+    tables_dir = get_tables_dir(module)
+    parse_cache = get_parse_cache(module)
 
     parsed = None
     try:
-        loader_func = get_parser_loader_func(parser)
-        parser_loader = loader_func(file_path, envvars=env_vars, pathprefix=path_prefix, strictvars=strict_vars)
-        parsed = parser_loader.load(file_path)
-    except Exception as e:
-        module.fail_json(msg="Could not parse file '{0}' with parser '{1}': {2}".format(file_path, parser, e))
+        if module.params['files'] is None:
+            job = jobs[0]
+            try:
+                parsed = load_file(module, job, tables_dir, parse_cache)
+            except Exception as e:
+                module.fail_json(msg="Could not parse file '{0}' with parser '{1}': {2}".format(
+                    job['file_path'], job['parser'], e))
+        else:
+            # All the files share the parsing tables, lexers and parse cache of this execution.
+            # A file that cannot be parsed doesn't prevent the rest from being returned.
+            parsed = dict(results=[])
+            for job in jobs:
+                result = dict(file_path=job['file_path'], path_prefix=job['path_prefix'], parser=job['parser'])
+                try:
+                    result['parsed'] = load_file(module, job, tables_dir, parse_cache)
+                except Exception as e:
+                    result['failed'] = True
+                    result['msg'] = "Could not parse file '{0}' with parser '{1}': {2}".format(
+                        job['file_path'], job['parser'], e)
+                parsed['results'].append(result)
+    finally:
+        if parse_cache is not None:
+            parse_cache.prune()
 
     return parsed
 
 
+PARSERS = [
+    'apache_webserver',
+    'haproxy',
+    'keepalived',
+    'nginx'
+]
+
 argument_spec = dict(
-    file_path=dict(type='str', required=True),
-    parser=dict(type='str', required=True, choices=[
-        'apache_webserver',
-        'haproxy',
-        'keepalived',
-        'nginx'
-    ]),
+    file_path=dict(type='str', required=False),
+    files=dict(type='list', elements='dict', required=False, options=dict(
+        file_path=dict(type='str', required=True),
+        parser=dict(type='str', required=False, choices=PARSERS),
+        env_vars=dict(type='dict', required=False),
+        path_prefix=dict(type='str', required=False)
+    )),
+    parser=dict(type='str', required=False, choices=PARSERS),
     env_vars=dict(type='dict', required=False, default={}),
     path_prefix=dict(type='str', required=False, default=''),
-    strict_vars=dict(type='bool', required=False, default=False)
+    strict_vars=dict(type='bool', required=False, default=False),
+    include_workers=dict(type='int', required=False, default=1),
+    cache_dir=dict(type='path', required=False),
+    parse_cache=dict(type='bool', required=False, default=False),
+    parse_cache_size=dict(type='int', required=False, default=50)
 )
 
 
@@ -135,13 +316,22 @@ def setup_module_object():
     # supports check mode
     module = AnsibleModule(
         argument_spec=argument_spec,
+        required_one_of=[('file_path', 'files')],
+        mutually_exclusive=[('file_path', 'files')],
         supports_check_mode=True
     )
     return module
 
 
-def validate_parameters(parameters):  # noqa
-    pass
+def validate_parameters(parameters):
+    jobs = []
+    for job in get_jobs(parameters):
+        if job['parser'] is None:
+            return "No parser provided for file '{0}'".format(job['file_path'])
+        if job in jobs:
+            return "File '{0}' is provided more than once with the same options".format(job['file_path'])
+        jobs.append(job)
+    return None
 
 
 def main():
@@ -150,11 +340,16 @@ def main():
         parsed_file=None
     )
     module = setup_module_object()
-    validate_parameters(module.params)
+    error = validate_parameters(module.params)
+    if error:
+        module.fail_json(msg=error, **result)
     # Make main process method independent of ansible objects to facilitate tests (if possible)
     parsed = parse_file(module=module)
     if parsed is not None:
-        result['parsed'] = parsed
+        if module.params['files'] is None:
+            result['parsed'] = parsed
+        else:
+            result.update(parsed)
     # in the event of a successful module execution, you will want to
     # simple AnsibleModule.exit_json(), passing the key/value results
     module.exit_json(**result)
@@ -0,0 +1,232 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: slurp_files
+
+short_description: Slurps several files from the target host in a single execution.
+
+version_added: "1.16.0"
+
+description:
+  - Returns the base64 encoded content of several files of the target host, as C(ansible.builtin.slurp) does for
+    one file, so all of them are read with a single module execution.
+  - A file that cannot be read does not make the module fail, its error is returned instead of its content.
+
+options:
+  paths:
+    description:
+      - Paths of the files to read. A path provided more than once is only read once.
+    required: true
+    type: list
+    elements: str
+  max_bytes:
+    description:
+      - Maximum number of bytes returned for each file. The first bytes are returned, except with I(tail),
+        where the last ones are returned.
+    required: false
+    type: int
+  head:
+    description:
+      - Number of lines returned from the beginning of each file.
+      - Only one of I(head), I(tail) or I(line_range) may be provided.
+    required: false
+    type: int
+  tail:
+    description:
+      - Number of lines returned from the end of each file.
+    required: false
+    type: int
+  line_range:
+    description:
+      - First and last lines returned of each file, starting from 1.
+    required: false
+    type: list
+    elements: int
+  parser:
+    description:
+      - Parser applied to the content of each file in the target host. The parsed content is returned
+        instead of the content of the file.
+      - Results are the same as those of the software facts parser with the same name.
+    required: false
+    type: str
+    choices:
+      - json
+      - xml
+  parser_params:
+    description:
+      - Parameters of I(parser), as the ones of the software facts parser with the same name.
+    required: false
+    type: dict
+  select:
+    description:
+      - Paths of the parsed content to return instead of the whole parsed content. Each path is the keys to
+        follow separated by dots. Numeric keys are indexes of lists, and other keys reached in a list are looked
+        up in each of its elements.
+      - Only used with I(parser).
+    required: false
+    type: list
+    elements: str
+
+notes:
+  - Files are read line by line when I(head), I(tail) or I(line_range) are provided, so only the returned
+    part of the file is kept in memory.
+  - Files are parsed by the C(xml) parser while they are read, unless a part of them is selected.
+
+author:
+  - Datadope (@datadope)
+'''
+
+EXAMPLES = r'''
+- name: Read the config files of a software
+  slurp_files:
+    paths:
+      - /etc/mysql/my.cnf
+      - /etc/mysql/conf.d/mysqld.cnf
+
+- name: Read the last lines of a log file
+  slurp_files:
+    paths:
+      - /var/log/postgresql/postgresql.log
+    tail: 100
+    max_bytes: 65536
+
+- name: Get the subsystems of a JBoss config without transferring the file
+  slurp_files:
+    paths:
+      - /opt/jboss/standalone/configuration/standalone.xml
+    parser: xml
+    select:
+      - server.profile.subsystem
+'''
+
+RETURN = r'''
+files:
+  description:
+    - Result of each file, keyed by its path.
+    - Files read have the keys C(content) (base64 encoded), C(encoding) (always C(base64)), C(source) and
+      C(truncated), C(true) if only a part of the file is returned.
+    - Files parsed with I(parser) have the keys C(parsed), C(source) and C(truncated) instead. With I(select),
+      C(parsed) has the value of each path found, keyed by path.
+    - Files that could not be read or parsed have the keys C(failed) (always C(true)), C(msg) and C(source).
+  returned: always
+  type: dict
+  sample: {
+    "/etc/mysql/my.cnf": {"content": "W215c3FsZF0K", "encoding": "base64", "source": "/etc/mysql/my.cnf",
+                          "truncated": false},
+    "/etc/mysql/none.cnf": {"failed": true, "msg": "file not found: /etc/mysql/none.cnf",
+                            "source": "/etc/mysql/none.cnf"}
+  }
+'''
+
+import base64  # noqa
+import errno  # noqa
+
+from ansible.module_utils.basic import AnsibleModule  # noqa
+from ansible.module_utils.common.text.converters import to_native  # noqa
+from ansible_collections.datadope.discovery.plugins.module_utils.content_parser \
+    import TARGET_PARSERS, parse_content, select_paths  # noqa
+from ansible_collections.datadope.discovery.plugins.module_utils.file_reader \
+    import SELECTION_OPTIONS, read_selection, validate_selection  # noqa
+
+argument_spec = dict(
+    paths=dict(type='list', elements='str', required=True),
+    max_bytes=dict(type='int', required=False),
+    head=dict(type='int', required=False),
+    tail=dict(type='int', required=False),
+    line_range=dict(type='list', elements='int', required=False),
+    parser=dict(type='str', required=False, choices=list(TARGET_PARSERS)),
+    parser_params=dict(type='dict', required=False),
+    select=dict(type='list', elements='str', required=False)
+)
+
+
+def parse_file(source_fh, selection, parser, parser_params, select):
+    """Return the content of the file parsed and whether some content of the file was left out."""
+    if all(value is None for value in selection.values()):
+        # The whole file is parsed while it is read
+        source, truncated = source_fh, False
+    else:
+        source, truncated = read_selection(source_fh, **selection)
+    parsed = parse_content(source, parser, parser_params)
+    if select is not None:
+        parsed = select_paths(parsed, select)
+    return parsed, truncated
+
+
+def slurp_file(path, selection, parser=None, parser_params=None, select=None):
+    # Same errors as ansible.builtin.slurp, so callers can handle both results in the same way
+    try:
+        with open(path, 'rb') as source_fh:
+            if parser:
+                try:
+                    parsed, truncated = parse_file(source_fh, selection, parser, parser_params, select)
+                except ValueError as e:
+                    return dict(failed=True, msg=to_native(e), source=path)
+                return dict(parsed=parsed, source=path, truncated=truncated)
+            source_content, truncated = read_selection(source_fh, **selection)
+    except (IOError, OSError) as e:
+        if e.errno == errno.ENOENT:
+            msg = "file not found: {0}".format(path)
+        elif e.errno == errno.EACCES:
+            msg = "file is not readable: {0}".format(path)
+        elif e.errno == errno.EISDIR:
+            msg = "source is a directory and must be a file: {0}".format(path)
+        else:
+            msg = "unable to slurp file: {0}".format(to_native(e))
+        return dict(failed=True, msg=msg, source=path)
+    return dict(content=base64.b64encode(source_content), encoding='base64', source=path, truncated=truncated)
+
+
+def slurp_files(module):
+    selection = dict((name, module.params[name]) for name in SELECTION_OPTIONS)
+    files = {}
+    for path in module.params['paths']:
+        if path not in files:
+            files[path] = slurp_file(path, selection, module.params['parser'], module.params['parser_params'],
+                                     module.params['select'])
+    return files
+
+
+def validate_parameters(parameters):
+    return validate_selection(**dict((name, parameters[name]) for name in SELECTION_OPTIONS))
+
+
+def setup_module_object():
+    # the AnsibleModule object will be our abstraction working with Ansible
+    # this includes instantiation, a couple of common attr would be the
+    # args/params passed to the execution, as well as if the module
+    # supports check mode
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True
+    )
+    return module
+
+
+def main():
+    result = dict(
+        changed=False,
+        files={}
+    )
+    module = setup_module_object()
+    error = validate_parameters(module.params)
+    if error:
+        module.fail_json(msg=error, **result)
+    # Make main process method independent of ansible objects to facilitate tests (if possible)
+    result['files'] = slurp_files(module=module)
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -142,6 +142,29 @@ options:
     required: false
     type: list
     elements: dict
+  instance_workers:
+    description:
+      - Number of instances of the same software type whose plugins are executed at the same time.
+      - Each instance uses its own copy of the task vars, so variables registered by the plugins of an instance
+        are not available to the plugins of other instances.
+      - Module executions are still done one at a time if pipelining is not enabled, since they share the
+        remote temporary directory, or if the connection is not C(ssh) or C(local) (e.g. C(winrm) or C(psrp)),
+        since it uses a single shell or runspace that cannot execute several commands at the same time.
+      - C(1) executes the plugins of every instance one after another.
+    required: false
+    type: int
+    default: 1
+  remote_helper:
+    description:
+      - Use a helper script in POSIX target hosts to answer the file status, file search, file read and command
+        executions of the plugins, instead of executing the modules.
+      - The script only needs the python interpreter of the host and is sent with the requests of each module
+        execution, without packaging it or using the remote temporary directory.
+      - Requires pipelining. If the script cannot be executed, modules are executed as usual. If its output of an
+        execution cannot be read, only that module is executed instead.
+    required: false
+    type: bool
+    default: false
 
 author:
     - Datadope (@datadope)
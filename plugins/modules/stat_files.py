@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: stat_files
+
+short_description: Retrieves the status of several files of the target host in a single execution.
+
+version_added: "1.16.0"
+
+description:
+  - Returns the status of several files of the target host, as C(ansible.builtin.stat) does for one file, so all
+    of them are checked with a single module execution.
+  - A file whose status cannot be retrieved does not make the module fail, its error is returned instead of its
+    status.
+  - Checksums are not calculated.
+
+options:
+  paths:
+    description:
+      - Paths of the files to check. A path provided more than once is only checked once.
+      - User and environment variables of the paths are expanded in the target host.
+    required: true
+    type: list
+    elements: str
+  follow:
+    description:
+      - Whether to follow symlinks.
+    required: false
+    type: bool
+    default: false
+  get_mime:
+    description:
+      - Use file magic and return data about the nature of the files. This uses the C(file) utility, executed
+        once for all the files.
+      - This will add both C(mimetype) and C(charset) fields to the status of each file.
+    required: false
+    type: bool
+    default: true
+    aliases: [ mime, mime_type, mime-type ]
+  get_attributes:
+    description:
+      - Get file attributes using lsattr tool if present.
+    required: false
+    type: bool
+    default: true
+    aliases: [ attr, attributes ]
+
+author:
+  - Datadope (@datadope)
+'''
+
+EXAMPLES = r'''
+- name: Check the log files of a software
+  stat_files:
+    paths:
+      - /var/log/httpd/access_log
+      - /var/log/httpd/error_log
+    get_mime: false
+    get_attributes: false
+'''
+
+RETURN = r'''
+files:
+  description:
+    - Result of each file, keyed by its path as provided in C(paths).
+    - Files checked have the key C(stat), with the same data returned by C(ansible.builtin.stat), C(exists) being
+      C(false) if the file does not exist.
+    - Files that could not be checked have the keys C(failed) (always C(true)) and C(msg).
+  returned: always
+  type: dict
+  sample: {
+    "/var/log/httpd/access_log": {"stat": {"exists": true, "path": "/var/log/httpd/access_log", "isreg": true}},
+    "/var/log/httpd/error_log": {"stat": {"exists": false}}
+  }
+'''
+
+from ansible.module_utils.basic import AnsibleModule  # noqa
+from ansible_collections.datadope.discovery.plugins.module_utils.file_stat import (  # noqa
+    add_mime, expand_path, stat_path)
+
+argument_spec = dict(
+    paths=dict(type='list', elements='str', required=True),
+    follow=dict(type='bool', default=False),
+    get_mime=dict(type='bool', default=True, aliases=['mime', 'mime_type', 'mime-type']),
+    get_attributes=dict(type='bool', default=True, aliases=['attr', 'attributes'])
+)
+
+
+def stat_files(module):
+    # Results are keyed by the paths as provided, the status has the expanded path as ansible.builtin.stat does
+    files = {}
+    for path in module.params['paths']:
+        if path not in files:
+            files[path] = stat_path(module, expand_path(path), module.params['follow'],
+                                    module.params['get_attributes'])
+    if module.params['get_mime']:
+        add_mime(module, [result['stat'] for result in files.values() if result.get('stat', {}).get('exists')])
+    return files
+
+
+def setup_module_object():
+    # the AnsibleModule object will be our abstraction working with Ansible
+    # this includes instantiation, a couple of common attr would be the
+    # args/params passed to the execution, as well as if the module
+    # supports check mode
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True
+    )
+    return module
+
+
+def main():
+    result = dict(
+        changed=False,
+        files={}
+    )
+    module = setup_module_object()
+    # Make main process method independent of ansible objects to facilitate tests (if possible)
+    result['files'] = stat_files(module=module)
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2022, Datadope, S.L. <info@datadope.io> (@datadope-io)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Lexer setup cost versus number of parsed files for the file_parser grammars.
+
+Compares building the lexer from its rules for every file (master regular expressions compiled each time)
+with building it once and cloning it for each file, which is what the parsers do.
+
+Run it with the collection available in the python path:
+
+    python tests/benchmarks/file_parser_lexer_setup.py
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import re
+import timeit
+
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser import lex
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.apache_webserver.lexer \
+    import make_lexer as make_apache_lexer
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.haproxy.lexer \
+    import make_lexer as make_haproxy_lexer
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.keepalived.lexer \
+    import make_lexer as make_keepalived_lexer
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.nginx.lexer \
+    import make_lexer as make_nginx_lexer
+
+FILE_COUNTS = (1, 10, 100, 1000)
+
+
+def build_per_file(lexer_class, files):
+    for _ in range(files):
+        lex._lexer_cache.clear()
+        re.purge()
+        lexer_class()
+
+
+def clone_per_file(lexer_class, files):
+    lex._lexer_cache.clear()
+    re.purge()
+    engine = lexer_class().engine
+    for _ in range(files):
+        engine.clone()
+
+
+def main():
+    print('{0:<18}{1:>8}{2:>16}{3:>16}'.format('grammar', 'files', 'build (ms)', 'clone (ms)'))
+    for name, make_lexer in (('apache_webserver', make_apache_lexer), ('haproxy', make_haproxy_lexer),
+                             ('keepalived', make_keepalived_lexer), ('nginx', make_nginx_lexer)):
+        lexer_class = make_lexer()
+        for files in FILE_COUNTS:
+            build = timeit.timeit(lambda: build_per_file(lexer_class, files), number=1)
+            clone = timeit.timeit(lambda: clone_per_file(lexer_class, files), number=1)
+            print('{0:<18}{1:>8}{2:>16.2f}{3:>16.2f}'.format(name, files, build * 1000, clone * 1000))
+
+
+if __name__ == '__main__':
+    main()
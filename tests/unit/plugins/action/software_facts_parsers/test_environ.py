@@ -21,3 +21,36 @@ def test_run(action_module, text, expected_result):
     parser = Parser(_action_module, None)
     result = parser.parse(text, None)
     assert result == expected_result
+
+
+def test_parse_chunks(action_module):
+    text = 'env_var1=value1\x00env_var2=value=2\x00env_var3=value3\x00'
+    _action_module = action_module(ActionModule)
+    parser = Parser(_action_module, None)
+    chunks = [text[i:i + 4] for i in range(0, len(text), 4)]
+    assert parser.parse_chunks(chunks) == parser.parse(text)
+    assert parser.parse_chunks(chunks, dict(keys=['env_var2'])) == dict(env_var2='value=2')
+    assert parser.parse(text, dict(keys=['env_var1', 'env_var3'])) == dict(env_var1='value1', env_var3='value3')
+    # The last value of each var is returned, as without keys
+    text += 'env_var1=other\x00'
+    assert parser.parse_chunks([text], dict(keys=['env_var1'])) == dict(env_var1='other') == \
+        dict((k, v) for k, v in parser.parse(text).items() if k == 'env_var1')
+
+
+def test_parse_chunks_stop_on_first(action_module):
+    text = 'env_var1=value1\x00env_var2=value2\x00env_var1=other\x00env_var3=value3\x00'
+    _action_module = action_module(ActionModule)
+    parser = Parser(_action_module, None)
+    consumed = []
+
+    def chunks():
+        for index in range(0, len(text), 4):
+            consumed.append(text[index:index + 4])
+            yield text[index:index + 4]
+
+    # The first value of each var is returned and the chunks after all the keys are found are not consumed
+    assert parser.parse_chunks(chunks(), dict(keys=['env_var1', 'env_var2'], stop_on_first=True)) == \
+        dict(env_var1='value1', env_var2='value2')
+    assert len(''.join(consumed)) < len(text)
+    assert parser.parse(text, dict(stop_on_first=True)) == dict(env_var1='value1', env_var2='value2',
+                                                                env_var3='value3')
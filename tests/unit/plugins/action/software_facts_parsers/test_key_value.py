@@ -79,3 +79,51 @@ def test_run_other_no_parameters(action_module, text, expected_result):
     parser = Parser(_action_module, None)
     result = parser.parse(text, None)
     assert result == expected_result
+
+
+def test_parse_chunks(action_module):
+    text = "key1=value1\n# comment\nkey2 = value2 # comment\nkey1=other\nkey3='value3'\n"
+    _action_module = action_module(ActionModule)
+    parser = Parser(_action_module, None)
+    # Chunks may split lines anywhere
+    chunks = [text[i:i + 5] for i in range(0, len(text), 5)]
+    assert parser.parse_chunks(chunks) == parser.parse(text) == dict(key1='other', key2='value2', key3='value3')
+
+
+def test_parse_chunks_keys(action_module):
+    text = "key1=value1\nkey2=value2\nkey1=other\nkey3=value3\n"
+    _action_module = action_module(ActionModule)
+    parser = Parser(_action_module, None)
+    # The last value of each key is returned, as without keys
+    assert parser.parse_chunks(text.splitlines(True), dict(keys=['key2', 'key1'])) == dict(key1='other', key2='value2')
+    assert parser.parse(text, dict(keys=['key1', 'key3'])) == dict(key1='other', key3='value3')
+
+
+def test_parse_chunks_stop_on_first(action_module):
+    text = "key1=value1\nkey2=value2\nkey1=other\nkey3=value3\n"
+    _action_module = action_module(ActionModule)
+    parser = Parser(_action_module, None)
+    consumed = []
+
+    def chunks():
+        for line in text.splitlines(True):
+            consumed.append(line)
+            yield line
+
+    # The first value of each key is returned and the chunks after all the keys are found are not consumed
+    assert parser.parse_chunks(chunks(), dict(keys=['key2', 'key1'], stop_on_first=True)) == \
+        dict(key1='value1', key2='value2')
+    assert consumed == text.splitlines(True)[:2]
+    assert parser.parse(text, dict(stop_on_first=True)) == dict(key1='value1', key2='value2', key3='value3')
+
+
+def test_parse_chunks_line_breaks(action_module):
+    text = "key1=value1\r\nkey2=value2\rkey3=value3\x0bkey4=value4\u2028key5=value5\r"
+    _action_module = action_module(ActionModule)
+    parser = Parser(_action_module, None)
+    expected = dict(key1='value1', key2='value2', key3='value3', key4='value4', key5='value5')
+    assert parser.parse(text) == expected
+    # Chunks may split a '\r\n' line break
+    for size in range(1, 14):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert parser.parse_chunks(chunks) == expected
@@ -204,3 +204,22 @@ def test_run_no_filter(action_module):
     result = plugin.run(args, None, None)
 
     assert result == expected_result
+
+
+def test_run_indexed(action_module):
+    task_vars = {
+        'packages': {
+            'nginx': [{'name': 'nginx', 'version': '1.20.1'}],
+            'nginx-filesystem': [{'name': 'nginx-filesystem', 'version': '1.20.1'}],
+            'kernel': [{'name': 'kernel', 'version': '5.14.0'}, {'name': 'kernel', 'version': '5.14.1'}],
+        }
+    }
+    _action_module = action_module(ActionModule)
+    _action_module._templar.template = lambda x: x
+    plugin = PluginToTest(_action_module, task_vars)
+
+    assert plugin.run({'filter': {'name': 'nginx'}}, None, None) == [
+        {'name': 'nginx', 'version': '1.20.1'}, {'name': 'nginx-filesystem', 'version': '1.20.1'}]
+    assert plugin.run({'filter': {'name': '^nginx$'}}, None, None) == [{'name': 'nginx', 'version': '1.20.1'}]
+    assert plugin.run({'filter': {'name': 'kernel', 'version': '.*1$'}}, None, None) == [
+        {'name': 'kernel', 'version': '5.14.1'}]
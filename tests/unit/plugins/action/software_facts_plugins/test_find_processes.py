@@ -5,7 +5,9 @@ __metaclass__ = type
 import pytest
 from ansible.errors import AnsibleRuntimeError
 
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch, MagicMock
 from ansible_collections.datadope.discovery.plugins.action.software_facts import ActionModule
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin import find_elements
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin.find_processes \
     import FindProcesses as PluginToTest
 
@@ -171,3 +173,57 @@ def test_run_no_filter(action_module):
     result = plugin.run(args, None, None)
 
     assert result == expected_result
+
+
+PROCESSES = [
+    dict(cmdline="/usr/lib/systemd/systemd --switched-root", pid="1", ppid="0", user="root"),
+    dict(cmdline="/usr/sbin/sshd -D", pid="1071", ppid="1", user="root"),
+    dict(cmdline="/usr/sbin/crond -n", pid="1073", ppid="1", user="root"),
+    dict(cmdline="/usr/bin/redis-server *:6379", pid="2010", ppid="1", user="redis"),
+    dict(cmdline="/usr/bin/redis-server *:6380", pid="2011", ppid="1", user="redis"),
+    dict(cmdline="sshd: admin@pts/0", pid="3001", ppid="1071", user="admin"),
+]
+
+
+@pytest.mark.parametrize(
+    ('element_filter', 'expected_pids'),
+    (
+        # Values are regular expressions matched at the start of the element values, with or without index
+        ({'pid': '1'}, ['1', '1071', '1073']),
+        ({'pid': '^1$'}, ['1']),
+        ({'pid': '107[13]'}, ['1071', '1073']),
+        ({'ppid': '1', 'user': 'redis'}, ['2010', '2011']),
+        ({'ppid': '1', 'cmdline': '.*sshd'}, ['1071', '3001']),
+        ({'user': 'root', 'ppid': '0'}, ['1']),
+        ({'user': 'nobody'}, []),
+        ({'pid': '2010', 'user': 'root'}, []),
+        ({'uid': '0'}, []),
+        ({'user': 'redis|admin'}, ['2010', '2011', '3001']),
+    )
+)
+def test_run_indexed(action_module, element_filter, expected_pids):
+    _action_module = action_module(ActionModule)
+    _action_module._templar.template = lambda x: x
+    plugin = PluginToTest(_action_module, dict(processes=PROCESSES))
+
+    result = plugin.run(dict(filter=element_filter), None, None)
+
+    assert [x['pid'] for x in result] == expected_pids
+
+
+def test_run_index_built_once(action_module):
+    _action_module = action_module(ActionModule)
+    _action_module._templar.template = MagicMock(side_effect=lambda x: x)
+    processes = list(PROCESSES)
+    plugin = PluginToTest(_action_module, dict(processes=processes))
+
+    with patch.object(find_elements, 'build_index', wraps=find_elements.build_index) as mocked_build_index:
+        assert [x['pid'] for x in plugin.run(dict(filter={'pid': '1071'}), None, None)] == ['1071']
+        assert [x['pid'] for x in plugin.run(dict(filter={'ppid': '1071'}), None, None)] == ['3001']
+        assert mocked_build_index.call_count == 1
+        # Filter keys and values are templated once per execution of the plugin, not per element
+        assert _action_module._templar.template.call_count == 4
+
+        processes.append(dict(cmdline="/usr/bin/bash", pid="3002", ppid="1071", user="admin"))
+        assert [x['pid'] for x in plugin.run(dict(filter={'ppid': '1071'}), None, None)] == ['3001', '3002']
+        assert mocked_build_index.call_count == 2
@@ -36,6 +36,38 @@ def test_get_args_spec():
             'default': False,
             'required': False,
             'type': 'bool'
+        },
+        'max_bytes': {
+            'required': False,
+            'type': 'int'
+        },
+        'head': {
+            'required': False,
+            'type': 'int'
+        },
+        'tail': {
+            'required': False,
+            'type': 'int'
+        },
+        'line_range': {
+            'elements': 'int',
+            'required': False,
+            'type': 'list'
+        },
+        'return_content': {
+            'default': True,
+            'required': False,
+            'type': 'bool'
+        },
+        'parse_on_target': {
+            'default': False,
+            'required': False,
+            'type': 'bool'
+        },
+        'select': {
+            'elements': 'str',
+            'required': False,
+            'type': 'list'
         }
     }
 
@@ -303,3 +335,154 @@ def test_run_parse_error_verbosity_three(action_module):
     assert invocations_display['v'] == 0
     assert invocations_display['verbose'] == 1
     assert result.get('failed') is True
+
+
+def test_run_selection(action_module):
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='/var/log/app.log', tail=2, max_bytes=100))\
+        .validated_parameters
+    task_vars = {}
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, task_vars)
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {
+            'files': {
+                '/var/log/app.log': {
+                    'content': base64.b64encode(b'line9\nline10\n'),
+                    'encoding': 'base64',
+                    'source': '/var/log/app.log',
+                    'truncated': True
+                }
+            },
+            'changed': False
+        }
+        result = plugin.run(args, None, {})
+
+    mock_execute_module.assert_called_once_with(module_name='datadope.discovery.slurp_files',
+                                                module_args={'paths': ['/var/log/app.log'], 'tail': 2,
+                                                             'max_bytes': 100},
+                                                task_vars=task_vars)
+    assert result == dict(content='line9\nline10\n', source='/var/log/app.log', truncated=True)
+
+
+def test_run_selection_windows(action_module):
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='C:\\app.log', head=2)).validated_parameters
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, {'ansible_facts': {'os_family': 'Windows'}})
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        result = plugin.run(args, None, {})
+
+    mock_execute_module.assert_not_called()
+    assert result['failed'] is True
+    assert result['msg'].startswith("Options 'max_bytes', 'head'")
+
+
+def test_run_streaming(action_module):
+    file_contents = 'first=1\n' + 'other=value\n' * 20000 + 'port=5432\n'
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='/etc/app.conf', parser='key_value',
+                                                        parser_params=dict(keys=['port']),
+                                                        return_content=False)).validated_parameters
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, {})
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {
+            'content': base64.b64encode(to_bytes(file_contents)),
+            'encoding': 'base64',
+            'source': '/etc/app.conf'
+        }
+        with patch.object(plugin, '_process_slurp_result') as mock_process_slurp_result:
+            result = plugin.run(args, None, {})
+
+    # The content is not decoded as a whole
+    mock_process_slurp_result.assert_not_called()
+    assert result == dict(parsed=dict(port='5432'), source='/etc/app.conf')
+
+
+def test_run_parse_on_target(action_module):
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='/opt/jboss/standalone.xml', parser='xml',
+                                                        parse_on_target=True,
+                                                        select=['server.profile'])).validated_parameters
+    task_vars = {}
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, task_vars)
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {
+            'files': {
+                '/opt/jboss/standalone.xml': {
+                    'parsed': {'server.profile': {'subsystem': None}},
+                    'source': '/opt/jboss/standalone.xml',
+                    'truncated': False
+                }
+            },
+            'changed': False
+        }
+        result = plugin.run(args, None, {})
+
+    mock_execute_module.assert_called_once_with(module_name='datadope.discovery.slurp_files',
+                                                module_args={'paths': ['/opt/jboss/standalone.xml'],
+                                                             'parser': 'xml', 'select': ['server.profile']},
+                                                task_vars=task_vars)
+    assert result == dict(parsed={'server.profile': {'subsystem': None}}, source='/opt/jboss/standalone.xml',
+                          truncated=False)
+
+
+def test_run_parse_on_target_non_existing(action_module):
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='/etc/app.json', parser='json',
+                                                        parse_on_target=True)).validated_parameters
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, {})
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {
+            'files': {
+                '/etc/app.json': {'failed': True, 'msg': 'file not found: /etc/app.json', 'source': '/etc/app.json'}
+            },
+            'changed': False
+        }
+        result = plugin.run(args, None, {})
+
+    assert result == dict(failed=True, msg="the remote file '/etc/app.json' does not exist, not transferring",
+                          source='/etc/app.json')
+
+
+@pytest.mark.parametrize(
+    ('args', 'task_vars', 'expected_msg'),
+    (
+        (dict(parser='key_value'), {}, "Parser 'key_value' cannot be applied in the target host"),
+        (dict(parser='json', delegate_reading=True), {}, "Option 'parse_on_target' cannot be used"),
+        (dict(parser='json'), {'ansible_facts': {'os_family': 'Windows'}},
+         "Option 'parse_on_target' is not supported in Windows hosts"),
+    )
+)
+def test_run_parse_on_target_not_supported(action_module, args, task_vars, expected_msg):
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='/etc/app.conf', parse_on_target=True, **args))\
+        .validated_parameters
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, task_vars)
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        result = plugin.run(args, None, {})
+
+    mock_execute_module.assert_not_called()
+    assert result['failed'] is True
+    assert result['msg'].startswith(expected_msg)
+
+
+def test_run_select(action_module):
+    args = ReadRemoteFile.get_validator().validate(dict(file_path='/etc/app.json', parser='json',
+                                                        select=['servers.port', 'missing'])).validated_parameters
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFile(_action_module, {})
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {
+            'content': '{"servers": [{"port": 80}, {"name": "b"}, {"port": 443}]}',
+            'encoding': 'plain',
+            'source': '/etc/app.json'
+        }
+        result = plugin.run(args, None, {})
+
+    assert result['parsed'] == {'servers.port': [80, 443]}
@@ -0,0 +1,141 @@
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import base64
+import pytest
+
+from ansible.errors import AnsibleRuntimeError
+from ansible.module_utils.common.text.converters import to_bytes
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.datadope.discovery.plugins.action.software_facts import ActionModule
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin.read_remote_files \
+    import ReadRemoteFiles
+
+
+def _slurped(content, path):
+    return dict(content=base64.b64encode(to_bytes(content)), encoding='base64', source=path)
+
+
+@pytest.mark.parametrize(
+    ('args', 'expected_result'),
+    (
+        (dict(files=['test']), True),
+        (dict(files=['test', dict(file_path='other', parser='json')], parser='key_value'), True),
+        (dict(files=[dict(parser='json')]), False),
+        (dict(files=['test'], other='other'), False),
+        (dict(other='test'), False)
+    )
+)
+def test_validate_args(action_module, args, expected_result):
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFiles(_action_module, {})
+
+    if not expected_result:
+        with pytest.raises(AnsibleRuntimeError) as exinfo:
+            plugin.validate_args(args)
+        assert exinfo.value.message.startswith("Wrong parameters sent to software facts plugin 'read_remote_files'")
+    else:
+        validated_args = plugin.validate_args(args)
+        assert validated_args['files'][0] == dict(file_path='test', parser=None, parser_params=None, in_docker=None,
+                                                  delegate_reading=False)
+
+
+def test_run(action_module):
+    _action_module = action_module(ActionModule)
+    task_vars = {}
+    plugin = ReadRemoteFiles(_action_module, task_vars)
+    args = plugin.validate_args(dict(
+        files=[
+            'relative.conf',
+            dict(file_path='/etc/app.json', parser='json'),
+            '/etc/missing.conf',
+            dict(file_path='/etc/host.conf', in_docker=False),
+        ],
+        parser='key_value',
+        parser_params=dict(separators=['='])
+    ))
+    sw_instance = dict(process=dict(pid='100', cwd='/opt/app'), docker=dict(name='app'))
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {
+            'changed': False,
+            'files': {
+                '/proc/100/root/opt/app/relative.conf': _slurped('port=80\n', '/proc/100/root/opt/app/relative.conf'),
+                '/proc/100/root/etc/app.json': _slurped('{"port": 81}', '/proc/100/root/etc/app.json'),
+                '/proc/100/root/etc/missing.conf': dict(failed=True, msg='file not found: /etc/missing.conf',
+                                                        source='/proc/100/root/etc/missing.conf'),
+                '/etc/host.conf': _slurped('port=82\n', '/etc/host.conf'),
+            }
+        }
+        result = plugin.run(args, None, sw_instance)
+
+    mock_execute_module.assert_called_once_with(
+        module_name='datadope.discovery.slurp_files',
+        module_args={'paths': ['/proc/100/root/opt/app/relative.conf', '/proc/100/root/etc/app.json',
+                               '/proc/100/root/etc/missing.conf', '/etc/host.conf']},
+        task_vars=task_vars)
+    assert result['failed'] is False
+    assert [f['file_path'] for f in result['files']] == ['relative.conf', '/etc/app.json', '/etc/missing.conf',
+                                                         '/etc/host.conf']
+    assert result['files'][0] == dict(file_path='relative.conf', content='port=80\n', parsed=dict(port='80'),
+                                      source='/proc/100/root/opt/app/relative.conf')
+    assert result['files'][1]['parsed'] == dict(port=81)
+    assert result['files'][2]['failed'] is True
+    assert result['files'][2]['msg'] == \
+        "the remote file '/proc/100/root/etc/missing.conf' does not exist, not transferring"
+    assert result['files'][3]['parsed'] == dict(port='82')
+
+
+def test_run_module_failed(action_module):
+    _action_module = action_module(ActionModule)
+    plugin = ReadRemoteFiles(_action_module, {})
+    args = plugin.validate_args(dict(files=['/etc/app.conf']))
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.return_value = {'failed': True, 'msg': 'Module failure'}
+        result = plugin.run(args, None, {})
+
+    assert result == dict(failed=True, msg='Module failure')
+
+
+def test_run_windows(action_module):
+    _action_module = action_module(ActionModule)
+    task_vars = {'ansible_facts': {'os_family': 'Windows'}}
+    plugin = ReadRemoteFiles(_action_module, task_vars)
+    args = plugin.validate_args(dict(files=['C:\\app\\first.conf', 'C:\\app\\second.conf']))
+
+    with patch.object(plugin, '_execute_module') as mock_execute_module:
+        mock_execute_module.side_effect = lambda module_name, module_args, task_vars: \
+            _slurped(module_args['src'], module_args['src'])
+        result = plugin.run(args, None, {})
+
+    assert mock_execute_module.call_count == 2
+    assert all(c[1]['module_name'] == 'ansible.legacy.slurp' for c in mock_execute_module.call_args_list)
+    assert [f['content'] for f in result['files']] == ['C:\\app\\first.conf', 'C:\\app\\second.conf']
+
+
+def test_run_parse_on_target(action_module):
+    _action_module = action_module(ActionModule)
+    task_vars = {}
+    plugin = ReadRemoteFiles(_action_module, task_vars)
+    args = plugin.validate_args(dict(
+        files=[dict(file_path='/etc/a.json', parser='json'), dict(file_path='/etc/b.json', parser='json'),
+               dict(file_path='/etc/c.xml', parser='xml'), '/etc/d.conf'],
+        parse_on_target=True
+    ))
+
+    def execute_module(module_name, module_args, task_vars):
+        return dict(changed=False, files=dict((path, dict(parsed=module_args.get('parser'), source=path))
+                                              for path in module_args['paths']))
+
+    with patch.object(plugin, '_execute_module', side_effect=execute_module) as mock_execute_module:
+        with patch.object(plugin, '_process_slurp_result', side_effect=lambda result, path: (result, path)):
+            result = plugin.run(args, None, {})
+
+    assert sorted(sorted(call[1]['module_args'].items()) for call in mock_execute_module.call_args_list) == [
+        [('parser', 'json'), ('paths', ['/etc/a.json', '/etc/b.json'])],
+        [('parser', 'xml'), ('paths', ['/etc/c.xml'])],
+        [('paths', ['/etc/d.conf'])],
+    ]
+    assert [f.get('parsed') for f in result['files']] == ['json', 'json', 'xml', None]
@@ -0,0 +1,119 @@
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleRuntimeError
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.datadope.discovery.plugins.action.software_facts import ActionModule
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin\
+    .stat_many import StatMany as PluginToTest
+
+
+def test_get_args_spec():
+    assert PluginToTest.get_args_spec() == dict(
+        paths=dict(type='list', elements='path', required=True),
+        follow=dict(type='bool', default=False),
+        get_mime=dict(type='bool', default=True, aliases=['mime', 'mime_type', 'mime-type']),
+        get_attributes=dict(type='bool', default=True, aliases=['attr', 'attributes']),
+        in_docker=dict(type='bool', required=False, default=True)
+    )
+
+
+@pytest.mark.parametrize(
+    ('args', 'expected_result'),
+    (
+        (dict(paths=['value1', 'value2']), True),
+        (dict(path='value1'), False),
+        (dict(paths=['value1'], in_docker=False, other='anything'), False)
+    )
+)
+def test_validate_args(action_module, args, expected_result):
+    _action_module = action_module(ActionModule)
+    plugin = PluginToTest(_action_module, {})
+
+    if not expected_result:
+        with pytest.raises(AnsibleRuntimeError) as exinfo:
+            plugin.validate_args(args)
+        assert exinfo.value.message.startswith("Wrong parameters sent to software facts plugin"
+                                               " 'stat_many'")
+    else:
+        plugin.validate_args(args)
+
+
+@pytest.mark.parametrize(
+    ('sw_instance', 'path_prefix'),
+    (
+        ({}, ''),
+        ({"docker": {"name": "docker-name"}, "process": {"pid": "1234"}}, '/proc/1234/root'),
+    )
+)
+def test_run(action_module, sw_instance, path_prefix):
+    args = dict(paths=['/dir/file', '/dir/missing', '/dir/secret'], follow=False, get_mime=False,
+                get_attributes=True, in_docker=True)
+    module_result = dict(changed=False, files={
+        path_prefix + '/dir/file': dict(stat=dict(exists=True, isreg=True, path=path_prefix + '/dir/file')),
+        path_prefix + '/dir/missing': dict(stat=dict(exists=False)),
+        path_prefix + '/dir/secret': dict(failed=True, msg='Permission denied'),
+    })
+
+    _action_module = action_module(ActionModule)
+    plugin = PluginToTest(_action_module, {})
+
+    with patch.object(plugin, '_execute_module') as mocked_execute_module:
+        mocked_execute_module.return_value = module_result
+        result = plugin.run(args, None, sw_instance)
+
+    mocked_execute_module.assert_called_once_with(
+        module_name='datadope.discovery.stat_files',
+        module_args=dict(paths=[path_prefix + '/dir/file', path_prefix + '/dir/missing',
+                                path_prefix + '/dir/secret'],
+                         follow=False, get_mime=False, get_attributes=True),
+        task_vars=plugin._task_vars,
+        wrap_async=plugin._task.async_val)
+    assert result == dict(failed=False, stats={
+        '/dir/file': dict(failed=False, stat=dict(exists=True, isreg=True, path='/dir/file')),
+        '/dir/missing': dict(failed=True, msg="Path '/dir/missing' not found"),
+        '/dir/secret': dict(failed=True, msg='Permission denied'),
+    })
+
+
+def test_run_module_failed(action_module):
+    args = dict(paths=['/dir/file'], follow=False, get_mime=True, get_attributes=True, in_docker=True)
+
+    _action_module = action_module(ActionModule)
+    plugin = PluginToTest(_action_module, {})
+
+    with patch.object(plugin, '_execute_module') as mocked_execute_module:
+        mocked_execute_module.return_value = dict(failed=True, msg="The error message", exception="The exception")
+        result = plugin.run(args, None, {})
+
+    assert result == dict(failed=True, msg="The error message", exception="The exception")
+
+
+def test_run_windows(action_module):
+    args = dict(paths=['C:\\dir\\file.exe', 'C:\\dir\\missing.exe'], follow=False, get_mime=True,
+                get_attributes=True, in_docker=True)
+    task_vars = {"ansible_facts": {"os_family": "windows"}}
+    module_results = {
+        'C:\\dir\\file.exe': dict(stat=dict(exists=True, path='C:\\dir\\file.exe')),
+        'C:\\dir\\missing.exe': dict(stat=dict(exists=False)),
+    }
+
+    _action_module = action_module(ActionModule)
+    plugin = PluginToTest(_action_module, task_vars)
+
+    with patch.object(plugin, '_execute_module') as mocked_execute_module:
+        mocked_execute_module.side_effect = lambda module_name, module_args, task_vars, wrap_async: \
+            module_results[module_args['path']]
+        result = plugin.run(args, None, {"docker": {"name": "docker-name"}, "process": {"pid": "1234"}})
+
+    assert mocked_execute_module.call_count == 2
+    assert mocked_execute_module.call_args_list[0][1]['module_name'] == 'ansible.windows.win_stat'
+    assert mocked_execute_module.call_args_list[0][1]['module_args'] == dict(path='C:\\dir\\file.exe', follow=False,
+                                                                             get_checksum=False)
+    assert result == dict(failed=False, stats={
+        'C:\\dir\\file.exe': dict(failed=False, stat=dict(exists=True, path='C:\\dir\\file.exe')),
+        'C:\\dir\\missing.exe': dict(failed=True, msg="Path 'C:\\dir\\missing.exe' not found"),
+    })
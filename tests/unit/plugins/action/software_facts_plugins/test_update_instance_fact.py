@@ -0,0 +1,57 @@
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleActionFail
+from ansible_collections.datadope.discovery.plugins.action.software_facts import ActionModule
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.builtin.update_instance_fact \
+    import UpdateInstanceFact
+
+
+def test_run(action_module):
+    args = {
+        'updates': [
+            {'path': '_list_procs.1.ORACLE_HOME', 'value': '/u01/app/oracle'},
+            {'path': '_list_procs[1].instances', 'value': {}},
+            {'path': "_list_procs[1]['ports']", 'value': [1521]},
+            {'path': 'version', 'value': '19c'},
+        ]
+    }
+    sw_instance = {
+        '_list_procs': [{'name': 'LISTENER'}, {'name': 'LISTENER2'}],
+        'version': '19c',
+        'type': 'Oracle'
+    }
+    _action_module = action_module(ActionModule)
+    plugin = UpdateInstanceFact(_action_module, {})
+
+    result = plugin.run(args, None, sw_instance)
+
+    expected_procs = [{'name': 'LISTENER'},
+                      {'name': 'LISTENER2', 'ORACLE_HOME': '/u01/app/oracle', 'instances': {}, 'ports': [1521]}]
+    assert result == {'changed': True, '_list_procs': expected_procs, 'version': '19c'}
+    assert sw_instance['_list_procs'] == expected_procs
+
+    result = plugin.run(args, None, sw_instance)
+
+    assert result['changed'] is False
+
+
+@pytest.mark.parametrize(('updates', 'expected_msg'), [
+    ([{'path': 'missing.key', 'value': 1}], "'missing' was not found in the current facts."),
+    ([{'path': 'version', 'value': '12c'}, {'path': 'a..b', 'value': 1}],
+     "While processing 'a..b' found malformed path."),
+])
+def test_run_error(action_module, updates, expected_msg):
+    sw_instance = {'version': '19c'}
+    _action_module = action_module(ActionModule)
+    plugin = UpdateInstanceFact(_action_module, {})
+
+    with pytest.raises(AnsibleActionFail) as exinfo:
+        plugin.run({'updates': updates}, None, sw_instance)
+
+    assert exinfo.value.message.startswith(expected_msg)
+    # Nothing is updated if any path is wrong
+    assert sw_instance == {'version': '19c'}
@@ -234,3 +234,39 @@ def test_run_in_windows_invalid_ext(action_module):
         task_vars=plugin._task_vars,
         wrap_async=plugin._task.async_val)
     assert result == expected_result
+
+
+def test_run_cached(action_module):
+    def module_result(module_name, module_args, task_vars, wrap_async):
+        return dict(failed=False, matched=1,
+                    files=[dict(path='{0}/nginx'.format(module_args['paths'][0]),
+                                isdir=False, xusr=True, xgrp=True, xoth=True)])
+
+    args = dict(name="nginx", paths=['/usr/sbin'], hidden=False, in_docker=True, windows_valid_extensions=None)
+    docker_instance = {"docker": {"name": "docker-name"}, "process": {"pid": "1234"}}
+
+    _action_module = action_module(ActionModule)
+    plugin = PluginToTest(_action_module, {})
+
+    with patch.object(plugin, '_execute_module', side_effect=module_result) as mocked_execute_module:
+        results = [plugin.run(dict(args), None, sw_instance)
+                   for sw_instance in ({}, {}, docker_instance, docker_instance)]
+
+    # Lookups are repeated only for other container roots
+    assert [call[1]['module_args']['paths'] for call in mocked_execute_module.call_args_list] == [
+        ['/usr/sbin'], ['/proc/1234/root/usr/sbin']]
+    assert [result['file']['path'] for result in results] == ['/usr/sbin/nginx'] * 4
+
+
+def test_run_failed_not_cached(action_module):
+    args = dict(name="nginx", paths=['/usr/sbin'], hidden=False, in_docker=True, windows_valid_extensions=None)
+
+    _action_module = action_module(ActionModule)
+    plugin = PluginToTest(_action_module, {})
+
+    with patch.object(plugin, '_execute_module') as mocked_execute_module:
+        mocked_execute_module.return_value = dict(failed=True, msg="The error message")
+        plugin.run(dict(args), None, {})
+        plugin.run(dict(args), None, {})
+
+    assert mocked_execute_module.call_count == 2
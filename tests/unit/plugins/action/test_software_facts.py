@@ -3,14 +3,21 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import os.path
+import threading
+import time
 
 import pytest
 from ansible.errors import AnsibleError, AnsibleRuntimeError
 from ansible.module_utils.six import iteritems
+from ansible.plugins.action import ActionBase
 
 from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import call, patch, MagicMock, ANY
 from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.compat.__init__ import _TEMPLAR_HAS_TEMPLATE_CACHE
 from ansible_collections.datadope.discovery.plugins.action.software_facts import ActionModule
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins import __init__ as plugins_module
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.conditions \
+    import compile_condition
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plan import include_plan_cache
 
 
 @pytest.fixture
@@ -1098,7 +1105,8 @@ def params_set_dockers_without_children():
 def test_init(action_module):
     instance = action_module(ActionModule)
     expected_args = ['udp_listen', 'software_list', 'processes', 'tcp_listen', 'packages', 'dockers',
-                     'pre_tasks', 'post_tasks', 'include_software', 'exclude_software']
+                     'pre_tasks', 'post_tasks', 'include_software', 'exclude_software', 'instance_workers',
+                     'remote_helper']
     expected_arg_info_list = dict(type='list', elements='dict', required=True)
     expected_arg_info_dict = dict(type='dict', required=False)
     expected_arg_info_list_nonreq = dict(type='list', elements='dict', required=False)
@@ -1112,7 +1120,9 @@ def test_init(action_module):
         'pre_tasks': expected_arg_info_list_nonreq,
         'post_tasks': expected_arg_info_list_nonreq,
         'include_software': dict(type='list', elements='str', required=False),
-        'exclude_software': dict(type='list', elements='str', required=False)
+        'exclude_software': dict(type='list', elements='str', required=False),
+        'instance_workers': dict(type='int', required=False, default=1),
+        'remote_helper': dict(type='bool', required=False, default=False)
     }
     argument_spec = instance.argument_spec
     assert set(argument_spec.keys()) == set(expected_args)
@@ -1366,7 +1376,8 @@ def test_include_exclude(action_module, task_vars, original_list, include, exclu
         dockers={},
         task_vars=task_vars,
         pre_tasks=None,
-        post_tasks=None)
+        post_tasks=None,
+        instance_workers=1)
 
 
 @pytest.mark.parametrize(argnames=['params_and_expected_result'],
@@ -1454,6 +1465,19 @@ def test_plugins_wrong_plugin_definition(action_module, params_set_child_without
         .format(wrong_attribute, plugin_def)
 
 
+def test_plugins_not_mapping_definition_ignored(action_module, params_set_child_without_children):
+    params, expected_result = params_set_child_without_children
+    params['software_list'][0]['custom_tasks'] = [
+        {'name': 'the block', 'block': ['not a mapping'], 'ignore_errors': True, 'register': 'block_result'},
+    ]
+    _action_module = action_module(ActionModule)
+    _action_module.process_software(**params)
+
+    params['software_list'][0]['custom_tasks'] = ['not a mapping']
+    with pytest.raises(AttributeError):
+        _action_module.process_software(**params)
+
+
 def test_plugins_two_plugins(action_module, params_set_child_without_children, normalize):
     params, expected_result = params_set_child_without_children
     the_plugin1 = {
@@ -2293,6 +2317,18 @@ def test_replace_vars(action_module, variables, expected_result):
     assert result == expected_result
 
 
+def test_replace_vars_without_templates(action_module):
+    _action_module = action_module(ActionModule)
+    mocked_templar = _action_module._templar
+    mocked_templar.template = MagicMock(side_effect=lambda data, **kwargs: data)
+
+    result = _action_module._replace_instance_vars({'key1': 'untemplated', 'key2': ['/etc/<< file >>', 'other']})
+
+    assert result == {'key1': 'untemplated', 'key2': ['/etc/{{ file }}', 'other']}
+    mocked_templar.template.assert_called_once_with('/etc/{{ file }}', **({'cache': False}
+                                                                          if _TEMPLAR_HAS_TEMPLATE_CACHE else {}))
+
+
 def test_storage_plugin_result(action_module):
     attributes = {'register': 'the_var'}
     task_vars = {}
@@ -2366,6 +2402,65 @@ def test_plugins_include_tasks(action_module, params_set_child_with_children):
     }
 
 
+def test_plugins_include_tasks_compiled_once(action_module, params_set_child_with_children):
+    plugin_def = {
+        'name': 'the name',
+        'include_tasks': {
+            'file': os.path.join(os.path.dirname(__file__), 'test_include_tasks.yaml')
+        }
+    }
+    params, expected_result = params_set_child_with_children
+    params['software_list'][0]['custom_tasks'] = [plugin_def]
+    _action_module = action_module(ActionModule)
+    executed = []
+    include_plan_cache.clear()
+
+    original_execute_plugin = _action_module._execute_plugin
+
+    def pathed_execute_plugin(*args, **kwargs):
+        arg = kwargs.get('plugin', args[0])
+        if 'include_tasks' in arg:
+            return original_execute_plugin(*args, **kwargs)
+        executed.append(arg)
+
+    with patch.object(_action_module, '_check_conditions', return_value=True):
+        with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+            with patch.object(_action_module, '_store_plugin_result', return_value=None):
+                with patch.object(_action_module, '_execute_plugin', new=pathed_execute_plugin):
+                    with patch.object(_action_module, 'get_plugins_from_file',
+                                      wraps=_action_module.get_plugins_from_file) as mocked_get_plugins:
+                        for _ in range(2):
+                            _action_module._execute_plugins(params['software_list'][0], expected_result[0], {})
+
+    mocked_get_plugins.assert_called_once()
+    assert [step['name'] for step in executed] == ['show var', 'set_var_from_include'] * 2
+    # Both instances execute the same compiled steps
+    assert executed[0] is executed[2] and executed[1] is executed[3]
+
+
+def test_include_plan_shared_by_runs(action_module, tmp_path):
+    include_file = tmp_path / 'include.yaml'
+    include_file.write_text(u'- name: the name\n  the_plugin:\n    arg: [1, 2]\n')
+    include_plan_cache.clear()
+    plans = []
+    with patch.object(ActionModule, 'get_plugins_from_file', autospec=True,
+                      side_effect=ActionModule.get_plugins_from_file) as mocked_get_plugins:
+        for _ in range(2):
+            plans.append(action_module(ActionModule)._get_include_plan(str(include_file), 'desc'))
+        assert mocked_get_plugins.call_count == 1
+        assert plans[0] is plans[1]
+        assert plans[0] == ({'name': 'the name', 'the_plugin': {'arg': [1, 2]}},)
+        with pytest.raises(TypeError):
+            plans[0][0].args['arg'].append(3)
+
+        # Modified files are read again
+        include_file.write_text(u'- name: the new name\n  the_plugin: {}\n')
+        os.utime(str(include_file), (0, 0))
+        plans.append(action_module(ActionModule)._get_include_plan(str(include_file), 'desc'))
+        assert mocked_get_plugins.call_count == 2
+        assert plans[2] == ({'name': 'the new name', 'the_plugin': {}},)
+
+
 def test_plugins_include_tasks_no_file(action_module, params_set_child_with_children):
     plugin_def = {
         'name': 'the name',
@@ -2615,3 +2710,359 @@ def test_ignore_by_plugin(action_module, params_set_child_with_children):
     with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
         result = _action_module.process_software(**params)
     assert result == []
+
+
+def test_ignore_by_plugin_processes_available_for_next_software(action_module, params_set_child_with_children):
+    params = params_set_child_with_children[0]
+    ignored_software = params['software_list'][0]
+    ignored_software['custom_tasks'] = [{
+        'set_instance_fact': {
+            "NOT_A_REAL_SOFTWARE_REMOVE_FROM_LIST": True
+        }
+    }]
+    params['software_list'].append(dict(ignored_software, name='Next software', custom_tasks=[]))
+    _action_module = action_module(ActionModule, task_vars={})
+    with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+        result = _action_module.process_software(**params)
+    assert [x['type'] for x in result] == ['Next software']
+    assert result[0]['process']['pid'] == '24895'
+    assert [x['pid'] for x in result[0]['process']['children']] == \
+        [x['pid'] for x in params['processes'] if x['ppid'] == '24895']
+
+
+@pytest.mark.parametrize('instance_workers', [1, 3])
+def test_instance_workers(action_module, instance_workers):
+    params = {
+        'software_list': [{
+            'name': 'Redis',
+            'cmd_regexp': 'redis-server',
+            'process_type': 'parent',
+            'custom_tasks': [
+                {
+                    'name': 'Only executed if not registered before',
+                    'set_instance_fact': {
+                        'first': True
+                    },
+                    'when': 'previous is not defined',
+                    'register': 'previous'
+                },
+                {
+                    'name': 'Use instance vars',
+                    'set_instance_fact': {
+                        'port': '<< __instance__.process.cmdline.split(":")[-1] >>'
+                    }
+                }
+            ]
+        }],
+        'processes': [
+            dict(pid='1', ppid='0', cmdline='/sbin/init', cwd='/'),
+            dict(pid='100', ppid='1', cmdline='/usr/bin/redis-server *:6379', cwd='/'),
+            dict(pid='200', ppid='1', cmdline='/usr/bin/redis-server *:6380', cwd='/'),
+            dict(pid='300', ppid='1', cmdline='/usr/bin/redis-server *:6381', cwd='/'),
+        ],
+        'tcp_listen': [],
+        'udp_listen': [],
+        'instance_workers': instance_workers
+    }
+    task_vars = {}
+    _action_module = action_module(ActionModule, task_vars=task_vars)
+    with patch.object(_action_module, '_copy_for_instance', wraps=_action_module._copy_for_instance) as mocked_copy:
+        result = _action_module.process_software(task_vars=task_vars, **params)
+    assert [x['port'] for x in result] == ['6379', '6380', '6381']
+    if instance_workers == 1:
+        # Registered vars of an instance are seen by the next ones
+        assert [x.get('first') for x in result] == [True, None, None]
+        mocked_copy.assert_not_called()
+    else:
+        assert [x.get('first') for x in result] == [True, True, True]
+        assert mocked_copy.call_count == 3
+    assert task_vars == {}
+
+
+@pytest.mark.parametrize(('transport', 'pipelining', 'serialized'), [
+    ('ssh', True, False),
+    ('local', True, False),
+    ('ssh', False, True),
+    ('winrm', True, True),
+    ('psrp', True, True),
+    ('paramiko', True, True),
+])
+def test_modules_of_concurrent_instances(action_module, transport, pipelining, serialized):
+    _action_module = action_module(ActionModule)
+    _action_module._connection.transport = transport
+    _action_module._module_lock = MagicMock()
+    with patch.object(_action_module, '_is_pipelining_enabled', return_value=pipelining), \
+            patch.object(ActionBase, '_execute_module', return_value={'rc': 0}):
+        assert _action_module.execute_module('command', {'_raw_params': 'true'}) == {'rc': 0}
+    # Modules are only executed at the same time through connections that start a process for each command
+    assert _action_module._module_lock.__enter__.called is serialized
+
+
+class _ThreadPlugin(object):
+    IO_BOUND = True
+
+    def __init__(self, wait_event=None):
+        self.wait_event = wait_event
+        self.threads = []
+
+    @staticmethod
+    def validate_args(args):
+        return args
+
+    def run(self, args=None, attributes=None, software_instance=None):
+        self.threads.append(threading.current_thread())
+        if self.wait_event:
+            self.wait_event.wait(5)
+        return {'thread': threading.current_thread().name}
+
+
+@pytest.mark.parametrize(('io_bound', 'timeout', 'in_caller_thread'), [
+    (True, 0, True),
+    (False, 10, True),
+    (True, 10, False),
+])
+def test_plugin_execution_thread(action_module, io_bound, timeout, in_caller_thread):
+    _action_module = action_module(ActionModule, task_vars={})
+    plugin = _ThreadPlugin()
+    plugin.IO_BOUND = io_bound
+    with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+        for _ in range(2):
+            result = {}
+            _action_module._execute_plugin_for_item_async({}, {}, 'desc', None, None, result, 'plugin', plugin, {},
+                                                          timeout)
+    assert (plugin.threads[0] is threading.current_thread()) is in_caller_thread
+    # Threads of the executor are reused
+    assert plugin.threads[0] is plugin.threads[1]
+
+
+def test_plugin_timeout_cancels_plugin(action_module):
+    _action_module = action_module(ActionModule, task_vars={})
+    wait_event = threading.Event()
+    module_results = []
+
+    class _ModulePlugin(_ThreadPlugin):
+        def run(self, args=None, attributes=None, software_instance=None):
+            super(_ModulePlugin, self).run(args, attributes, software_instance)
+            try:
+                module_results.append(_action_module.execute_module(module_name='ansible.legacy.stat'))
+            except Exception as e:
+                module_results.append(e)
+
+    with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+        with pytest.raises(AnsibleRuntimeError) as ex_info:
+            _action_module._execute_plugin_for_item_async({}, {}, 'desc', None, None, {}, 'plugin',
+                                                          _ModulePlugin(wait_event), {}, 0.1)
+    assert ex_info.value.message == "Plugin 'plugin' timeout for task 'desc'"
+    # The timeout is raised without waiting for the plugin, that fails when it tries to execute a module
+    assert module_results == []
+    wait_event.set()
+    for _ in range(50):
+        if module_results:
+            break
+        time.sleep(0.1)
+    assert isinstance(module_results[0], AnsibleRuntimeError)
+    assert module_results[0].message == \
+        "Module 'ansible.legacy.stat' not executed since the plugin has been cancelled due to its timeout"
+
+
+def test_plugin_timeout_never_returning(action_module):
+    _action_module = action_module(ActionModule, task_vars={})
+    never_set = threading.Event()
+    seen = {}
+
+    class _HungPlugin(plugins_module.SoftwareFactsPlugin):
+        @classmethod
+        def get_args_spec(cls):
+            return {}
+
+        def validate_args(self, args):
+            return args
+
+        def run(self, args=None, attributes=None, software_instance=None):
+            seen.update(action_module=self._action_module, software_instance=software_instance)
+            never_set.wait()
+
+    plugin = _HungPlugin(_action_module, {})
+    _action_module._instance_pool._instances[('plugins', 'hung')] = plugin
+    software_instance = {'type': 'Redis'}
+    start = time.time()
+    try:
+        with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+            with pytest.raises(AnsibleRuntimeError) as ex_info:
+                _action_module._execute_plugin_for_item_async({}, {}, 'desc', None, None, {}, 'hung', plugin,
+                                                              software_instance, 0.2)
+        # The task fails once the timeout is reached, even if the plugin never returns
+        assert time.time() - start < 2
+        assert ex_info.value.message == "Plugin 'hung' timeout for task 'desc'"
+        # The plugin runs with its own copies of the action module and instance, and it is not reused
+        assert seen['action_module'] is not _action_module
+        assert seen['action_module']._task is not _action_module._task
+        assert seen['action_module']._templar is not _action_module._templar
+        assert seen['software_instance'] == software_instance and seen['software_instance'] is not software_instance
+        assert plugin not in _action_module._instance_pool._instances.values()
+    finally:
+        never_set.set()
+
+
+def test_plugin_timeout_in_caller_thread(action_module):
+    _action_module = action_module(ActionModule, task_vars={})
+
+    class _SlowPlugin(_ThreadPlugin):
+        IO_BOUND = False
+
+        def run(self, args=None, attributes=None, software_instance=None):
+            time.sleep(0.2)
+            return super(_SlowPlugin, self).run(args, attributes, software_instance)
+
+    plugin = _SlowPlugin()
+    result = {}
+    with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+        with pytest.raises(AnsibleRuntimeError) as ex_info:
+            _action_module._execute_plugin_for_item_async({}, {}, 'desc', 'block', 'item', result, 'plugin',
+                                                          plugin, {}, 0.1, 2)
+    assert ex_info.value.message == "Plugin 'plugin' timeout for task 'desc' in block 'block' with item index 2"
+    assert plugin.threads == [threading.current_thread()]
+    assert result == {}
+
+
+def test_plugin_base_exception(action_module):
+    _action_module = action_module(ActionModule, task_vars={})
+
+    class _ExitPlugin(_ThreadPlugin):
+        def run(self, args=None, attributes=None, software_instance=None):
+            raise SystemExit(3)
+
+    with patch.object(_action_module, '_replace_instance_vars', lambda x: x):
+        with pytest.raises(SystemExit):
+            _action_module._execute_plugin_for_item_async({}, {}, 'desc', None, None, {}, 'plugin', _ExitPlugin(),
+                                                          {}, 10)
+
+
+def test_conditions_compiled_once(action_module):
+    task_vars = dict(result=dict(failed=True))
+    _action_module = action_module(ActionModule, task_vars=task_vars)
+    _action_module._conditional = MagicMock()
+    with patch('ansible_collections.datadope.discovery.plugins.action.software_facts.compile_condition',
+               wraps=compile_condition) as mocked_compile_condition:
+        for _ in range(3):
+            assert _action_module._check_conditions(['result is failed', 'result.failed'], task_vars)
+        task_vars['result']['failed'] = False
+        assert not _action_module._check_conditions('result is failed', task_vars)
+    assert mocked_compile_condition.call_count == 2
+    _action_module._conditional.evaluate_conditional.assert_not_called()
+
+
+def test_conditions_error_raised_by_ansible(action_module):
+    task_vars = {}
+    _action_module = action_module(ActionModule, task_vars=task_vars)
+    with pytest.raises(AnsibleError) as exinfo:
+        _action_module._check_conditions('undefined_var', task_vars)
+    assert exinfo.value.message.startswith("The conditional check 'undefined_var' failed")
+
+
+def test_plugin_instances_reused(action_module):
+    params = {
+        'software_list': [{
+            'name': 'Redis',
+            'cmd_regexp': 'redis-server',
+            'process_type': 'parent',
+            'custom_tasks': [
+                {'name': 'First fact', 'set_instance_fact': {'first': 1}},
+                {'name': 'Second fact', 'set_instance_fact': {'second': 2}},
+                {'name': 'Binding', 'add_binding_info': {'port': 6379}},
+            ]
+        }],
+        'processes': [
+            dict(pid='1', ppid='0', cmdline='/sbin/init', cwd='/'),
+            dict(pid='100', ppid='1', cmdline='/usr/bin/redis-server *:6379', cwd='/'),
+            dict(pid='200', ppid='1', cmdline='/usr/bin/redis-server *:6380', cwd='/'),
+        ],
+        'tcp_listen': [],
+        'udp_listen': [],
+    }
+    task_vars = {}
+    _action_module = action_module(ActionModule, task_vars=task_vars)
+    plugins = []
+    original_execute_plugin_for_item_async = _action_module._execute_plugin_for_item_async
+
+    def execute_plugin_for_item_async(args, attributes, desc, in_block, item, item_result_holder, name, plugin,
+                                      *other_args):
+        plugins.append(plugin)
+        return original_execute_plugin_for_item_async(args, attributes, desc, in_block, item, item_result_holder,
+                                                      name, plugin, *other_args)
+
+    with patch.object(_action_module, '_execute_plugin_for_item_async', new=execute_plugin_for_item_async):
+        with patch.object(plugins_module, 'ArgumentSpecValidator', wraps=plugins_module.ArgumentSpecValidator) \
+                as mocked_validator:
+            plugins_module._validators.clear()
+            result = _action_module.process_software(task_vars=task_vars, **params)
+
+    assert [(x['first'], x['second'], x['bindings'][0]['port']) for x in result] == [(1, 2, 6379)] * 2
+    assert len(plugins) == 6 and len(set(id(p) for p in plugins)) == 2
+    assert plugins[0] is plugins[1] is plugins[3] is plugins[4]
+    # Only add_binding_info uses the args spec validator
+    assert mocked_validator.call_count == 1
+
+
+def test_args_without_templates_validated_once(action_module):
+    params = {
+        'software_list': [{
+            'name': 'Redis',
+            'cmd_regexp': 'redis-server',
+            'process_type': 'parent',
+            'custom_tasks': [
+                {'name': 'Static binding', 'add_binding_info': {'port': 6379}},
+                {'name': 'Instance binding',
+                 'add_binding_info': {'address': '<< __instance__.process.pid >>', 'port': 1}},
+            ]
+        }],
+        'processes': [
+            dict(pid='1', ppid='0', cmdline='/sbin/init', cwd='/'),
+            dict(pid='100', ppid='1', cmdline='/usr/bin/redis-server *:6379', cwd='/'),
+            dict(pid='200', ppid='1', cmdline='/usr/bin/redis-server *:6380', cwd='/'),
+        ],
+        'tcp_listen': [],
+        'udp_listen': [],
+    }
+    task_vars = {}
+    _action_module = action_module(ActionModule, task_vars=task_vars)
+    validated = []
+    original_get_validator = plugins_module.SoftwareFactsPlugin.get_validator.__func__
+
+    def get_validator(cls):
+        validator = original_get_validator(cls)
+
+        class Validator(object):
+            def validate(self, args):
+                validated.append(dict(args))
+                return validator.validate(args)
+
+        return Validator()
+
+    with patch.object(plugins_module.SoftwareFactsPlugin, 'get_validator', new=classmethod(get_validator)):
+        result = _action_module.process_software(task_vars=task_vars, **params)
+
+    assert [[b['port'] for b in x['bindings']] for x in result] == [[6379, 1]] * 2
+    assert [x['bindings'][1]['address'] for x in result] == ['100', '200']
+    # Static args are validated for the first instance only, the ones with templates for every instance
+    assert validated == [{'port': 6379}, {'address': '100', 'port': 1}, {'address': '200', 'port': 1}]
+    # Every instance gets its own copy of the validated args
+    assert result[0]['bindings'][0] is not result[1]['bindings'][0]
+
+
+@pytest.mark.parametrize(('helper_result', 'module_executed'), [
+    ({'changed': False, 'stat': {'exists': False}}, False),
+    (None, True),
+])
+def test_execute_module_remote_helper(action_module, helper_result, module_executed):
+    _action_module = action_module(ActionModule, task_vars={})
+    _action_module._remote_helper = MagicMock()
+    _action_module._remote_helper.execute_module.return_value = helper_result
+    module_result = {'changed': False, 'stat': {'exists': True}}
+    with patch('ansible.plugins.action.ActionBase._execute_module', return_value=module_result) as mocked_execute:
+        result = _action_module.execute_module(module_name='stat', module_args={'path': '/etc/hosts'})
+
+    _action_module._remote_helper.execute_module.assert_called_once_with(
+        _action_module, 'stat', {'path': '/etc/hosts'}, False)
+    assert mocked_execute.called is module_executed
+    assert result == (module_result if module_executed else helper_result)
@@ -0,0 +1,43 @@
+import pytest
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.cmd_matcher import CmdMatcher
+
+PATTERNS = [
+    r'^.*\.apache\.(?:tomcat|catalina)\.startup|^.*-Dcatalina\.(?:base|home)=',
+    r'^.*/(?:sbin|bin)/(?:httpd|httpd2|apache2)(?!-tomcat)(?:[-_](?:prefork|worker))?',
+    r'postgres:|postgres\.exe.*?--fork',
+    r'nginx\:?\s*master.*(nginx)?',
+    r'java',
+]
+
+
+@pytest.mark.parametrize(('cmdline', 'expected'), [
+    ('/usr/bin/java -Dcatalina.base=/opt/tomcat org.apache.catalina.startup.Bootstrap start', [0, 4]),
+    ('/usr/sbin/httpd -DFOREGROUND', [1]),
+    ('/usr/sbin/HTTPD -DFOREGROUND', [1]),
+    ('/usr/sbin/httpd-tomcat', []),
+    ('postgres: checkpointer', [2]),
+    ('nginx: master process /usr/sbin/nginx', [3]),
+    ('/usr/bin/python3 /usr/bin/supervisord', []),
+    # Non ASCII chars equivalent to ASCII ones when ignoring case
+    (u'/opt/\u212aJAVA/bin/java', [4]),
+    (u'po\u017ftgres: checkpointer', [2]),
+])
+def test_matches(cmdline, expected):
+    cmd_matcher = CmdMatcher(PATTERNS)
+    assert cmd_matcher.matches(cmdline) == frozenset(PATTERNS[i] for i in expected)
+    for index, pattern in enumerate(PATTERNS):
+        assert cmd_matcher.search(pattern, cmdline) is (index in expected)
+
+
+def test_command_line_evaluated_once():
+    cmd_matcher = CmdMatcher(PATTERNS)
+    assert cmd_matcher.search('java', '/usr/bin/java -jar app.jar')
+    first = cmd_matcher.matches('/usr/bin/java -jar app.jar')
+    assert cmd_matcher.matches('/usr/bin/java -jar app.jar') is first
+
+
+def test_unknown_pattern_added():
+    cmd_matcher = CmdMatcher(PATTERNS)
+    assert not cmd_matcher.search('redis-server', '/usr/bin/java -jar app.jar')
+    assert cmd_matcher.search('redis-server', '/usr/bin/redis-server *:6379')
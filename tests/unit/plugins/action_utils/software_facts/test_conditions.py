@@ -0,0 +1,51 @@
+import pytest
+from ansible.parsing.dataloader import DataLoader
+from ansible.playbook.conditional import Conditional
+from ansible.template import Templar
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.conditions import compile_condition
+
+TASK_VARS = {
+    '__instance__': {'_base_reg': {'stdout': 'ok'}, 'listening_ports': [80, 443], 'name': ''},
+    'nested': '{{ __instance__.listening_ports | length }}',
+    'result': {'failed': True},
+    'flag': False,
+}
+
+
+@pytest.mark.parametrize('condition', [
+    '__instance__._base_reg is defined',
+    '__instance__._other_reg is defined',
+    '__instance__._other_reg is not defined',
+    '__instance__.listening_ports | length > 1',
+    '443 in __instance__.listening_ports',
+    'nested | int == 2',
+    'result is failed',
+    'result is skipped',
+    'not flag',
+    '__instance__.name',
+    '__instance__._base_reg.stdout',
+    "__instance__._base_reg.stdout == 'ok' and\n__instance__.listening_ports",
+])
+def test_condition_same_result_as_ansible(condition):
+    templar = Templar(loader=DataLoader(), variables=TASK_VARS)
+    conditional = Conditional(DataLoader())
+    conditional.when = [condition]
+    compiled_condition = compile_condition(condition, templar)
+    assert compiled_condition is not None
+    for _ in range(2):
+        assert compiled_condition.evaluate(templar, TASK_VARS) is \
+            conditional.evaluate_conditional(templar=templar, all_vars=TASK_VARS)
+
+
+@pytest.mark.parametrize('condition', ['{{ flag }}', '', True, 'flag ==', None])
+def test_condition_not_compiled(condition):
+    templar = Templar(loader=DataLoader(), variables=TASK_VARS)
+    assert compile_condition(condition, templar) is None
+
+
+def test_condition_with_undefined_var_fails():
+    templar = Templar(loader=DataLoader(), variables=TASK_VARS)
+    compiled_condition = compile_condition('undefined_var', templar)
+    with pytest.raises(Exception):
+        compiled_condition.evaluate(templar, TASK_VARS)
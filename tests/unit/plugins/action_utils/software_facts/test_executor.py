@@ -0,0 +1,22 @@
+import threading
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.executor import PluginExecutor
+
+
+def test_plugin_executor_max_threads():
+    executor = PluginExecutor(max_threads=1)
+    wait_event = threading.Event()
+    calls = []
+
+    first = executor.submit(lambda: calls.append(threading.current_thread()) or wait_event.wait(5))
+    second = executor.submit(calls.append, 'second')
+    # The second call waits for the only thread, so it can be cancelled before it starts
+    assert not second.wait(0.1)
+    second.cancel()
+    assert second.wait(0)
+    wait_event.set()
+    assert first.wait(5) and first.result is True
+    third = executor.submit(lambda: calls.append(threading.current_thread()))
+    assert third.wait(5)
+    assert calls[0] is calls[1]
+    assert len(calls) == 2
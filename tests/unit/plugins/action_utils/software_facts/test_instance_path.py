@@ -0,0 +1,80 @@
+import pytest
+from ansible.errors import AnsibleActionFail
+
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts import instance_path
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.instance_path import \
+    compile_path, delete_values, set_values, split_key
+
+
+@pytest.mark.parametrize(('path', 'expected'), [
+    ('configuration', ('configuration',)),
+    ('configuration.global_defs.notification_email', ('configuration', 'global_defs', 'notification_email')),
+    ('a.b[0]["c"]', ('a', 'b', 0, 'c')),
+    ("a['x.y'][1].z", ('a', 'x.y', 1, 'z')),
+    ('_list_procs.2.ports', ('_list_procs', 2, 'ports')),
+    ('a[b]', ('a', 'b')),
+    ('a.b-c', ('a', 'b-c')),
+])
+def test_compile_path(path, expected):
+    assert compile_path(path) == expected
+
+
+@pytest.mark.parametrize('path', ['a..b', 'a[', 'not', 'a.[0]'])
+def test_compile_path_malformed(path):
+    with pytest.raises(AnsibleActionFail) as exinfo:
+        compile_path(path)
+    assert exinfo.value.message.startswith("While processing '{0}' found malformed path.".format(path))
+
+
+def test_compile_path_cached():
+    with patch.object(instance_path, 'Template', wraps=instance_path.Template) as mocked_template:
+        # Plain paths are not compiled by jinja to be validated
+        compile_path('cached.plain[0]')
+        compile_path('cached.other | default([])')
+        compile_path('cached.other | default([])')
+    assert mocked_template.call_count == 1
+    assert compile_path('cached.plain[0]') is compile_path('cached.plain[0]')
+
+
+def test_split_key():
+    assert split_key('key2.inner1') == ('key2', 'inner1')
+    assert split_key('key2.0') == ('key2', '0')
+
+
+def test_set_values():
+    root = {'a': {'b': [{'c': 1}], 'd': {}}}
+
+    changed = set_values(root, [
+        (('a', 'b', 0, 'c'), 2),
+        (('a', 'b', 1), {'c': 3}),
+        (('a', 'd'), {'e': 1}),
+        # The object replaced by the previous update is the one updated
+        (('a', 'd', 'f'), 2),
+        (('a', 'b', 0, 'c'), 2),
+    ])
+
+    assert changed
+    assert root == {'a': {'b': [{'c': 2}, {'c': 3}], 'd': {'e': 1, 'f': 2}}}
+    assert not set_values(root, [(('a', 'b', 1, 'c'), 3)])
+
+
+@pytest.mark.parametrize(('updates', 'expected_msg'), [
+    ([(('a', 'x', 'y'), 1)], "Error: the key 'x' was not found in {'b': [1]}."),
+    ([(('a', 'b', 'x'), 1)], "Error: [1] is a list, but index provided was not an integer: 'x'"),
+    ([(('a', 'b', 3), 1)], "Error: [1] not long enough for item #3 to be set."),
+    ([(('a', 'b', 0, 'x'), 1)], "update_fact can only modify mutable objects."),
+])
+def test_set_values_error(updates, expected_msg):
+    with pytest.raises(AnsibleActionFail) as exinfo:
+        set_values({'a': {'b': [1]}}, updates)
+    assert exinfo.value.message == expected_msg
+
+
+def test_delete_values():
+    root = {'a': {'b': 1, 'c': {'d': 2, 'e': 3}}, 'f': 4}
+
+    deleted = delete_values(root, [('a', 'c', 'd'), ('a', 'x', 'y'), ('a', 'c', 'e'), ('f',), ('a', 'c', 'd')])
+
+    assert deleted == [0, 2, 3]
+    assert root == {'a': {'b': 1, 'c': {}}}
@@ -0,0 +1,79 @@
+import pickle
+from copy import copy, deepcopy
+
+import pytest
+
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plan import PlanStep, compile_plan, \
+    freeze
+
+
+def test_compile_plan():
+    definitions = [
+        {'name': 'the name', 'the_plugin': {'arg': 'value'}, 'when': 'yes', 'register': 'the_var'},
+        {'block': [{'the_plugin': []}], 'register': 'ignored'},
+        {'name': 'wrong', 'the_plugin': [], 'unsupported': 'value'},
+    ]
+    plan = compile_plan(definitions)
+
+    assert plan == tuple(definitions)
+    assert (plan[0].name, plan[0].desc, plan[0].args) == ('the_plugin', 'the name', {'arg': 'value'})
+    assert plan[0].attributes == {'when': 'yes', 'register': 'the_var'}
+    assert plan[0].steps is None and not plan[0].ignored_register
+
+    assert (plan[1].name, plan[1].desc) == ('block', 'block')
+    assert plan[1].attributes == {} and plan[1].ignored_register
+    assert plan[1].steps == ({'the_plugin': []},)
+    assert isinstance(plan[1].steps[0], PlanStep) and plan[1].steps[0].name == 'the_plugin'
+
+    assert plan[2].wrong_attribute == 'unsupported'
+    assert compile_plan(plan)[0] is plan[0]
+
+
+@pytest.mark.parametrize('definition', ['not a mapping', None, [('the_plugin', {})]])
+def test_compile_plan_not_mapping(definition):
+    # The error is kept to be raised when the step is executed
+    plan = compile_plan([definition])
+    assert isinstance(plan[0].definition_error, AttributeError)
+    assert plan[0].name is None and plan[0] == {}
+
+
+def test_plan_step_read_only():
+    step = PlanStep({'the_plugin': {}})
+    with pytest.raises(TypeError):
+        step['when'] = 'yes'
+    with pytest.raises(TypeError):
+        step.update({'when': 'yes'})
+    with pytest.raises(TypeError):
+        step |= {'when': 'yes'}
+    assert step == {'the_plugin': {}}
+
+
+def test_freeze():
+    data = freeze({'a': [1, {'b': 'c'}], 'd': {'e': ['f']}})
+    assert data == {'a': [1, {'b': 'c'}], 'd': {'e': ['f']}}
+    with pytest.raises(TypeError):
+        data['a'].append(2)
+    with pytest.raises(TypeError):
+        data['a'][1]['b'] = 'x'
+    with pytest.raises(TypeError):
+        data.pop('d')
+
+    # In place operators don't modify them either
+    items = data['a']
+    with pytest.raises(TypeError):
+        items += [2]
+    with pytest.raises(TypeError):
+        items *= 2
+    inner = data['d']
+    with pytest.raises(TypeError):
+        inner |= {'x': 1}
+    assert data == {'a': [1, {'b': 'c'}], 'd': {'e': ['f']}}
+
+    # Copies are plain structures that may be modified
+    data_copy = deepcopy(data)
+    data_copy['a'][1]['b'] = 'x'
+    assert type(data_copy) is dict and type(data_copy['a']) is list
+    unpickled = pickle.loads(pickle.dumps(data))
+    unpickled['d']['e'].append('g')
+    assert data['a'][1]['b'] == 'c' and data['d']['e'] == ['f']
+    assert type(copy(data['a'])) is list
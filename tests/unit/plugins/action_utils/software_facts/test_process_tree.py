@@ -0,0 +1,44 @@
+import pytest
+
+from ansible_collections.datadope.discovery.plugins.action.software_facts import ActionModule
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.process_tree import ProcessTree
+
+
+@pytest.fixture
+def process_tree():
+    processes = [
+        dict(pid='1', ppid='0', cmdline='/sbin/init'),
+        dict(pid='10', ppid='1', cmdline='/usr/sbin/httpd -DFOREGROUND'),
+        dict(pid='11', ppid='10', cmdline='/usr/sbin/httpd -DFOREGROUND'),
+        dict(pid='12', ppid='11', cmdline='/usr/bin/rotatelogs'),
+        dict(pid='20', ppid='1', cmdline='/usr/sbin/sshd'),
+        dict(pid='30', ppid='999', cmdline='orphan'),
+    ]
+    return ProcessTree(ActionModule._prepare_processes(processes))
+
+
+def test_ancestors(process_tree):
+    assert process_tree.ancestors('12') == ('11', '10', '1')
+    assert process_tree.ancestors('1') == ()
+    # Placeholder created for the missing parent of an orphan process
+    assert process_tree.ancestors('30') == ('999',)
+
+
+def test_descendants(process_tree):
+    assert process_tree.descendants('10') == {'11', '12'}
+    assert process_tree.descendants('1') == {'10', '11', '12', '20'}
+    assert process_tree.descendants('12') == frozenset()
+
+
+def test_claim_and_release(process_tree):
+    process_tree.claim(['10', '11', '12'])
+    assert process_tree.is_claimed('11')
+    assert process_tree.unclaimed() == ['0', '1', '20', '30', '999']
+    process_tree.release(['11'])
+    assert process_tree.unclaimed() == ['0', '1', '11', '20', '30', '999']
+
+
+def test_self_parent_process():
+    process_tree = ProcessTree(ActionModule._prepare_processes([dict(pid='5', ppid='5', cmdline='loop')]))
+    assert process_tree.ancestors('5') == ()
+    assert process_tree.descendants('5') == frozenset()
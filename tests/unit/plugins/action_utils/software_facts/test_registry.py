@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+
+import pytest
+
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts import registry as registry_module
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.__init__ \
+    import SoftwareFactsPlugin
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.registry import Registry
+
+EXTERNAL_PLUGIN = u'''
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.plugins.__init__ \\
+    import SoftwareFactsPlugin
+
+
+class {class_name}(SoftwareFactsPlugin):
+    @classmethod
+    def get_args_spec(cls):
+        return {{}}
+
+    def run(self, args=None, attributes=None, software_instance=None):
+        return None
+'''
+
+
+@pytest.fixture
+def registry_env(tmp_path, monkeypatch):
+    extra_path = tmp_path / 'extra'
+    extra_path.mkdir()
+    (extra_path / 'registry_test_plugin.py').write_text(EXTERNAL_PLUGIN.format(class_name='RegistryTestPlugin'))
+    monkeypatch.setenv(registry_module.cache_dir_var, str(tmp_path / 'cache'))
+    monkeypatch.setenv('REGISTRY_TEST_PLUGINS_PATH', str(extra_path))
+    yield extra_path
+    for module in ('registry_test_plugin', 'registry_test_plugin_2'):
+        sys.modules.pop(module, None)
+    if str(extra_path) in sys.path:
+        sys.path.remove(str(extra_path))
+
+
+def test_registry(registry_env):
+    registry = Registry('plugins', SoftwareFactsPlugin, 'REGISTRY_TEST_PLUGINS_PATH')
+    stat = registry.get('stat')
+    assert stat.__module__.endswith('.plugins.builtin.stat')
+    assert registry.get('registry_test_plugin').__name__ == 'RegistryTestPlugin'
+    assert registry.get('unknown') is None
+
+    # Other processes use the stored manifest and only import the modules they use
+    with patch.object(registry_module, 'import_module', wraps=registry_module.import_module) as mock_import:
+        other_registry = Registry('plugins', SoftwareFactsPlugin, 'REGISTRY_TEST_PLUGINS_PATH')
+        assert other_registry.get('stat') is stat
+    mock_import.assert_called_once_with(stat.__module__)
+
+
+def test_registry_manifest_invalidated(registry_env):
+    registry = Registry('plugins', SoftwareFactsPlugin, 'REGISTRY_TEST_PLUGINS_PATH')
+    assert registry.get('registry_test_plugin_2') is None
+    manifest_path = registry._manifest_path()
+    with open(manifest_path) as f:
+        assert 'registry_test_plugin_2' not in json.load(f)['entries']
+
+    (registry_env / 'registry_test_plugin_2.py').write_text(EXTERNAL_PLUGIN.format(class_name='RegistryTestPlugin2'))
+    os.utime(str(registry_env), (0, 0))
+    other_registry = Registry('plugins', SoftwareFactsPlugin, 'REGISTRY_TEST_PLUGINS_PATH')
+    assert other_registry.get('registry_test_plugin_2').__name__ == 'RegistryTestPlugin2'
+    with open(manifest_path) as f:
+        assert 'registry_test_plugin_2' in json.load(f)['entries']
+
+
+def test_registry_without_cache(registry_env, monkeypatch):
+    monkeypatch.setenv(registry_module.cache_dir_var, '')
+    registry = Registry('plugins', SoftwareFactsPlugin, 'REGISTRY_TEST_PLUGINS_PATH')
+    assert registry._manifest_path() is None
+    assert registry.get('registry_test_plugin').__name__ == 'RegistryTestPlugin'
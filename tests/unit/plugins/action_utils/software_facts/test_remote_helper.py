@@ -0,0 +1,280 @@
+import base64
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ansible.module_utils.common.process import get_bin_path
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import MagicMock
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.remote_helper import RemoteHelper
+
+
+class LocalActionModule(object):
+    """Stand-in of the action module executing the commands in the local host, as the local connection does."""
+
+    def __init__(self, pipelining=True):
+        self.pipelining = pipelining
+        self.commands = []
+
+    def _is_pipelining_enabled(self, module_style, wrap_async=False):
+        return self.pipelining
+
+    def _compute_environment_string(self):
+        return 'LANG=C'
+
+    def _low_level_execute_command(self, cmd, sudoable=True, in_data=None):
+        self.commands.append(cmd)
+        process = subprocess.Popen(cmd, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate(to_bytes(in_data))
+        return dict(rc=process.returncode, stdout=to_text(stdout), stderr=to_text(stderr))
+
+
+def _find_python2():
+    """Return the path of a working python 2 interpreter, the oldest python of the target hosts, if there is one."""
+    for name in ('python2.6', 'python2.7', 'python2'):
+        try:
+            path = get_bin_path(name)
+        except ValueError:
+            continue
+        if subprocess.call([path, '-c', 'import sys'], stdout=subprocess.PIPE, stderr=subprocess.PIPE) == 0:
+            return path
+    return None
+
+
+@pytest.fixture
+def helper():
+    return RemoteHelper(sys.executable)
+
+
+def test_stat(helper, tmp_path):
+    action_module = LocalActionModule()
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    module_args = dict(path=str(config), follow=False, get_checksum=False, get_mime=False, get_attributes=True)
+
+    result = helper.execute_module(action_module, 'ansible.builtin.stat', module_args)
+
+    assert result['stat']['exists'] is True
+    assert result['stat']['isreg'] is True
+    assert result['stat']['path'] == str(config)
+    assert result['stat']['size'] == 12
+    assert result['stat']['readable'] is True
+    assert isinstance(result['stat']['attributes'], list)
+    assert 'mimetype' not in result['stat']
+    assert action_module.commands[0].startswith('LANG=C {0} -c '.format(sys.executable))
+
+    module_args['path'] = str(tmp_path / 'missing.conf')
+    assert helper.execute_module(action_module, 'ansible.builtin.stat', module_args) == dict(changed=False,
+                                                                                             stat=dict(exists=False))
+
+
+def test_stat_files(helper, tmp_path):
+    action_module = LocalActionModule()
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    missing = str(tmp_path / 'missing.conf')
+    module_args = dict(paths=[str(config), missing, str(tmp_path)], follow=False, get_mime=False,
+                       get_attributes=False)
+
+    result = helper.execute_module(action_module, 'datadope.discovery.stat_files', module_args)
+
+    # All the paths are checked with a single execution
+    assert len(action_module.commands) == 1
+    assert result['files'][str(config)]['stat']['isreg'] is True
+    assert result['files'][missing] == dict(stat=dict(exists=False))
+    assert result['files'][str(tmp_path)]['stat']['isdir'] is True
+
+
+def test_stat_files_expanded_paths(helper, tmp_path, monkeypatch):
+    action_module = LocalActionModule()
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    module_args = dict(paths=['~/app.conf'], follow=False, get_mime=False, get_attributes=False)
+
+    result = helper.execute_module(action_module, 'datadope.discovery.stat_files', module_args)
+
+    # As the module does, results are keyed by the paths as provided
+    assert result['files']['~/app.conf']['stat']['path'] == str(config)
+
+
+def test_find(helper, tmp_path):
+    action_module = LocalActionModule()
+    for name in ('nginx', '.nginx', 'nginx.conf'):
+        (tmp_path / name).write_text(u'')
+    (tmp_path / 'nginx').chmod(0o755)
+    module_args = dict(patterns='nginx', paths=[str(tmp_path), str(tmp_path / 'missing')], recurse=False,
+                       use_regex=False, file_type='file', hidden=False)
+
+    result = helper.execute_module(action_module, 'ansible.builtin.find', module_args)
+
+    assert result['matched'] == 1
+    assert result['files'][0]['path'] == str(tmp_path / 'nginx')
+    assert result['files'][0]['isdir'] is False
+    assert result['files'][0]['xusr'] is True
+    assert list(result['skipped_paths']) == [str(tmp_path / 'missing')]
+
+
+def test_slurp(helper, tmp_path):
+    action_module = LocalActionModule()
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+
+    result = helper.execute_module(action_module, 'ansible.legacy.slurp', dict(src=str(config)))
+    assert base64.b64decode(result['content']) == b'port = 8080\n'
+    assert result['encoding'] == 'base64'
+    assert result['source'] == str(config)
+
+    missing = str(tmp_path / 'missing.conf')
+    result = helper.execute_module(action_module, 'ansible.legacy.slurp', dict(src=missing))
+    assert result == dict(failed=True, msg='file not found: {0}'.format(missing))
+
+
+@pytest.mark.parametrize(
+    ('module_args', 'expected_rc', 'expected_stdout'),
+    (
+        (dict(_raw_params="echo 'hello world'"), 0, 'hello world'),
+        (dict(argv=['echo', 'hello', 'world']), 0, 'hello world'),
+        (dict(argv=[sys.executable, '-c', 'import sys; sys.exit(3)']), 3, ''),
+    )
+)
+def test_command(helper, module_args, expected_rc, expected_stdout):
+    action_module = LocalActionModule()
+
+    result = helper.execute_module(action_module, 'command', module_args)
+
+    assert result['rc'] == expected_rc
+    assert result['stdout'] == expected_stdout
+    assert result.get('failed', False) is (expected_rc != 0)
+
+
+def test_command_expanded_args(helper, tmp_path, monkeypatch):
+    action_module = LocalActionModule()
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('APP_HOME', '/opt/app')
+
+    result = helper.execute_module(action_module, 'command', dict(_raw_params='echo ~/app.conf $APP_HOME',
+                                                                  chdir='~'))
+
+    # User and variables are expanded as the command module does, without a shell
+    assert result['stdout'] == '{0}/app.conf /opt/app'.format(tmp_path)
+    assert result['cmd'] == ['echo', '{0}/app.conf'.format(tmp_path), '/opt/app']
+
+
+def test_command_undecodable_output(helper):
+    action_module = LocalActionModule()
+    module_args = dict(argv=[sys.executable, '-c', r"import os; os.write(1, b'caf\xe9')"])
+
+    result = helper.execute_module(action_module, 'command', module_args)
+
+    # Undecodable bytes are kept as surrogates, as the command module returns them
+    assert result['stdout'] == u'caf\udce9'
+
+
+def test_command_chdir(helper, tmp_path):
+    action_module = LocalActionModule()
+
+    result = helper.execute_module(action_module, 'command', dict(argv=['pwd'], chdir=str(tmp_path)))
+
+    assert os.path.realpath(result['stdout']) == os.path.realpath(str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    ('module_name', 'module_args', 'wrap_async'),
+    (
+        ('ansible.builtin.stat', dict(path='/etc/hosts', get_checksum=True), False),
+        ('ansible.builtin.find', dict(patterns='nginx', paths=['/usr/sbin'], recurse=True, file_type='file'), False),
+        ('ansible.legacy.slurp', dict(src='/etc/hosts', other=True), False),
+        ('command', dict(_raw_params='ls', stdin='data'), False),
+        ('command', dict(_raw_params='ls'), True),
+        ('datadope.discovery.slurp_files', dict(paths=['/etc/hosts']), False),
+    )
+)
+def test_not_answered(helper, module_name, module_args, wrap_async):
+    action_module = LocalActionModule()
+
+    assert helper.execute_module(action_module, module_name, module_args, wrap_async) is None
+    assert action_module.commands == []
+
+
+@pytest.mark.skipif(_find_python2() is None, reason="python 2 is not available")
+def test_python2(tmp_path):
+    # The script is executed by the interpreter of the target host, the oldest one being python 2
+    action_module = LocalActionModule()
+    helper = RemoteHelper(_find_python2())
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+
+    result = helper.execute_module(action_module, 'datadope.discovery.stat_files',
+                                   dict(paths=[str(config)], follow=False, get_mime=False, get_attributes=False))
+    assert result['files'][str(config)]['stat']['size'] == 12
+    result = helper.execute_module(action_module, 'ansible.legacy.slurp', dict(src=str(config)))
+    assert base64.b64decode(result['content']) == b'port = 8080\n'
+    result = helper.execute_module(action_module, 'ansible.builtin.find',
+                                   dict(patterns='*.conf', paths=[str(tmp_path)], file_type='file'))
+    assert result['matched'] == 1
+    result = helper.execute_module(action_module, 'command', dict(argv=['echo', 'hello']))
+    assert result['stdout'] == 'hello'
+    assert not helper._broken
+
+
+def test_broken(tmp_path):
+    action_module = LocalActionModule()
+    helper = RemoteHelper(str(tmp_path / 'missing-python'))
+    module_args = dict(src='/etc/hosts')
+
+    assert helper.execute_module(action_module, 'ansible.legacy.slurp', module_args) is None
+    # The helper is not executed again, modules are executed instead
+    assert helper.execute_module(action_module, 'ansible.legacy.slurp', module_args) is None
+    assert len(action_module.commands) == 1
+
+
+@pytest.mark.parametrize(
+    ('task_vars', 'pipelining', 'expected_interpreter'),
+    (
+        (dict(ansible_facts=dict(discovered_interpreter_python='/usr/bin/python3')), True, '/usr/bin/python3'),
+        (dict(ansible_python_interpreter='/opt/python/bin/python',
+              ansible_facts=dict(discovered_interpreter_python='/usr/bin/python3')), True, '/opt/python/bin/python'),
+        (dict(ansible_python_interpreter='auto_silent',
+              ansible_facts=dict(discovered_interpreter_python='/usr/bin/python3')), True, '/usr/bin/python3'),
+        (dict(ansible_facts=dict(discovered_interpreter_python='/usr/bin/python3')), False, None),
+        (dict(ansible_facts=dict(os_family='Windows')), True, None),
+        (dict(), True, None),
+    )
+)
+def test_create(task_vars, pipelining, expected_interpreter):
+    helper = RemoteHelper.create(LocalActionModule(pipelining), task_vars)
+
+    if expected_interpreter is None:
+        assert helper is None
+    else:
+        assert helper._interpreter == expected_interpreter
+
+
+def test_unreadable_output(helper):
+    action_module = MagicMock()
+    action_module._compute_environment_string.return_value = ''
+    action_module._low_level_execute_command.side_effect = [
+        dict(rc=0, stdout='Welcome to host\n[{"rc": 0, "stdout": "/opt/app"}]'),
+        dict(rc=0, stdout='[{"rc": 0, "stdout": "/opt/app"}]'),
+    ]
+    module_args = dict(_raw_params='printenv APP_HOME')
+
+    assert helper.execute_module(action_module, 'command', module_args) is None
+    # Only that module is executed instead, the helper is still used
+    assert helper.execute_module(action_module, 'command', module_args) == dict(rc=0, stdout='/opt/app')
+
+
+def test_environment_of_caller(helper):
+    action_module = MagicMock()
+    action_module._compute_environment_string.return_value = 'APP_HOME=/opt/app'
+    action_module._low_level_execute_command.return_value = dict(rc=0, stdout='[{"rc": 0, "stdout": "/opt/app"}]')
+
+    result = helper.execute_module(action_module, 'command', dict(_raw_params='printenv APP_HOME'))
+
+    assert result == dict(rc=0, stdout='/opt/app')
+    cmd = action_module._low_level_execute_command.call_args[0][0]
+    assert cmd.startswith('APP_HOME=/opt/app ')
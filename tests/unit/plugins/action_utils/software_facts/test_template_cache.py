@@ -0,0 +1,70 @@
+import pytest
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+from jinja2 import Environment
+
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from ansible_collections.datadope.discovery.plugins.action_utils.software_facts.template_cache import \
+    copy_with_compiled_templates, to_jinja_source
+
+
+@pytest.mark.parametrize(('data', 'expected'), [
+    ('untemplated', None),
+    ('/etc/httpd/conf/httpd.conf', None),
+    ('<< __instance__.name >>', '{{ __instance__.name }}'),
+    ('<< a >>/<< b >>', '{{ a }}/{{ b }}'),
+    ('{{ a }}', '{{ a }}'),
+    ('{% if a %}x{% endif %}', '{% if a %}x{% endif %}'),
+    ('{# comment #}', '{# comment #}'),
+])
+def test_to_jinja_source(data, expected):
+    assert to_jinja_source(data) == expected
+    assert to_jinja_source(data) == expected
+
+
+def test_template_compiled_once():
+    templars = [Templar(loader=DataLoader(), variables={'a': index, 'b': 'host{0}'.format(index)})
+                for index in range(3)]
+    environments = [templar.environment for templar in templars]
+    environment_class = type(environments[0])
+    templars = [copy_with_compiled_templates(templar) for templar in templars]
+    # The environments of the original templars are not changed
+    assert all(type(environment) is environment_class for environment in environments)
+    assert all(templar.environment is not environment for templar, environment in zip(templars, environments))
+    assert type(copy_with_compiled_templates(templars[0]).environment) is type(templars[0].environment)
+
+    with patch.object(Environment, '_parse', autospec=True, side_effect=Environment._parse) as mock_parse:
+        results = [templar.template('{{ a }} in {{ b }} (compile once)') for templar in templars]
+        results.append(templars[0].template('{{ b }} (compile once)'))
+    assert results == ['0 in host0 (compile once)', '1 in host1 (compile once)', '2 in host2 (compile once)',
+                       'host0 (compile once)']
+    assert mock_parse.call_count == 2
+
+
+def test_template_copy_keeps_variables_and_native():
+    variables = {'a': 1}
+    templar = Templar(loader=DataLoader(), variables=variables)
+    copy = copy_with_compiled_templates(templar)
+    variables['a'] = 2
+    assert copy.template('{{ a }}') == templar.template('{{ a }}')
+    assert copy.jinja2_native is templar.jinja2_native
+
+
+def test_template_compiled_per_filters():
+    templar = copy_with_compiled_templates(Templar(loader=DataLoader(), variables={'a': 'x'}))
+    other = copy_with_compiled_templates(Templar(loader=DataLoader(), variables={'a': 'x'}))
+    other.environment.filters = dict(other.environment.filters, shout=lambda value: value.upper() + '!')
+
+    with patch.object(Environment, '_parse', autospec=True, side_effect=Environment._parse) as mock_parse:
+        assert other.template('{{ a | shout }} (filters)') == 'X! (filters)'
+        # Code compiled for an environment with other filters is not reused
+        with pytest.raises(Exception):
+            templar.template('{{ a | shout }} (filters)')
+    assert mock_parse.call_count == 2
+
+
+def test_template_errors_not_cached():
+    templar = copy_with_compiled_templates(Templar(loader=DataLoader(), variables={}))
+    for _ in range(2):
+        with pytest.raises(Exception):
+            templar.template('{{ a + }}')
@@ -0,0 +1,357 @@
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import json
+import os
+import threading
+
+import pytest
+
+import ansible_collections.datadope.discovery.plugins.modules.file_parser as module_to_test
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser import lex, yacc
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.apache_webserver.lexer import \
+    DoubleQuotedString, SingleQuotedString
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.cache import ParseCache, \
+    decode_ast, encode_ast
+from ansible_collections.datadope.discovery.plugins.module_utils.file_parser.nginx.lexer import make_lexer
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from .conftest import AnsibleExitJson, AnsibleFailJson
+
+
+@pytest.fixture
+def apache_config(tmp_path):
+    conf_d = tmp_path / 'conf.d'
+    conf_d.mkdir()
+    main_config = tmp_path / 'httpd.conf'
+    main_config.write_text(u'Listen 80\nInclude conf.d/*.conf\n')
+    for index in range(3):
+        (conf_d / 'vhost{0}.conf'.format(index)).write_text(
+            u'<VirtualHost *:{0}>\n  ServerName site{1}\n</VirtualHost>\n'.format(8000 + index, index))
+    yield str(main_config)
+
+
+def test_main(ansible_module_patch, apache_config, tmp_path):
+    ansible_args = {
+        'file_path': apache_config,
+        'parser': 'apache_webserver',
+        'cache_dir': str(tmp_path / 'cache')
+    }
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert result.value.args[0]['changed'] is False
+    assert result.value.args[0]['parsed'] == {
+        'Listen': '80',
+        'VirtualHost': {
+            '*:8000': {'ServerName': 'site0'},
+            '*:8001': {'ServerName': 'site1'},
+            '*:8002': {'ServerName': 'site2'},
+        }
+    }
+
+
+def test_main_files(ansible_module_patch, apache_config, tmp_path):
+    nginx_config = tmp_path / 'nginx.conf'
+    nginx_config.write_text(u'http {\n    server {\n        listen 80;\n    }\n}\n')
+    missing_config = str(tmp_path / 'missing.conf')
+    ansible_args = {
+        'parser': 'apache_webserver',
+        'files': [
+            {'file_path': apache_config},
+            {'file_path': str(nginx_config), 'parser': 'nginx'},
+            {'file_path': missing_config},
+        ],
+        'cache_dir': str(tmp_path / 'cache')
+    }
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert 'parsed' not in result.value.args[0]
+    results = result.value.args[0]['results']
+    # Results are returned in the order of the files
+    assert [r['file_path'] for r in results] == [apache_config, str(nginx_config), missing_config]
+    assert results[0]['parser'] == 'apache_webserver'
+    assert results[0]['parsed']['VirtualHost']['*:8001'] == {'ServerName': 'site1'}
+    assert results[1]['parsed'] == {'http': {'server': {'listen': '80'}}}
+    assert results[2]['failed'] is True
+    assert results[2]['msg'].startswith("Could not parse file '{0}' with parser 'apache_webserver'"
+                                        .format(missing_config))
+
+
+def test_main_files_path_prefix(ansible_module_patch, tmp_path):
+    # Instances running in containers share the path of their config file, only their path prefix differs
+    nginx_config = tmp_path / 'nginx.conf'
+    nginx_config.write_text(u'http {\n    include /conf.d/*.conf;\n}\n')
+    for index in range(2):
+        conf_d = tmp_path / 'root{0}'.format(index) / 'conf.d'
+        conf_d.mkdir(parents=True)
+        (conf_d / 'server.conf').write_text(u'server {{\n    listen {0};\n}}\n'.format(8000 + index))
+    ansible_args = {
+        'parser': 'nginx',
+        'files': [
+            {'file_path': str(nginx_config), 'path_prefix': str(tmp_path / 'root0')},
+            {'file_path': str(nginx_config), 'path_prefix': str(tmp_path / 'root1')},
+        ],
+    }
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    results = result.value.args[0]['results']
+    assert [r['path_prefix'] for r in results] == [str(tmp_path / 'root0'), str(tmp_path / 'root1')]
+    assert [r['parsed']['http']['server']['listen'] for r in results] == ['8000', '8001']
+
+
+@pytest.mark.parametrize('files, error', [
+    ([{'file_path': '/etc/httpd.conf'}], "No parser provided for file '/etc/httpd.conf'"),
+    ([{'file_path': '/etc/httpd.conf', 'parser': 'apache_webserver'},
+      {'file_path': '/etc/httpd.conf', 'parser': 'apache_webserver'}],
+     "File '/etc/httpd.conf' is provided more than once with the same options"),
+])
+def test_main_files_wrong_parameters(ansible_module_patch, files, error):
+    ansible_module = ansible_module_patch(ansible_args={'files': files},
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleFailJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert result.value.args[0]['msg'] == error
+
+
+def test_grammar_tables_built_once(apache_config):
+    yacc._lr_table_cache.clear()
+    with patch.object(yacc, 'LRGeneratedTable', wraps=yacc.LRGeneratedTable) as mock_generated_table:
+        loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+        loader_func(apache_config).load(apache_config)
+        loader_func(apache_config).load(apache_config)
+    assert mock_generated_table.call_count == 1
+
+
+def test_grammar_tables_persisted(apache_config, tmp_path):
+    tables_dir = module_to_test.get_cache_subdir(str(tmp_path / 'cache'), 'tables')
+    assert tables_dir == str(tmp_path / 'cache' / 'tables')
+    yacc._lr_table_cache.clear()
+    loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+    expected = loader_func(apache_config, tabledir=tables_dir).load(apache_config)
+    tables = os.listdir(tables_dir)
+    assert len(tables) == 1 and tables[0].startswith('parsetab-lalr-') and tables[0].endswith('.json')
+    with open(os.path.join(tables_dir, tables[0])) as f:
+        assert json.load(f)['tabversion'] == yacc.__tabversion__
+
+    # A new process would not have the in-memory tables, so they have to be read from the table file
+    yacc._lr_table_cache.clear()
+    with patch.object(yacc, 'LRGeneratedTable', wraps=yacc.LRGeneratedTable) as mock_generated_table:
+        assert loader_func(apache_config, tabledir=tables_dir).load(apache_config) == expected
+    mock_generated_table.assert_not_called()
+
+
+@pytest.mark.parametrize('parser', ['apache_webserver', 'nginx'])
+def test_include_workers_same_result(tmp_path, parser):
+    sites = tmp_path / 'sites'
+    sites.mkdir()
+    if parser == 'apache_webserver':
+        main_config = tmp_path / 'httpd.conf'
+        main_config.write_text(u'Include sites/*.conf\n')
+        site = u'<VirtualHost *:{0}>\n  ServerName site{1}\n</VirtualHost>\nLogLevel warn{1}\n'
+    else:
+        main_config = tmp_path / 'nginx.conf'
+        main_config.write_text(u'http {\n    include sites/*.conf;\n}\n')
+        site = u'server {{\n    listen {0};\n    server_name site{1};\n}}\n'
+    for index in range(20):
+        (sites / 'site{0:02d}.conf'.format(index)).write_text(site.format(8000 + index, index))
+    (sites / 'broken.conf').write_text(u'')
+
+    loader_func = module_to_test.get_parser_loader_func(parser)
+    expected = loader_func(str(main_config)).load(str(main_config))
+    loader = loader_func(str(main_config), includeworkers=4)
+    in_main_thread = []
+
+    def record_in_main_thread():
+        in_main_thread.append(threading.current_thread() is threading.main_thread())
+        return in_main_thread[-1]
+
+    with patch.object(loader, '_fetch_file', wraps=loader._fetch_file) as mock_fetch_file, \
+            patch.object(lex, '_in_main_thread', side_effect=record_in_main_thread):
+        assert loader.load(str(main_config)) == expected
+    assert mock_fetch_file.call_count == 21
+    # Files are only read in the workers, they are parsed where the lexer match timeout applies
+    assert in_main_thread and all(in_main_thread)
+
+
+def test_lexer_built_once(apache_config):
+    lex._lexer_cache.clear()
+    with patch.object(lex, '_form_master_re', wraps=lex._form_master_re) as mock_form_master_re:
+        loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+        first = loader_func(apache_config).load(apache_config)
+        built = mock_form_master_re.call_count
+        second = loader_func(apache_config).load(apache_config)
+    assert built > 0
+    assert mock_form_master_re.call_count == built
+    assert first == second
+
+
+def test_lexer_clone_is_bound_to_new_object():
+    lexer_class = make_lexer()
+    first = lexer_class()
+    second = lexer_class()
+    assert second.engine is not first.engine
+    for lexre, findex in second.engine.lexre:
+        for func_and_name in findex:
+            if func_and_name and func_and_name[0]:
+                assert func_and_name[0].__self__ is second
+
+
+def test_parse_cache(apache_config, tmp_path):
+    parse_cache = ParseCache(str(tmp_path / 'parsed'))
+    (tmp_path / 'parsed').mkdir()
+    loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+    expected = loader_func(apache_config).load(apache_config)
+    assert loader_func(apache_config, parsecache=parse_cache).load(apache_config) == expected
+    assert len(os.listdir(str(tmp_path / 'parsed'))) == 4
+
+    loader = loader_func(apache_config, parsecache=parse_cache)
+    with patch.object(loader._parser, 'parse') as mock_parse:
+        assert loader.load(apache_config) == expected
+    mock_parse.assert_not_called()
+
+    # A modified file is parsed again, the rest are still taken from the cache
+    vhost = tmp_path / 'conf.d' / 'vhost1.conf'
+    vhost.write_text(u'<VirtualHost *:9001>\n  ServerName changed\n</VirtualHost>\n')
+    os.utime(str(vhost), (0, 0))
+    loader = loader_func(apache_config, parsecache=parse_cache)
+    with patch.object(loader._parser, 'parse', wraps=loader._parser.parse) as mock_parse:
+        result = loader.load(apache_config)
+    assert mock_parse.call_count == 1
+    assert result['VirtualHost']['*:9001'] == {'ServerName': 'changed'}
+
+
+@pytest.mark.parametrize(('parser', 'text'), (
+    ('haproxy', u'global\n    maxconn 100\n'),
+    ('keepalived', u'global_defs {\n    router_id LVS_1\n}\n'),
+))
+def test_parse_cache_other_loaders(parser, text, tmp_path):
+    config = tmp_path / 'app.conf'
+    config.write_text(text)
+    parse_cache = ParseCache(str(tmp_path / 'parsed'))
+    (tmp_path / 'parsed').mkdir()
+    loader_func = module_to_test.get_parser_loader_func(parser)
+    expected = loader_func(str(config)).load(str(config))
+    assert loader_func(str(config), parsecache=parse_cache).load(str(config)) == expected
+
+    loader = loader_func(str(config), parsecache=parse_cache)
+    with patch.object(loader._parser, 'parse') as mock_parse:
+        assert loader.load(str(config)) == expected
+    mock_parse.assert_not_called()
+
+
+def test_parse_cache_prune(tmp_path):
+    cache_dir = tmp_path / 'parsed'
+    cache_dir.mkdir()
+    parse_cache = ParseCache(str(cache_dir), max_size=2500)
+    keys = []
+    for index in range(5):
+        config = tmp_path / 'config{0}'.format(index)
+        config.write_text(u'x')
+        keys.append(parse_cache.key(str(config), 'grammar'))
+        parse_cache.set(keys[-1], ['config', 'x' * 1000])
+        # Entries used later are kept over the ones used before
+        os.utime(parse_cache._entry_path(keys[-1]), (index, index))
+    parse_cache.prune()
+    assert [parse_cache.get(key) is not None for key in keys] == [False, False, False, True, True]
+
+
+def test_parse_cache_not_private(apache_config, tmp_path):
+    parse_cache = ParseCache(str(tmp_path / 'parsed'))
+    (tmp_path / 'parsed').mkdir()
+    loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+    loader_func(apache_config, parsecache=parse_cache).load(apache_config)
+
+    # Entries other users could have modified are not used
+    for entry in os.listdir(str(tmp_path / 'parsed')):
+        os.chmod(str(tmp_path / 'parsed' / entry), 0o666)
+    loader = loader_func(apache_config, parsecache=parse_cache)
+    with patch.object(loader._parser, 'parse', wraps=loader._parser.parse) as mock_parse:
+        loader.load(apache_config)
+    assert mock_parse.call_count == 4
+
+
+def test_parse_cache_read_only(apache_config, tmp_path):
+    (tmp_path / 'parsed').mkdir()
+    parse_cache = ParseCache(str(tmp_path / 'parsed'), read_only=True)
+    loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+    loader_func(apache_config, parsecache=parse_cache).load(apache_config)
+    assert os.listdir(str(tmp_path / 'parsed')) == []
+
+
+def test_encode_ast():
+    ast = ['config', [('VirtualHost', SingleQuotedString('*:80'), [DoubleQuotedString('a b'), u'c', 1, None])]]
+
+    decoded = decode_ast(json.loads(json.dumps(encode_ast(ast))))
+
+    assert decoded == ast
+    block = decoded[1][0]
+    assert isinstance(block, tuple)
+    assert type(block[1]) is SingleQuotedString
+    assert type(block[2][0]) is DoubleQuotedString
+    with pytest.raises(TypeError):
+        encode_ast([object()])
+
+
+def test_get_cache_subdir_disabled():
+    assert module_to_test.get_cache_subdir('', 'tables') is None
+    assert module_to_test.get_cache_subdir(None, 'tables') is None
+
+
+def test_get_cache_subdir_not_private(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    assert module_to_test.get_cache_subdir(str(cache_dir), 'tables') == str(cache_dir / 'tables')
+    os.chmod(str(cache_dir), 0o777)
+    assert module_to_test.get_cache_subdir(str(cache_dir), 'tables') is None
+    os.chmod(str(cache_dir), 0o700)
+    os.chmod(str(cache_dir / 'tables'), 0o770)
+    assert module_to_test.get_cache_subdir(str(cache_dir), 'tables') is None
+
+
+def test_main_check_mode(ansible_module_patch, apache_config, tmp_path):
+    ansible_args = {
+        'file_path': apache_config,
+        'parser': 'apache_webserver',
+        'cache_dir': str(tmp_path / 'cache'),
+        'parse_cache': True,
+        '_ansible_check_mode': True,
+    }
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert result.value.args[0]['parsed']['Listen'] == '80'
+    assert not (tmp_path / 'cache').exists()
+
+
+def test_grammar_tables_corrupt(apache_config, tmp_path):
+    tables_dir = module_to_test.get_cache_subdir(str(tmp_path / 'cache'), 'tables')
+    yacc._lr_table_cache.clear()
+    loader_func = module_to_test.get_parser_loader_func('apache_webserver')
+    expected = loader_func(apache_config, tabledir=tables_dir).load(apache_config)
+    table_path = os.path.join(tables_dir, os.listdir(tables_dir)[0])
+    with open(table_path, 'w') as f:
+        f.write('{"tabversion": ')
+
+    # Unreadable tables are generated and written again
+    yacc._lr_table_cache.clear()
+    with patch.object(yacc, 'LRGeneratedTable', wraps=yacc.LRGeneratedTable) as mock_generated_table:
+        assert loader_func(apache_config, tabledir=tables_dir).load(apache_config) == expected
+    assert mock_generated_table.call_count == 1
+    with open(table_path) as f:
+        assert json.load(f)['tabversion'] == yacc.__tabversion__
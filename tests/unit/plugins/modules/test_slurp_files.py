@@ -0,0 +1,128 @@
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import base64
+
+import pytest
+
+import ansible_collections.datadope.discovery.plugins.modules.slurp_files as module_to_test
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import patch
+from .conftest import AnsibleExitJson, AnsibleFailJson
+
+
+def test_main(ansible_module_patch, tmp_path):
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    missing = str(tmp_path / 'missing.conf')
+    ansible_args = {
+        'paths': [str(config), missing, str(tmp_path), str(config)]
+    }
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert result.value.args[0]['changed'] is False
+    files = result.value.args[0]['files']
+    assert sorted(files) == sorted([str(config), missing, str(tmp_path)])
+    assert base64.b64decode(files[str(config)]['content']) == b'port = 8080\n'
+    assert files[str(config)]['encoding'] == 'base64'
+    assert files[str(config)]['source'] == str(config)
+    assert files[missing] == dict(failed=True, msg='file not found: {0}'.format(missing), source=missing)
+    assert files[str(tmp_path)]['failed'] is True
+    assert files[str(tmp_path)]['msg'].startswith('source is a directory')
+
+
+def test_setup_module_object(module_args):
+    module_args({'paths': ['/etc/hosts']})
+    module = module_to_test.setup_module_object()
+    assert module.argument_spec == module_to_test.argument_spec
+    assert module.supports_check_mode
+
+
+@pytest.mark.parametrize(
+    ('selection', 'expected_content', 'expected_truncated'),
+    (
+        (dict(), b'line1\nline2\nline3\nline4\n', False),
+        (dict(max_bytes=8), b'line1\nli', True),
+        (dict(head=2), b'line1\nline2\n', True),
+        (dict(head=4), b'line1\nline2\nline3\nline4\n', False),
+        (dict(head=2, max_bytes=8), b'line1\nli', True),
+        (dict(tail=1), b'line4\n', True),
+        (dict(tail=10), b'line1\nline2\nline3\nline4\n', False),
+        (dict(tail=3, max_bytes=14), b'line3\nline4\n', True),
+        (dict(line_range=[2, 3]), b'line2\nline3\n', True),
+        (dict(line_range=[1, 4]), b'line1\nline2\nline3\nline4\n', False),
+    )
+)
+def test_main_selection(ansible_module_patch, tmp_path, selection, expected_content, expected_truncated):
+    log = tmp_path / 'app.log'
+    log.write_text(u'line1\nline2\nline3\nline4\n')
+    ansible_args = dict(paths=[str(log)], **selection)
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    file_result = result.value.args[0]['files'][str(log)]
+    assert base64.b64decode(file_result['content']) == expected_content
+    assert file_result['truncated'] is expected_truncated
+
+
+@pytest.mark.parametrize(
+    'selection',
+    (dict(head=1, tail=1), dict(line_range=[3, 2]), dict(line_range=[0, 2]), dict(max_bytes=-1))
+)
+def test_main_wrong_selection(ansible_module_patch, selection):
+    ansible_args = dict(paths=['/etc/hosts'], **selection)
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleFailJson):
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+
+
+@pytest.mark.parametrize(
+    ('file_name', 'file_content', 'parsing', 'expected_parsed'),
+    (
+        ('app.json', u'{"server": {"port": 8080}}', dict(parser='json'), {'server': {'port': 8080}}),
+        ('app.xml', u'<server port="8080"><host>a</host><host>b</host></server>', dict(parser='xml'),
+         {'server': {'attr-port': '8080', 'host': ['a', 'b']}}),
+        ('app.xml', u'<server port="8080"/>', dict(parser='xml', parser_params=dict(attr_prefix='@')),
+         {'server': {'@port': '8080'}}),
+        ('app.xml', u'<server><host><name>a</name></host><host><name>b</name></host></server>',
+         dict(parser='xml', select=['server.host.name', 'server.host.1', 'server.missing']),
+         {'server.host.name': ['a', 'b'], 'server.host.1': {'name': 'b'}}),
+    )
+)
+def test_main_parser(ansible_module_patch, tmp_path, file_name, file_content, parsing, expected_parsed):
+    config = tmp_path / file_name
+    config.write_text(file_content)
+    ansible_args = dict(paths=[str(config)], **parsing)
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert result.value.args[0]['files'][str(config)] == dict(parsed=expected_parsed, source=str(config),
+                                                              truncated=False)
+
+
+def test_main_parser_error(ansible_module_patch, tmp_path):
+    config = tmp_path / 'app.json'
+    config.write_text(u'{"server": ')
+    ansible_args = dict(paths=[str(config)], parser='json', head=1)
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    file_result = result.value.args[0]['files'][str(config)]
+    assert file_result['failed'] is True
+    assert file_result['msg'].startswith('Cannot parse text into json')
@@ -0,0 +1,112 @@
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import os
+
+import pytest
+
+import ansible_collections.datadope.discovery.plugins.modules.stat_files as module_to_test
+from ansible_collections.datadope.discovery.plugins.module_utils.file_stat import add_mime
+from ansible_collections.community.internal_test_tools.tests.unit.compat.mock import MagicMock, patch
+from .conftest import AnsibleExitJson
+
+
+def test_main(ansible_module_patch, tmp_path):
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    link = tmp_path / 'link.conf'
+    os.symlink(str(config), str(link))
+    missing = str(tmp_path / 'missing.conf')
+    ansible_args = {
+        'paths': [str(config), missing, str(tmp_path), str(link), str(config)],
+        'get_mime': False,
+        'get_attributes': False
+    }
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    assert result.value.args[0]['changed'] is False
+    files = result.value.args[0]['files']
+    assert sorted(files) == sorted([str(config), missing, str(tmp_path), str(link)])
+    assert files[str(config)]['stat']['exists'] is True
+    assert files[str(config)]['stat']['isreg'] is True
+    assert files[str(config)]['stat']['path'] == str(config)
+    assert files[str(config)]['stat']['size'] == 12
+    assert files[str(config)]['stat']['readable'] is True
+    assert 'mimetype' not in files[str(config)]['stat']
+    assert files[missing] == dict(stat=dict(exists=False))
+    assert files[str(tmp_path)]['stat']['isdir'] is True
+    assert files[str(link)]['stat']['islnk'] is True
+    assert files[str(link)]['stat']['lnk_target'] == str(config)
+
+
+def test_main_follow(ansible_module_patch, tmp_path):
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    link = tmp_path / 'link.conf'
+    os.symlink(str(config), str(link))
+    ansible_args = dict(paths=[str(link)], follow=True, get_mime=False, get_attributes=False)
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    stat = result.value.args[0]['files'][str(link)]['stat']
+    assert stat['islnk'] is False
+    assert stat['isreg'] is True
+
+
+def test_main_expanded_paths(ansible_module_patch, tmp_path, monkeypatch):
+    config = tmp_path / 'app.conf'
+    config.write_text(u'port = 8080\n')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('APP_HOME', str(tmp_path))
+    ansible_args = dict(paths=['~/app.conf', '$APP_HOME/app.conf', '~/missing.conf'], get_mime=False,
+                        get_attributes=False)
+    ansible_module = ansible_module_patch(ansible_args=ansible_args.copy(),
+                                          argument_spec=module_to_test.argument_spec,
+                                          supports_check_mode=True)
+    with pytest.raises(AnsibleExitJson) as result:
+        with patch.object(module_to_test, 'setup_module_object', return_value=ansible_module):
+            module_to_test.main()
+    files = result.value.args[0]['files']
+    # Results are keyed by the paths as provided, the status has the expanded path
+    assert sorted(files) == sorted(ansible_args['paths'])
+    assert files['~/app.conf']['stat']['path'] == str(config)
+    assert files['$APP_HOME/app.conf']['stat']['path'] == str(config)
+    assert files['~/missing.conf'] == dict(stat=dict(exists=False))
+
+
+def test_setup_module_object(module_args):
+    module_args({'paths': ['/etc/hosts']})
+    module = module_to_test.setup_module_object()
+    assert module.argument_spec == module_to_test.argument_spec
+    assert module.supports_check_mode
+
+
+@pytest.mark.parametrize(
+    ('run_command_result', 'expected_mime'),
+    (
+        ((0, 'text/plain; charset=us-ascii\napplication/x-executable; charset=binary\n', ''),
+         [('text/plain', 'us-ascii'), ('application/x-executable', 'binary')]),
+        ((1, '', 'error'), [('unknown', 'unknown'), ('unknown', 'unknown')]),
+        ((0, 'text/plain; charset=us-ascii\n', ''), [('unknown', 'unknown'), ('unknown', 'unknown')]),
+    )
+)
+def test_add_mime(run_command_result, expected_mime):
+    module = MagicMock()
+    module.get_bin_path.return_value = '/usr/bin/file'
+    module.run_command.return_value = run_command_result
+    outputs = [dict(exists=True, path='/etc/app.conf'), dict(exists=True, path='/usr/bin/app')]
+
+    add_mime(module, outputs)
+
+    # file utility is executed once for all the files
+    module.run_command.assert_called_once_with(['/usr/bin/file', '--brief', '--mime-type', '--mime-encoding', '--',
+                                                b'/etc/app.conf', b'/usr/bin/app'])
+    assert [(output['mimetype'], output['charset']) for output in outputs] == expected_mime